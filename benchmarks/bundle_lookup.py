@@ -0,0 +1,78 @@
+"""
+Benchmark single-license lookups: gzipped JSON fixture vs memory-mapped bundle.
+
+    python benchmarks/bundle_lookup.py [--slug cc-by-40] [--number 200]
+
+"cold" opens the file for every lookup (fixture: decompress and parse it all;
+bundle: map it and read the index), "warm" looks up from an already opened
+source. Each figure is the best of five runs, per lookup. A warm fixture lookup
+is a scan of already parsed dicts, so it wins there; the bundle pays a slice and
+a decode per lookup but never holds the other licenses in memory.
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from licensing.bundle import (
+    BUNDLED_CATALOGUE,
+    BUNDLED_FIXTURE,
+    LicenseBundle,
+    read_fixture,
+)
+
+
+def fixture_lookup(records, slug):
+    for record in records:
+        if record["fields"]["slug"] == slug:
+            return record["fields"]["text"]
+
+
+def bundle_cold(slug):
+    with LicenseBundle(BUNDLED_CATALOGUE) as bundle:
+        return bundle.text(slug)
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slug", default="cc-by-40")
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    records = read_fixture(BUNDLED_FIXTURE)
+    bundle = LicenseBundle(BUNDLED_CATALOGUE)
+    if fixture_lookup(records, args.slug) != bundle.text(args.slug):
+        sys.exit(
+            f"{args.slug}: the bundle and the fixture disagree; run build_license_bundle."
+        )
+
+    results = {
+        ("fixture", "cold"): best(
+            lambda: fixture_lookup(read_fixture(BUNDLED_FIXTURE), args.slug),
+            args.number,
+        ),
+        ("fixture", "warm"): best(
+            lambda: fixture_lookup(records, args.slug), args.number
+        ),
+        ("bundle", "cold"): best(lambda: bundle_cold(args.slug), args.number),
+        ("bundle", "warm"): best(lambda: bundle.text(args.slug), args.number),
+    }
+    bundle.close()
+
+    print(f"{'source':<10}{'lookup':<8}{'per lookup':>14}")
+    for (source, mode), seconds in results.items():
+        print(f"{source:<10}{mode:<8}{seconds * 1e6:>11.1f} µs")
+    for mode in ("cold", "warm"):
+        ratio = results["fixture", mode] / results["bundle", mode]
+        print(f"{mode:<5} fixture / bundle time: {ratio:.2f}")
+
+
+if __name__ == "__main__":
+    main()
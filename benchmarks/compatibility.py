@@ -0,0 +1,64 @@
+"""
+Benchmark compatibility checks against the in-memory bitset matrix.
+
+    python benchmarks/compatibility.py [--licenses 300] [--size 40] [--number 20000]
+
+Builds a random catalogue of ``--licenses`` licenses, each of whose material may
+go into a handful of others, and times checking a random set of ``--size`` of
+them: the matrix build, a full check (a ``Combination``), and the bare mask.
+Each figure is the best of five runs. Needs no database.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from licensing.cache import CatalogueEntry
+from licensing.compatibility import CompatibilityMatrix
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=300)
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    entries = [
+        CatalogueEntry(
+            pk, f"License {pk}", f"license-{pk}", f"https://example.com/{pk}", True
+        )
+        for pk in range(args.licenses)
+    ]
+    pairs = [
+        (pk, rng.randrange(pk, args.licenses))
+        for pk in range(args.licenses)
+        for _ in range(3)
+    ]
+    pairs = [(source, target) for source, target in pairs if source != target]
+    matrix = CompatibilityMatrix(entries, pairs)
+    licenses = rng.sample(range(args.licenses // 2), args.size)
+
+    build = best(
+        lambda: CompatibilityMatrix(entries, pairs), max(1, args.number // 1000)
+    )
+    check = best(lambda: matrix.check(licenses), args.number)
+    mask = best(lambda: matrix.mask(licenses), args.number)
+    print(f"{args.licenses} licenses, {len(pairs)} pairs, sets of {args.size}")
+    print(f"{'build':<8}{build * 1e3:>10.2f} ms")
+    print(f"{'check':<8}{check * 1e6:>10.2f} µs  ({matrix.check(licenses).outcome})")
+    print(f"{'mask':<8}{mask * 1e6:>10.2f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Benchmark the per-response cost of LicenseLinkMiddleware.
+
+    python benchmarks/license_link.py [--number 20000] [--cache-latency 0]
+
+Times a trivial view with and without the middleware, for an object set on the
+request and for one found in a TemplateResponse's context, and reports the
+difference per response and the queries the middleware ran once the catalogue
+is warm. Each figure is the best of five runs. Uses the test settings and an
+in-memory database.
+
+The catalogue version lives in ``LICENSING_CACHE``: with Redis or Memcached,
+reading it is a network round trip. ``--cache-latency`` stands in for one, a
+local-memory cache that waits that many microseconds per call. The middleware
+trusts the version it last read for ``catalogue_max_age`` seconds, so a warm
+response makes no cache call and the 20 µs budget holds either way.
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.template.response import TemplateResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+)
+
+from example.models import TestModel  # noqa: E402
+from licensing.cache import catalogue  # noqa: E402
+from licensing.middleware import LicenseLinkMiddleware  # noqa: E402
+from licensing.models import License  # noqa: E402
+
+#: The budget the middleware is held to, per response.
+BUDGET = 20e-6
+
+
+class RemoteCache(LocMemCache):
+    """A local-memory cache that spends ``OPTIONS["LATENCY"]`` seconds on every
+    read and write, standing in for a cache across the network."""
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.latency = params.get("OPTIONS", {}).get("LATENCY", 0)
+
+    def _wait(self):
+        # Spin rather than sleep: sleeps this short overshoot badly.
+        deadline = time.perf_counter() + self.latency
+        while time.perf_counter() < deadline:
+            pass
+
+    def get(self, *args, **kwargs):
+        self._wait()
+        return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self._wait()
+        return super().set(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        self._wait()
+        return super().incr(*args, **kwargs)
+
+
+def best(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument(
+        "--cache-latency",
+        type=float,
+        default=0,
+        metavar="MICROSECONDS",
+        help="simulated round trip of LICENSING_CACHE, per call",
+    )
+    args = parser.parse_args()
+    latency = args.cache_latency * 1e-6
+
+    setup_test_environment()
+    if latency:
+        remote = {
+            "BACKEND": f"{__name__}.RemoteCache",
+            "OPTIONS": {"LATENCY": latency},
+        }
+        override_settings(
+            CACHES={"default": remote}, LICENSING_CACHE="default"
+        ).enable()
+        catalogue.reset_cache()
+    connection.creation.create_test_db(verbosity=0)
+    license_obj = License.objects.create(
+        name="MIT License",
+        slug="mit",
+        canonical_url="https://opensource.org/licenses/MIT",
+    )
+    obj = TestModel.objects.create(content_license=license_obj)
+    catalogue.get(license_obj.pk)
+
+    request = RequestFactory().get("/")
+    cases = {
+        "on request": (lambda request: HttpResponse(), obj),
+        "in context": (
+            lambda request: TemplateResponse(request, "empty.html", {"object": obj}),
+            None,
+        ),
+    }
+
+    print(f"{'object':<12}{'bare':>10}{'middleware':>13}{'overhead':>11}{'queries':>9}")
+    worst = 0.0
+    for label, (view, licensed) in cases.items():
+        request.licensed_object = licensed
+        middleware = LicenseLinkMiddleware(view)
+        with CaptureQueriesContext(connection) as queries:
+            if "Link" not in middleware(request):
+                sys.exit(f"{label}: no Link header")
+        bare = best(partial(view, request), args.number)
+        wrapped = best(partial(middleware, request), args.number)
+        worst = max(worst, wrapped - bare)
+        print(
+            f"{label:<12}{bare * 1e6:>7.2f} µs{wrapped * 1e6:>10.2f} µs"
+            f"{(wrapped - bare) * 1e6:>8.2f} µs{len(queries):>9}"
+        )
+    # What each response would pay if it read the version from the cache.
+    round_trip = best(partial(catalogue.cache.get, catalogue.version_key), args.number)
+    print(f"cache round trip {round_trip * 1e6:.2f} µs (not paid per response)")
+    verdict = "within" if worst < BUDGET else "OVER"
+    print(
+        f"worst overhead {worst * 1e6:.2f} µs: {verdict} the {BUDGET * 1e6:.0f} µs budget"
+    )
+    return 0 if worst < BUDGET else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
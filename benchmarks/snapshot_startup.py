@@ -0,0 +1,82 @@
+"""
+Benchmark loading a catalogue snapshot, the work a read node does at startup.
+
+    python benchmarks/snapshot_startup.py [--licenses 600] [--number 20]
+
+Writes snapshots of ``--licenses`` licenses (SPDX-sized by default, texts
+borrowed from the bundled Creative Commons fixture) without and with text, and
+times ``LicenseCatalogue.load_snapshot()`` on each. Each figure is the best of
+five runs, per load.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from functools import partial
+from itertools import cycle, islice
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from licensing.bundle import BUNDLED_FIXTURE, read_fixture  # noqa: E402
+from licensing.cache import SNAPSHOT_FORMAT, LicenseCatalogue  # noqa: E402
+
+
+def write_snapshot(path, count, include_text):
+    fields = LicenseCatalogue.fields + (
+        LicenseCatalogue.text_fields if include_text else ()
+    )
+    records = islice(cycle(read_fixture(BUNDLED_FIXTURE)), count)
+    rows = []
+    for pk, record in enumerate(records, start=1):
+        values = record["fields"]
+        row = [pk, f"{values['name']} #{pk}", f"{values['slug']}-{pk}"]
+        row += [values["canonical_url"], values["is_active"]]
+        if include_text:
+            row += [values["description"], values["text"]]
+        rows.append(row)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "created": "",
+                "fields": fields,
+                "licenses": rows,
+            },
+            fp,
+            separators=(",", ":"),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=600)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'snapshot':<12}{'size':>10}{'per load':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for include_text in (False, True):
+            path = Path(directory) / f"snapshot-{include_text}.json"
+            write_snapshot(path, args.licenses, include_text)
+            catalogue = LicenseCatalogue()
+            seconds = min(
+                timeit.repeat(
+                    partial(catalogue.load_snapshot, path), number=args.number, repeat=5
+                )
+            )
+            label = "with text" if include_text else "light"
+            size = path.stat().st_size / 1024
+            print(f"{label:<12}{size:>7.0f} KB{seconds / args.number * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:17
+
+import django.db.models.deletion
+import licensing.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0003_rename_license_testmodel_content_license'),
+        ('licensing', '0004_license_autocomplete_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MirroredTestModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_license_name', models.CharField(blank=True, editable=False, help_text='Copied from the license; do not edit.', max_length=255, null=True, verbose_name='license name')),
+                ('content_license_slug', models.SlugField(blank=True, db_index=False, editable=False, help_text='Copied from the license; do not edit.', max_length=255, null=True, verbose_name='license slug')),
+                ('content_license_canonical_url', models.URLField(blank=True, editable=False, help_text='Copied from the license; do not edit.', max_length=500, null=True, verbose_name='license canonical url')),
+                ('content_license', licensing.fields.LicenseField(help_text='The license under which this content is published', mirror=('name', 'slug', 'canonical_url'), on_delete=django.db.models.deletion.PROTECT, to='licensing.license', verbose_name='license')),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:15
+
+import licensing.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('example', '0004_mirroredtestmodel'),
+        ('licensing', '0010_license_attribution_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultiLicensedTestModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('licenses', licensing.fields.LicensesField(help_text='The licenses under which this content is available', to='licensing.license', verbose_name='licenses')),
+            ],
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.urls import reverse
 
-from licensing.fields import LicenseField
+from licensing.fields import LicenseField, LicensesField
+from licensing.managers import LicensedQuerySet
 
 
 class TestModel(models.Model):
@@ -9,5 +10,22 @@ class TestModel(models.Model):
         LicenseField()
     )  # Renamed from 'license' to avoid shadowing builtin
 
+    objects = LicensedQuerySet.as_manager()
+
+    def get_absolute_url(self):
+        return reverse("example_detail", kwargs={"pk": self.pk})
+
+
+class MirroredTestModel(models.Model):
+    content_license = LicenseField(mirror=("name", "slug", "canonical_url"))
+
+    objects = LicensedQuerySet.as_manager()
+
+
+class MultiLicensedTestModel(models.Model):
+    licenses: LicensesField = LicensesField()
+
+    objects = LicensedQuerySet.as_manager()
+
     def get_absolute_url(self):
         return reverse("example_detail", kwargs={"pk": self.pk})
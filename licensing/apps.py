@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 
@@ -7,3 +8,12 @@ class LicensingConfig(AppConfig):
     name = "licensing"
     verbose_name = _("licensing")
     verbose_name_plural = _("licensing")
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        snapshot = getattr(settings, "LICENSING_SNAPSHOT", None)
+        if snapshot:
+            from .cache import catalogue
+
+            catalogue.load_snapshot(snapshot)
@@ -0,0 +1,494 @@
+"""
+Rendering attribution: the HTML snippet, from the license's own compiled
+template if it has one, optionally through a version-stamped cache;
+machine-readable JSON-LD and RDFa for single objects or whole lists; and
+one combined block for a whole collection.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.template import Context, Engine, Library, TemplateSyntaxError, defaulttags
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from .cache import CatalogueEntry, VersionedCache, catalogue
+from .utils import get_license_attribution, html_snippet, licenses_snippet
+
+logger = logging.getLogger(__name__)
+
+
+#: The built-in tags a license's own template may use: none of them reads
+#: anything but the template's context.
+SAFE_TAGS = (
+    "autoescape",
+    "comment",
+    "cycle",
+    "filter",
+    "firstof",
+    "for",
+    "if",
+    "ifchanged",
+    "load",
+    "now",
+    "regroup",
+    "resetcycle",
+    "spaceless",
+    "templatetag",
+    "widthratio",
+    "with",
+)
+
+
+class AttributionEngine(Engine):
+    """The template engine for ``License.attribution_template``, which admins
+    type in.
+
+    It has no loaders, so ``{% include %}`` and ``{% extends %}`` cannot pull
+    in other templates; of the built-in tags only :data:`SAFE_TAGS` (no
+    ``{% debug %}``, ``{% url %}`` or ``{% csrf_token %}``), all the built-in
+    filters, and ``i18n`` as the one loadable library.
+    """
+
+    default_builtins = ["django.template.defaultfilters"]
+
+    def __init__(self):
+        super().__init__(loaders=[], libraries={"i18n": "django.templatetags.i18n"})
+        tags = Library()
+        tags.tags = {name: defaulttags.register.tags[name] for name in SAFE_TAGS}
+        self.template_builtins.append(tags)
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateCreators:
+    """The creators as a license's own template sees them."""
+
+    name: str
+    url: str | None
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return self.url
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateObject:
+    """The licensed object as a license's own template sees it: its title, URL
+    and creators, rather than the model instance and its relations."""
+
+    title: str
+    url: str | None
+    creators: TemplateCreators | None
+
+    def __str__(self):
+        return self.title
+
+    def get_absolute_url(self):
+        return self.url
+
+    @classmethod
+    def of(cls, instance):
+        attribution = get_license_attribution(instance)
+        creators = None
+        if getattr(instance, "creators", None):
+            creators = TemplateCreators(
+                str(attribution["creators"]), attribution["creators_link"]
+            )
+        return cls(str(attribution["title"]), attribution["link"], creators)
+
+
+class AttributionTemplates:
+    """The licenses' own attribution templates (``License.attribution_template``),
+    compiled.
+
+    All of them are read in one query and compiled the first time one is needed
+    after the catalogue version changes, so an edit is picked up and rendering
+    never parses a template. A compiled template translates as it renders, so
+    one serves every language; the rendered snippets are what
+    :class:`AttributionRenderer` caches per language. With the catalogue served
+    from a snapshot there is no database to read, and every license uses
+    ``licensing/snippet.html``.
+
+    Templates are compiled by :class:`AttributionEngine` and see the object
+    and license only through :class:`TemplateObject` and the license's
+    catalogue columns (:class:`~licensing.cache.CatalogueEntry`), so what an admin types cannot
+    reach other templates or walk the object's relations.
+    """
+
+    def __init__(self):
+        self._compiled = VersionedCache(self._compile)
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = AttributionEngine()
+        return self._engine
+
+    def compile(self, source):
+        """Compile ``source``; raises ``TemplateSyntaxError`` if it is invalid
+        or uses a tag or library :class:`AttributionEngine` leaves out."""
+        return self.engine.from_string(source)
+
+    def _compile(self):
+        from .models import License
+
+        queryset = License.objects.db_manager(hints={"primary": True})
+        compiled = {}
+        for pk, source in queryset.exclude(attribution_template="").values_list(
+            "pk", "attribution_template"
+        ):
+            try:
+                compiled[pk] = self.compile(source)
+            except TemplateSyntaxError as e:
+                # Saved past License.clean(): fall back to the default.
+                logger.warning(
+                    "Attribution template of license %s is invalid: %s", pk, e
+                )
+        return compiled
+
+    def compiled(self):
+        """``{license pk: Template}`` for the licenses that have a template."""
+        if catalogue.from_snapshot:
+            return {}
+        return self._compiled.get()
+
+    def get(self, pk):
+        """The compiled template of license ``pk``, or ``None`` to use
+        ``licensing/snippet.html``."""
+        return self.compiled().get(pk)
+
+    def render(self, template, instance, license_obj, default):
+        """Render a license's ``template`` for ``instance``; ``default`` is the
+        standard attribution, rendered only if the template uses it."""
+        if hasattr(license_obj, "_meta"):
+            # A License instance: only its catalogue columns.
+            license_obj = CatalogueEntry(
+                license_obj.pk,
+                license_obj.name,
+                license_obj.slug,
+                license_obj.canonical_url,
+                license_obj.is_active,
+            )
+        context = {
+            "object": TemplateObject.of(instance),
+            "license": license_obj,
+            "default": default,
+        }
+        return template.render(Context(context))
+
+
+templates = AttributionTemplates()
+
+
+class AttributionRenderer:
+    """Renders the attribution snippet for a license field: the license's own
+    template (:class:`AttributionTemplates`) or ``licensing/snippet.html``.
+
+    Backs every ``get_<field>_display()`` method. With ``LICENSING_CACHE_SNIPPETS``
+    enabled, snippets are cached in the ``LICENSING_CACHE`` cache under a key
+    built from the catalogue version, the active language, the license and the
+    object's own attribution inputs (title, link, creators). A license edit
+    bumps the version and an object edit changes its inputs, so stale snippets
+    are never served and nothing needs deleting.
+    """
+
+    @property
+    def enabled(self):
+        return getattr(settings, "LICENSING_CACHE_SNIPPETS", False)
+
+    def cache_key(self, instance, field):
+        attribution = get_license_attribution(instance)
+        inputs = repr(
+            (
+                attribution["title"],
+                attribution["link"],
+                str(attribution["creators"]),
+                attribution["creators_link"],
+            )
+        )
+        return catalogue.make_key(
+            "snippet",
+            instance._meta.label_lower,
+            instance.pk,
+            field.name,
+            get_language(),
+            self.licenses_key(instance, field),
+            hashlib.blake2b(inputs.encode(), digest_size=8).hexdigest(),
+        )
+
+    @staticmethod
+    def licenses_key(instance, field):
+        if field.many_to_many:
+            # From the prefetched licenses when there are some.
+            licenses = getattr(instance, field.name).all()
+            return "-".join(str(license_obj.pk) for license_obj in licenses)
+        return getattr(instance, field.attname)
+
+    def render(self, instance, field):
+        """Render the snippet, bypassing the cache."""
+        if field.many_to_many:
+            return licenses_snippet(instance, field.name)
+        return html_snippet(instance, field_name=field.display_source)
+
+    def get(self, instance, field):
+        """The snippet for ``instance``'s ``field``, from the cache if enabled."""
+        if not self.enabled:
+            return self.render(instance, field)
+        key = self.cache_key(instance, field)
+        html = catalogue.cache.get(key)
+        if html is None:
+            html = self.render(instance, field)
+            catalogue.cache.set(key, html)
+        return html
+
+    def refresh(self, instance, field):
+        """Render the snippet and store it, whether or not it was cached."""
+        html = self.render(instance, field)
+        catalogue.cache.set(self.cache_key(instance, field), html)
+        return html
+
+
+renderer = AttributionRenderer()
+
+
+def attribution_snippet(instance, field):
+    """``get_<field>_display()``: the attribution for ``instance``'s ``field``."""
+    return renderer.get(instance, field)
+
+
+def render_all(objects, field_name):
+    """``get_<field>_display()`` for every object, as a list, in one batch.
+
+    An unevaluated queryset first gets what the field's attribution reads
+    loaded in bulk (the license join, or for a ``LicensesField`` one prefetch
+    query), so the batch costs a fixed number of queries however many
+    objects there are.
+    """
+    if isinstance(objects, QuerySet) and objects._result_cache is None:
+        objects = objects.model._meta.get_field(field_name).attribution_queryset(
+            objects
+        )
+    return [renderer.get(obj, obj._meta.get_field(field_name)) for obj in objects]
+
+
+@dataclass(frozen=True, slots=True)
+class Attribution:
+    """Everything an attribution names, resolved once per object.
+
+    ``licenses`` holds the one license of a ``LicenseField``, or each license
+    of a ``LicensesField``; it is empty for an unlicensed object.
+    """
+
+    object: object
+    title: str
+    url: str | None
+    creators: str
+    creators_url: str | None
+    licenses: tuple[CatalogueEntry, ...]
+
+    @property
+    def license(self):
+        """The first of :attr:`licenses`, or ``None``."""
+        return self.licenses[0] if self.licenses else None
+
+
+@dataclass(frozen=True, slots=True)
+class CreatorCredit:
+    """A creator and their works under one license."""
+
+    name: str
+    url: str | None
+    works: tuple[Attribution, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LicenseCredit:
+    """The works of a collection under one license, and their named creators."""
+
+    license: CatalogueEntry
+    works: tuple[Attribution, ...]
+    creators: tuple[CreatorCredit, ...]
+
+
+# The characters json_script() escapes, so the JSON cannot close the tag.
+_SCRIPT_ESCAPES = {ord(">"): "\\u003E", ord("<"): "\\u003C", ord("&"): "\\u0026"}
+
+
+class AttributionResolver:
+    """Resolves the attribution of whole lists of objects in one pass, and
+    renders it as schema.org JSON-LD or RDFa.
+
+    Licenses come from the catalogue cache rather than the foreign key, so a
+    list costs its own query however many objects it holds. RDFa and the
+    combined collection block are each rendered in a single template pass.
+    """
+
+    rdfa_template = "licensing/rdfa.html"
+    collection_template = "licensing/collection.html"
+
+    @staticmethod
+    def with_creators(queryset):
+        """Join ``creators`` to the rows when it is a foreign key.
+
+        Attribution names creators with ``str(obj.creators)``, which for a
+        many-valued relation is its manager, so prefetching one would buy nothing.
+        """
+        try:
+            creators = queryset.model._meta.get_field("creators")
+        except FieldDoesNotExist:
+            return queryset
+        if creators.many_to_one or creators.one_to_one:
+            return queryset.select_related("creators")
+        return queryset
+
+    def resolve(self, objects, field_name, request=None):
+        """Yield an :class:`Attribution` per object.
+
+        An unevaluated queryset gets its creators loaded in bulk, and for a
+        ``LicensesField`` its licenses prefetched, so resolving a list adds no
+        per-object queries. With ``request``, URLs are made absolute.
+        """
+        if isinstance(objects, QuerySet) and objects._result_cache is None:
+            objects = self.with_creators(objects)
+            field = objects.model._meta.get_field(field_name)
+            if field.many_to_many:
+                objects = field.attribution_queryset(objects)
+        absolute = (
+            request.build_absolute_uri if request is not None else (lambda url: url)
+        )
+        for obj in objects:
+            attribution = get_license_attribution(obj)
+            url, creators_url = attribution["link"], attribution["creators_link"]
+            yield Attribution(
+                object=obj,
+                title=str(attribution["title"]),
+                url=absolute(url) if url else None,
+                creators=str(attribution["creators"]),
+                creators_url=absolute(creators_url) if creators_url else None,
+                licenses=self.licenses(obj, field_name),
+            )
+
+    @staticmethod
+    def licenses(obj, field_name):
+        """The catalogue entries of ``obj``'s licenses in the field ``field_name``.
+
+        A ``LicensesField``'s are read from ``<field>.all()``, prefetched or not.
+        """
+        field = obj._meta.get_field(field_name)
+        if field.many_to_many:
+            pks = [license_obj.pk for license_obj in getattr(obj, field.name).all()]
+        else:
+            pks = [getattr(obj, field.attname)]
+        entries = (catalogue.get(pk) for pk in pks if pk is not None)
+        return tuple(entry for entry in entries if entry is not None)
+
+    def jsonld(self, objects, field_name, request=None, creator_type="Person"):
+        """One ``<script type="application/ld+json">`` describing every object.
+
+        Each object becomes a schema.org ``CreativeWork`` with its ``license``;
+        a list is emitted as a single ``@graph``, so a listing page carries one
+        script however many items it shows.
+        """
+        works = []
+        for attribution in self.resolve(objects, field_name, request):
+            if not attribution.licenses:
+                continue
+            urls = [entry.canonical_url for entry in attribution.licenses]
+            work = {
+                "@type": "CreativeWork",
+                "name": attribution.title,
+                # schema.org takes a list for a work under several licenses.
+                "license": urls[0] if len(urls) == 1 else urls,
+            }
+            if attribution.url:
+                work["url"] = attribution.url
+            if getattr(attribution.object, "creators", None):
+                creator = {"@type": creator_type, "name": attribution.creators}
+                if attribution.creators_url:
+                    creator["url"] = attribution.creators_url
+                work["creator"] = creator
+            works.append(work)
+        data = {"@context": "https://schema.org", "@graph": works}
+        encoded = json.dumps(data, cls=DjangoJSONEncoder).translate(_SCRIPT_ESCAPES)
+        return format_html(
+            '<script type="application/ld+json">{}</script>', mark_safe(encoded)
+        )
+
+    def rdfa(self, objects, field_name, request=None):
+        """RDFa attribution markup per object, using schema.org terms.
+
+        Each object is a ``CreativeWork`` element whose license links carry
+        ``rel="license"``. ``rdfa_template`` renders them all, with
+        ``attributions`` in its context.
+        """
+        attributions = [
+            attribution
+            for attribution in self.resolve(objects, field_name, request)
+            if attribution.licenses
+        ]
+        return render_to_string(
+            self.rdfa_template, {"attributions": attributions}, request=request
+        )
+
+    def collect(self, objects, field_name, request=None):
+        """Group ``objects`` by license, then by creator, in one pass.
+
+        Returns :class:`LicenseCredit`\\ s ordered by license name. Their creators
+        come most works first. A work under several licenses counts under each.
+        Objects without a license are left out, and so are objects without
+        creators from the creator lists (not from ``works``). Resolved like
+        :meth:`resolve`, so a queryset costs its own query and at most one for
+        the licenses.
+        """
+        groups = {}
+        for attribution in self.resolve(objects, field_name, request):
+            for license_entry in attribution.licenses:
+                works, creators = groups.setdefault(license_entry, ([], {}))
+                works.append(attribution)
+                if getattr(attribution.object, "creators", None):
+                    key = (attribution.creators, attribution.creators_url)
+                    creators.setdefault(key, []).append(attribution)
+        return [
+            LicenseCredit(
+                license=license_entry,
+                works=tuple(works),
+                creators=tuple(
+                    CreatorCredit(name, url, tuple(credited))
+                    for (name, url), credited in sorted(
+                        creators.items(), key=lambda item: (-len(item[1]), item[0][0])
+                    )
+                ),
+            )
+            for license_entry, (works, creators) in sorted(
+                groups.items(), key=lambda item: item[0].name
+            )
+        ]
+
+    def collection(self, objects, field_name, request=None, template_name=None):
+        """One attribution block for a whole collection: per license, how many
+        works it covers and who created them.
+
+        Rendered in a single pass of ``template_name`` (default
+        ``collection_template``), with ``credits`` (from :meth:`collect`) in its
+        context, however many objects there are.
+        """
+        license_credits = self.collect(objects, field_name, request)
+        return render_to_string(
+            template_name or self.collection_template,
+            {"credits": license_credits},
+            request=request,
+        )
+
+
+resolver = AttributionResolver()
@@ -0,0 +1,41 @@
+"""
+Work a license write sets off, run after the commit and off the request thread.
+
+One worker thread runs the jobs, one at a time, in the order they were
+submitted. Jobs carry a key, and a job whose key is already waiting is not
+queued again: a bulk edit saving N licenses runs each follow-up once more
+after the run in progress, not N times over.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.db import connections
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="licensing")
+_lock = threading.Lock()
+#: Submitted jobs that have not started yet, by key.
+_waiting: dict[object, Future] = {}
+
+
+def _run(key, fn, args):
+    with _lock:
+        # From here on, a new submission queues a fresh run: this one may have
+        # read the data before the write that prompted it.
+        _waiting.pop(key, None)
+    try:
+        return fn(*args)
+    finally:
+        # Django opens a connection per thread; don't leave this one's open.
+        connections.close_all()
+
+
+def submit(key, fn, *args):
+    """Run ``fn(*args)`` on the background worker, unless a job with ``key``
+    is already waiting to start. Returns the job's ``Future``."""
+    with _lock:
+        future = _waiting.get(key)
+        if future is None:
+            future = _executor.submit(_run, key, fn, args)
+            _waiting[key] = future
+    return future
@@ -0,0 +1,136 @@
+"""
+A memory-mapped, indexed format for the bundled license catalogue.
+
+``creativecommons.json.gz`` has to be decompressed and parsed whole to read any
+one license. A bundle keeps the same records uncompressed behind a small offset
+index, so opening one reads only the index, and a license's metadata or text is
+a slice of the memory-mapped file::
+
+    header   magic (8 bytes), format (u32), index length (u32), little-endian
+    index    JSON: {"licenses": [[pk, slug, meta_offset, meta_length,
+                                  text_offset, text_length], ...]}
+    data     per license: its metadata as JSON, then its text as UTF-8
+
+Offsets are from the start of the data section. Nothing here needs Django, so
+tooling and benchmarks can use it without settings.
+"""
+
+import gzip
+import json
+import mmap
+import struct
+from pathlib import Path
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+#: The Creative Commons catalogue as a bundle, built from its fixture. Kept in
+#: the repository for the benchmark and tests, but not shipped in the package.
+BUNDLED_CATALOGUE = FIXTURES / "creativecommons.bundle"
+BUNDLED_FIXTURE = FIXTURES / "creativecommons.json.gz"
+
+MAGIC = b"LICBNDL\x00"
+#: Bumped whenever the layout changes incompatibly.
+FORMAT = 1
+_HEADER = struct.Struct("<8sII")
+
+
+def read_fixture(path):
+    """The ``licensing.license`` records of a (possibly gzipped) JSON fixture."""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fp:
+        return [
+            record for record in json.load(fp) if record["model"] == "licensing.license"
+        ]
+
+
+class LicenseBundle:
+    """Read-only access to a bundle file; see the module docstring for the layout.
+
+    Licenses are looked up by slug or primary key. Use it as a context manager,
+    or call :meth:`close`, to release the mapping.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, index_length = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a license bundle.")
+        if version != FORMAT:
+            self.close()
+            raise ValueError(f"{path} has bundle format {version}; expected {FORMAT}.")
+        index = json.loads(self._map[_HEADER.size : _HEADER.size + index_length])
+        self._base = _HEADER.size + index_length
+        self._by_slug = {row[1]: row for row in index["licenses"]}
+        self._by_pk = {row[0]: row for row in index["licenses"]}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return len(self._by_slug)
+
+    def __contains__(self, key):
+        return self._row(key) is not None
+
+    def slugs(self):
+        """Every slug in the bundle, sorted."""
+        return sorted(self._by_slug)
+
+    def _row(self, key):
+        return self._by_pk.get(key) if isinstance(key, int) else self._by_slug.get(key)
+
+    def metadata(self, key):
+        """Every field but ``text`` for the license ``key``, plus ``pk``, or ``None``."""
+        row = self._row(key)
+        if row is None:
+            return None
+        _, _, offset, length, _, _ = row
+        offset += self._base
+        return json.loads(self._map[offset : offset + length])
+
+    def text(self, key):
+        """The full text of the license ``key``, or ``None``."""
+        row = self._row(key)
+        if row is None:
+            return None
+        _, _, _, _, offset, length = row
+        offset += self._base
+        return self._map[offset : offset + length].decode("utf-8")
+
+    @staticmethod
+    def write(records, fp):
+        """Write fixture ``records`` to the binary file ``fp`` as a bundle.
+
+        The output depends only on the records, so rebuilding an unchanged
+        fixture gives a byte-identical bundle.
+        """
+        blobs = []
+        for record in sorted(records, key=lambda record: record["fields"]["slug"]):
+            fields = dict(record["fields"])
+            text = fields.pop("text", "").encode("utf-8")
+            meta = json.dumps(
+                {"pk": record["pk"], **fields}, sort_keys=True, separators=(",", ":")
+            ).encode("utf-8")
+            blobs.append((record["pk"], fields["slug"], meta, text))
+
+        rows, offset = [], 0
+        for pk, slug, meta, text in blobs:
+            rows.append([pk, slug, offset, len(meta), offset + len(meta), len(text)])
+            offset += len(meta) + len(text)
+        index = json.dumps({"licenses": rows}, separators=(",", ":")).encode("utf-8")
+
+        fp.write(_HEADER.pack(MAGIC, FORMAT, len(index)))
+        fp.write(index)
+        for _, _, meta, text in blobs:
+            fp.write(meta)
+            fp.write(text)
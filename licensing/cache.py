@@ -0,0 +1,459 @@
+"""
+In-process cache of the license catalogue.
+
+Pickers, autocomplete and attribution only need a handful of a license's
+columns, and the catalogue changes rarely. :data:`catalogue` keeps those
+columns in memory, stamped with a version that every write to ``License`` bumps
+(see :mod:`licensing.signals` and :class:`~licensing.models.LicenseQuerySet`),
+and reloads them on the first read after a bump.
+
+The version is a counter in Django's cache (the ``LICENSING_CACHE`` alias,
+``"default"`` unless set), so a bump in one process is seen by every other one.
+Cache entries derived from the catalogue embed the version in their keys
+(:meth:`LicenseCatalogue.make_key`): invalidating them all is one ``incr``.
+
+Nodes without a database can serve the catalogue from a snapshot file instead
+(``LICENSING_SNAPSHOT``, written by the ``export_license_snapshot`` command).
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .utils import license_html
+
+logger = logging.getLogger(__name__)
+
+#: Bumped whenever the snapshot layout changes incompatibly.
+SNAPSHOT_FORMAT = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogueEntry:
+    """The columns of a :class:`~licensing.models.License` worth caching."""
+
+    pk: int
+    name: str
+    slug: str
+    canonical_url: str
+    is_active: bool
+
+    def __str__(self):
+        return self.name
+
+
+class LicenseCatalogue:
+    """Version-stamped copy of the catalogue's lightweight columns.
+
+    ``text`` and ``description`` are never loaded. Reads are lock-free; a read
+    that races a bump may load the old rows once more, but it stores them under
+    the version it saw, so the next read reloads.
+
+    The loaded rows are shared through the cache too, under the version, so
+    after a bump one process queries the database and the others reuse its
+    result. Rows read inside a transaction are kept to the process, since the
+    transaction may yet roll back, and rows read inside one that has itself
+    written to the catalogue are kept to the thread (see :meth:`uncommitted`).
+    """
+
+    fields = ("pk", "name", "slug", "canonical_url", "is_active")
+    #: The heavy columns a snapshot can optionally carry as well.
+    text_fields = ("description", "text")
+    version_key = "licensing:catalogue:version"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._local = threading.local()
+        self._snapshot = None
+        self._alias = None
+        # The last version read, and when (see recent_version()).
+        self._recent = None
+
+    @property
+    def cache(self):
+        # Read on every catalogue access, so the alias is looked up once rather
+        # than through settings each time; reset_cache() forgets it.
+        if self._alias is None:
+            self._alias = getattr(settings, "LICENSING_CACHE", "default")
+        return caches[self._alias]
+
+    def reset_cache(self):
+        """Re-read ``LICENSING_CACHE`` on next use (settings have changed)."""
+        self._alias = None
+
+    def _restart(self):
+        # The counter was never set, or was evicted: restart it from the clock,
+        # above any value an earlier counter reached, so no process takes the
+        # entries it holds for a newer version.
+        self.cache.add(self.version_key, time.time_ns() // 1000, timeout=None)
+
+    @property
+    def version(self):
+        """The catalogue version shared by every process, or ``None`` if the
+        cache is unavailable (every read then reloads)."""
+        version = self.cache.get(self.version_key)
+        if version is None:
+            self._restart()
+            version = self.cache.get(self.version_key)
+        self._recent = (version, time.monotonic())
+        return version
+
+    def recent_version(self, max_age):
+        """The version as this process last read it, if that was less than
+        ``max_age`` seconds ago, else :attr:`version`.
+
+        Saves the cache round trip for readers that can tolerate a bump made
+        by another process reaching them up to ``max_age`` seconds late. A
+        bump in this process forgets the remembered version.
+        """
+        recent = self._recent
+        if (
+            recent is not None
+            and recent[0] is not None
+            and time.monotonic() - recent[1] < max_age
+        ):
+            return recent[0]
+        return self.version
+
+    def bump(self):
+        """Move to a new version, so the next read in any process reloads."""
+        self._recent = None
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self._restart()
+
+    def make_key(self, *parts, version=None):
+        """A cache key for data derived from the catalogue at ``version``,
+        the current one by default."""
+        if version is None:
+            version = self.version
+        return ":".join(("licensing", str(version), *map(str, parts)))
+
+    def invalidate(self, using=None):
+        """Call after any write to ``License`` on the database ``using``.
+
+        Bumps now, so this thread stops reading the old entries, and again on
+        commit, so entries another thread loaded mid-transaction are not kept.
+        """
+        self.bump()
+        connection = transaction.get_connection(using)
+        if connection.in_atomic_block:
+            self._local.connection = connection
+        transaction.on_commit(self.bump, using=using)
+
+    def uncommitted(self):
+        """How many writes to the catalogue this thread's open transaction has
+        made, ``0`` outside one.
+
+        A rollback bumps nothing, so what such a transaction reads must never
+        be kept for the process under the version: it is kept to the thread,
+        and keyed on this count too, so rolling back to a savepoint drops it.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return 0
+        # The commit bumps stay queued until the transaction commits, and are
+        # dropped on rollback, with the transaction or savepoint they were
+        # queued in.
+        count = sum(1 for entry in connection.run_on_commit if entry[1] == self.bump)
+        if not count:
+            del self._local.connection
+        return count
+
+    @staticmethod
+    def _shareable(db):
+        # What is read inside a transaction may yet roll back.
+        return not transaction.get_connection(db).in_atomic_block
+
+    def _load(self, max_age=0):
+        if self._snapshot is not None:
+            return self._snapshot
+        version = self.recent_version(max_age) if max_age else self.version
+        uncommitted = self.uncommitted()
+        if uncommitted:
+            version_seen = (version, uncommitted)
+            state = getattr(self._local, "state", None)
+        else:
+            version_seen = version
+            state = self._state
+        if version is None or state is None or state[0] != version_seen:
+            from .models import License
+
+            rows = None
+            if version is not None and not uncommitted:
+                key = self.make_key("catalogue", version=version)
+                rows = self.cache.get(key)
+            if rows is None:
+                # Read from the primary when a replica router is in use: these
+                # rows are shared under the new version, so they must not lag.
+                queryset = License.objects.db_manager(hints={"primary": True})
+                rows = list(queryset.order_by("name").values_list(*self.fields))
+                if (
+                    version is not None
+                    and not uncommitted
+                    and self._shareable(queryset.db)
+                ):
+                    self.cache.set(key, rows)
+            entries = tuple(CatalogueEntry(*row) for row in rows)
+            state = (
+                version_seen,
+                entries,
+                {entry.pk: entry for entry in entries},
+                {entry.slug: entry for entry in entries},
+                {},
+            )
+            if uncommitted:
+                self._local.state = state
+            else:
+                self._state = state
+        return state
+
+    def dump_snapshot(self, fp, include_text=False):
+        """Write the catalogue to the text file ``fp`` as a compact JSON snapshot.
+
+        Read straight from the database, not the cache. ``include_text`` adds
+        ``description`` and ``text``, so licenses loaded from the snapshot never
+        need the database at all. Returns the number of licenses written.
+        """
+        from .models import License
+
+        fields = self.fields + (self.text_fields if include_text else ())
+        rows = list(License.objects.order_by("name").values_list(*fields))
+        json.dump(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "created": timezone.now().isoformat(),
+                "fields": fields,
+                "licenses": rows,
+            },
+            fp,
+            separators=(",", ":"),
+        )
+        return len(rows)
+
+    def load_snapshot(self, path):
+        """Serve the catalogue from the snapshot at ``path`` from now on.
+
+        Bumps stop reloading from the database; call again to pick up a new
+        snapshot, or :meth:`unload_snapshot` to go back to the database.
+        Returns the number of licenses loaded.
+        """
+        start = time.perf_counter()
+        try:
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError) as e:
+            raise ImproperlyConfigured(
+                f"Cannot read license snapshot {path}: {e}"
+            ) from e
+        if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+            found = data.get("format") if isinstance(data, dict) else None
+            raise ImproperlyConfigured(
+                f"License snapshot {path} has format {found!r}; "
+                f"this version reads format {SNAPSHOT_FORMAT}."
+            )
+        try:
+            fields = data["fields"]
+            if list(fields[: len(self.fields)]) != list(self.fields):
+                raise ImproperlyConfigured(
+                    f"License snapshot {path} has unexpected fields."
+                )
+            size = len(self.fields)
+            entries = tuple(CatalogueEntry(*row[:size]) for row in data["licenses"])
+            extras = {
+                row[0]: dict(zip(fields[size:], row[size:], strict=True))
+                for row in data["licenses"]
+                if len(row) > size
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            raise ImproperlyConfigured(
+                f"License snapshot {path} is malformed: {e!r}"
+            ) from e
+        with self._lock:
+            self._snapshot = (
+                None,
+                entries,
+                {entry.pk: entry for entry in entries},
+                {entry.slug: entry for entry in entries},
+                extras,
+            )
+        logger.info(
+            "Loaded %d license(s) from snapshot %s in %.1f ms.",
+            len(entries),
+            path,
+            (time.perf_counter() - start) * 1000,
+        )
+        return len(entries)
+
+    def unload_snapshot(self):
+        """Go back to serving the catalogue from the database."""
+        with self._lock:
+            self._snapshot = None
+            self._state = None
+
+    def entries(self):
+        """All licenses, name-ordered, as :class:`CatalogueEntry` tuples."""
+        return self._load()[1]
+
+    def get(self, pk, max_age=0):
+        """The entry for ``pk``, or ``None`` if there is no such license.
+
+        With ``max_age``, the version is checked through
+        :meth:`recent_version`.
+        """
+        return self._load(max_age)[2].get(pk)
+
+    def get_by_slug(self, slug):
+        """The entry for ``slug``, or ``None`` if there is no such license."""
+        return self._load()[3].get(slug)
+
+    @property
+    def from_snapshot(self):
+        """Whether the catalogue is being served from a snapshot file."""
+        return self._snapshot is not None
+
+    def license(self, pk):
+        """A ``License`` instance built from the cache, without a query.
+
+        The instance behaves as if loaded with ``.only(*fields)``: it is bound to
+        its database row and can be assigned to a ``LicenseField``, but reading
+        ``text`` or ``description`` fetches them — unless a snapshot that
+        includes them is loaded. Returns ``None`` for an unknown ``pk``.
+        """
+        from .models import License
+
+        state = self._load()
+        entry = state[2].get(pk)
+        if entry is None:
+            return None
+        # from_db() takes the loaded values in concrete field order.
+        loaded = {
+            "id": entry.pk,
+            **{f: getattr(entry, f) for f in self.fields[1:]},
+            **state[4].get(pk, {}),
+        }
+        fields = [
+            f.attname for f in License._meta.concrete_fields if f.attname in loaded
+        ]
+        return License.from_db(
+            router.db_for_read(License), fields, [loaded[f] for f in fields]
+        )
+
+    def last_modified(self):
+        """The newest ``updated_at`` in the catalogue, or ``None``.
+
+        Cached under the version like the rows, so answering a conditional
+        request reads neither the rows nor the database. ``None`` when serving
+        a snapshot.
+        """
+        if self._snapshot is not None:
+            return None
+        from .models import License
+
+        key = self.make_key("last_modified")
+        value = self.cache.get(key)
+        if value is None:
+            queryset = License.objects.db_manager(hints={"primary": True})
+            value = queryset.aggregate(last_modified=Max("updated_at"))["last_modified"]
+            if value is not None and self._shareable(queryset.db):
+                self.cache.set(key, value)
+        return value
+
+    def rendered(self, pk):
+        """The license ``pk``'s ``description_html`` and ``text_html``.
+
+        Returns ``{"description_html": ..., "text_html": ...}`` (escaped, not yet
+        marked safe), or ``None`` for an unknown ``pk``. The HTML is rendered
+        when the license is saved; here it is read once per version and shared
+        through the cache. A snapshot that includes the text is rendered from
+        memory instead.
+        """
+        from .models import License
+
+        texts = self._snapshot[4].get(pk) if self._snapshot is not None else None
+        if texts is not None:
+            return {
+                License.html_fields[name]: license_html(texts.get(name))
+                for name in self.text_fields
+            }
+        key = self.make_key("rendered", pk)
+        html = self.cache.get(key)
+        if html is None:
+            queryset = License.objects.db_manager(hints={"primary": True})
+            html = queryset.filter(pk=pk).values(*License.html_fields.values()).first()
+            if html is None:
+                return None
+            if self._shareable(queryset.db):
+                self.cache.set(key, html)
+        return html
+
+    def autocomplete(self, term=""):
+        """The in-memory twin of :meth:`LicenseQuerySet.autocomplete`."""
+        term = term.strip().lower()
+        entries = self.entries()
+        if not term:
+            return sorted(entries, key=lambda entry: not entry.is_active)
+        matches = [
+            entry
+            for entry in entries
+            if term in entry.name.lower() or term in entry.slug.lower()
+        ]
+        # sorted() is stable, so the name order the entries were loaded in
+        # survives within each rank.
+        return sorted(
+            matches,
+            key=lambda entry: (
+                not entry.is_active,
+                not (
+                    entry.name.lower().startswith(term)
+                    or entry.slug.lower().startswith(term)
+                ),
+            ),
+        )
+
+
+catalogue = LicenseCatalogue()
+
+
+class VersionedCache:
+    """A value built from the database at most once per catalogue version.
+
+    ``build()`` runs on the first :meth:`get` after the version changes. Like
+    the catalogue's own rows, a value built inside a transaction that has
+    written to the catalogue is kept to the thread until the transaction ends.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._lock = threading.Lock()
+        self._state = (None, None)
+        self._local = threading.local()
+
+    def get(self):
+        version = catalogue.version
+        uncommitted = catalogue.uncommitted()
+        if uncommitted:
+            version_seen = (version, uncommitted)
+            built_version, value = getattr(self._local, "state", (None, None))
+        else:
+            version_seen = version
+            built_version, value = self._state
+        if version is None or value is None or built_version != version_seen:
+            value = self.build()
+            if uncommitted:
+                self._local.state = (version_seen, value)
+            else:
+                with self._lock:
+                    self._state = (version_seen, value)
+        return value
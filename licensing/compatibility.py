@@ -0,0 +1,158 @@
+"""
+Whether licenses can be combined, and under what, from an in-memory matrix.
+
+``LicenseCompatibility`` rows say that material under one license may go into
+a work released under another. :class:`CompatibilityMatrix` turns them into one
+bitmask per license: the licenses its material may end up under, itself
+included, closed transitively. The outcomes open to a combination are the AND
+of its members' masks. Bits are numbered most permissive license first, so the
+best outcome is the lowest set bit. Checking a few dozen licenses is a few
+dozen integer operations, a few microseconds.
+
+The matrix for the current catalogue version is built on first use after the
+version changes, with one query (:class:`CompatibilityChecker`).
+"""
+
+from dataclasses import dataclass
+
+from .cache import CatalogueEntry, VersionedCache, catalogue
+
+
+@dataclass(frozen=True, slots=True)
+class Combination:
+    """The licenses combined, and the most permissive one the result may carry
+    (``None`` if they cannot be combined)."""
+
+    licenses: tuple[CatalogueEntry, ...]
+    outcome: CatalogueEntry | None
+
+    @property
+    def compatible(self):
+        return self.outcome is not None
+
+
+class CompatibilityMatrix:
+    """Bitset compatibility of ``entries``, given ``(source_pk, target_pk)`` pairs.
+
+    Licenses are ranked from most to least permissive: active before
+    deprecated, then by how many licenses their material may go into, then by
+    name. Pairs naming a license outside ``entries`` are ignored.
+    """
+
+    def __init__(self, entries, pairs):
+        entries = list(entries)
+        index = {entry.pk: i for i, entry in enumerate(entries)}
+        reach = [1 << i for i in range(len(entries))]
+        for source, target in pairs:
+            if source in index and target in index:
+                reach[index[source]] |= 1 << index[target]
+        # Transitive closure (Warshall), a row at a time.
+        for k in range(len(entries)):
+            bit = 1 << k
+            for i, mask in enumerate(reach):
+                if mask & bit:
+                    reach[i] = mask | reach[k]
+
+        order = sorted(
+            range(len(entries)),
+            key=lambda i: (
+                not entries[i].is_active,
+                -reach[i].bit_count(),
+                entries[i].name,
+            ),
+        )
+        rank = [0] * len(entries)
+        for position, i in enumerate(order):
+            rank[i] = position
+        self.entries = tuple(entries[i] for i in order)
+        self._bit = {entry.pk: position for position, entry in enumerate(self.entries)}
+        self._reach = [0] * len(entries)
+        for i, mask in enumerate(reach):
+            ranked = 0
+            while mask:
+                low = mask & -mask
+                ranked |= 1 << rank[low.bit_length() - 1]
+                mask ^= low
+            self._reach[rank[i]] = ranked
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _position(self, license_obj):
+        pk = getattr(license_obj, "pk", license_obj)
+        try:
+            return self._bit[pk]
+        except KeyError:
+            raise LookupError(f"License {pk!r} is not in the catalogue.") from None
+
+    def _mask(self, positions):
+        mask = (1 << len(self.entries)) - 1
+        reach = self._reach
+        for position in positions:
+            mask &= reach[position]
+        return mask
+
+    def mask(self, licenses):
+        """The outcomes open to ``licenses`` as a bitmask over :attr:`entries`."""
+        return self._mask(map(self._position, licenses))
+
+    def _best(self, mask):
+        return self.entries[(mask & -mask).bit_length() - 1] if mask else None
+
+    def outcome(self, licenses):
+        """The most permissive license ``licenses`` may be combined under, or ``None``.
+
+        ``licenses`` are ``License`` instances, catalogue entries or pks.
+        """
+        return self._best(self.mask(licenses))
+
+    def outcomes(self, licenses):
+        """Every license ``licenses`` may be combined under, most permissive first."""
+        mask = self.mask(licenses)
+        return [
+            entry for position, entry in enumerate(self.entries) if mask >> position & 1
+        ]
+
+    def is_compatible(self, licenses):
+        return bool(self.mask(licenses))
+
+    def check(self, licenses):
+        """A :class:`Combination` of ``licenses``."""
+        positions = [self._position(license_obj) for license_obj in licenses]
+        return Combination(
+            tuple(self.entries[position] for position in positions),
+            self._best(self._mask(positions)),
+        )
+
+
+class CompatibilityChecker:
+    """Checks combinations against the :class:`CompatibilityMatrix` of the
+    current catalogue version.
+
+    The matrix is rebuilt from ``LicenseCompatibility`` (one query) and the
+    cached catalogue the first time it is used after the version changes.
+    """
+
+    def __init__(self):
+        self._matrix = VersionedCache(self._build)
+
+    @staticmethod
+    def _build():
+        from .models import LicenseCompatibility
+
+        queryset = LicenseCompatibility.objects.db_manager(hints={"primary": True})
+        return CompatibilityMatrix(
+            catalogue.entries(), queryset.values_list("source_id", "target_id")
+        )
+
+    def matrix(self):
+        """The :class:`CompatibilityMatrix` of the current catalogue version."""
+        return self._matrix.get()
+
+    def check(self, licenses):
+        """Whether ``licenses`` can be combined, and under what; see
+        :meth:`CompatibilityMatrix.check`."""
+        return self.matrix().check(licenses)
+
+
+checker = CompatibilityChecker()
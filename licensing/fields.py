@@ -1,15 +1,83 @@
+import functools
+import operator
+from dataclasses import dataclass
 from functools import partialmethod
 
+from django.apps import apps
+from django.core import checks
 from django.db import models
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+from django.utils.text import format_lazy
 from django.utils.translation import gettext_lazy as _
 
-from .utils import html_snippet
+from .attribution import attribution_snippet
+from .cache import catalogue
+from .forms import LicenseChoiceField
 
+#: License attributes a ``LicenseField`` can mirror, with their shadow columns.
+MIRRORABLE = {
+    "name": lambda **kwargs: models.CharField(max_length=255, **kwargs),
+    "slug": lambda **kwargs: models.SlugField(max_length=255, db_index=False, **kwargs),
+    "canonical_url": lambda **kwargs: models.URLField(max_length=500, **kwargs),
+}
 
-class LicenseField(models.ForeignKey):
-    """A custom foreign key field pointing to the License model"""
 
-    def __init__(self, *args, **kwargs):
+@dataclass(frozen=True, slots=True)
+class LicenseMirror:
+    """A license as a model's mirror columns recorded it."""
+
+    pk: int
+    name: str | None = None
+    slug: str | None = None
+    canonical_url: str | None = None
+
+    def __str__(self):
+        return self.name or ""
+
+
+class LicenseDescriptor(ForwardManyToOneDescriptor):
+    """Resolves licenses from a loaded catalogue snapshot, without the database."""
+
+    def get_object(self, instance):
+        if catalogue.from_snapshot:
+            license_obj = catalogue.license(getattr(instance, self.field.attname))
+            if license_obj is not None:
+                return license_obj
+        return super().get_object(instance)
+
+
+class InstalledFieldsMixin:
+    """``installed()`` for the license field classes."""
+
+    @classmethod
+    def installed(cls):
+        """Return every field of this class declared on an installed model.
+
+        Read from ``License``'s reverse relations, so it follows the app registry
+        rather than a list someone has to keep up to date.
+        """
+        License = apps.get_model("licensing", "License")
+        return [
+            rel.field
+            for rel in License._meta.related_objects
+            if isinstance(rel.field, cls)
+        ]
+
+
+class LicenseField(InstalledFieldsMixin, models.ForeignKey):
+    """A custom foreign key field pointing to the License model
+
+    ``mirror`` names license attributes (see :data:`MIRRORABLE`) to copy into
+    shadow columns on the model, ``<field>_<attribute>``. They are filled on
+    save and propagated to existing rows when a license changes, so reads can
+    skip the join. Mirroring ``name`` and ``canonical_url`` makes
+    ``get_<field>_display()`` render from the shadow columns alone.
+    """
+
+    forward_related_accessor_class = LicenseDescriptor
+
+    def __init__(self, *args, mirror=(), **kwargs):
+        self.mirror = tuple(mirror)
         kwargs["to"] = "licensing.License"
         kwargs.setdefault("on_delete", models.PROTECT)
         kwargs.setdefault("verbose_name", _("license"))
@@ -18,12 +86,212 @@ class LicenseField(models.ForeignKey):
         )
         super().__init__(*args, **kwargs)
 
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.mirror:
+            kwargs["mirror"] = self.mirror
+        return name, path, args, kwargs
+
+    def check(self, **kwargs):
+        return [*super().check(**kwargs), *self._check_mirror()]
+
+    def _check_mirror(self):
+        return [
+            checks.Error(
+                f"'{attr}' cannot be mirrored.",
+                hint=f"Choose from: {', '.join(MIRRORABLE)}.",
+                obj=self,
+                id="licensing.E001",
+            )
+            for attr in self.mirror
+            if attr not in MIRRORABLE
+        ]
+
     def contribute_to_class(self, cls, name, **kwargs):
         super().contribute_to_class(cls, name, **kwargs)
+        # Abstract models leave the shadow columns to their concrete children,
+        # and migration state models declare them as fields of their own.
+        if self.mirror and not cls._meta.abstract and cls.__module__ != "__fake__":
+            for attr in self.mirrored_attributes:
+                cls.add_to_class(
+                    self.mirror_attname(attr),
+                    MIRRORABLE[attr](
+                        verbose_name=format_lazy(
+                            "{} {}", self.verbose_name, attr.replace("_", " ")
+                        ),
+                        help_text=_("Copied from the license; do not edit."),
+                        null=True,
+                        blank=True,
+                        editable=False,
+                    ),
+                )
+            setattr(cls, f"{self.name}_mirror", property(self.get_mirror))
         method_name = f"get_{self.name}_display"
         if method_name not in cls.__dict__:
-            setattr(
-                cls,
-                method_name,
-                partialmethod(html_snippet, field_name=self.name),
-            )
+            setattr(cls, method_name, partialmethod(attribution_snippet, field=self))
+
+    @property
+    def display_source(self):
+        """The attribute the attribution snippet reads the license from.
+
+        With name and URL mirrored, the snippet never loads the license.
+        """
+        if {"name", "canonical_url"} <= set(self.mirrored_attributes):
+            return f"{self.name}_mirror"
+        return self.name
+
+    def attribution_queryset(self, queryset):
+        """``queryset`` loading what this field's attribution reads, in bulk."""
+        if self.display_source == self.name:
+            return queryset.select_related(self.name)
+        return queryset
+
+    @property
+    def mirrored_attributes(self):
+        return [attr for attr in self.mirror if attr in MIRRORABLE]
+
+    def mirror_attname(self, attr):
+        """The shadow column mirroring the license's ``attr``."""
+        return f"{self.name}_{attr}"
+
+    def get_mirror(self, instance):
+        """The :class:`LicenseMirror` for ``instance``, or ``None`` if unlicensed.
+
+        Rows whose copy was never filled (the columns were added to existing
+        rows, and ``sync_license_mirrors`` has not run yet) get the license
+        from the catalogue cache instead.
+        """
+        pk = getattr(instance, self.attname)
+        if pk is None:
+            return None
+        values = {
+            attr: getattr(instance, self.mirror_attname(attr))
+            for attr in self.mirrored_attributes
+        }
+        if None in values.values():
+            entry = catalogue.get(pk)
+            if entry is not None:
+                values = {attr: getattr(entry, attr) for attr in values}
+        return LicenseMirror(pk, **values)
+
+    def pre_save(self, model_instance, add):
+        # The shadow columns come later in field order, so they save what is
+        # set here.
+        if self.mirror:
+            pk = getattr(model_instance, self.attname)
+            if self.is_cached(model_instance):
+                source = self.get_cached_value(model_instance)
+            else:
+                source = catalogue.get(pk) if pk is not None else None
+            for attr in self.mirrored_attributes:
+                setattr(
+                    model_instance,
+                    self.mirror_attname(attr),
+                    getattr(source, attr, None),
+                )
+        return super().pre_save(model_instance, add)
+
+    def propagate_mirror(self, license_obj, batch_size=None):
+        """Bring this field's shadow columns up to date with ``license_obj``.
+
+        One ``UPDATE`` over the rows pointing at the license, writing only the
+        rows whose copy differs; with ``batch_size``, one per that many rows,
+        so no single statement locks them all. Returns the number of rows
+        changed.
+        """
+        values = {
+            self.mirror_attname(attr): getattr(license_obj, attr)
+            for attr in self.mirrored_attributes
+        }
+        if not values:
+            return 0
+        stale = functools.reduce(
+            operator.or_,
+            (~models.Q(**{column: value}) for column, value in values.items()),
+        )
+        rows = self.model._base_manager.filter(**{self.attname: license_obj.pk}).filter(
+            stale
+        )
+        if batch_size is None:
+            return rows.update(**values)
+        changed = 0
+        while pks := list(rows.values_list("pk", flat=True)[:batch_size]):
+            changed += self.model._base_manager.filter(pk__in=pks).update(**values)
+        return changed
+
+    @classmethod
+    def propagate(cls, licenses, batch_size=None):
+        """Propagate ``licenses`` to the mirror columns of every installed field.
+
+        Accepts ``License`` instances or catalogue entries. Returns the number
+        of rows changed.
+        """
+        fields = [field for field in cls.installed() if field.mirrored_attributes]
+        return sum(
+            field.propagate_mirror(license_obj, batch_size)
+            for license_obj in licenses
+            for field in fields
+        )
+
+    def validate(self, value, model_instance):
+        # ForeignKey.validate() checks the row exists with a query; the catalogue
+        # cache already knows, unless limit_choices_to narrows what is allowed.
+        if (
+            value is not None
+            and not self.get_limit_choices_to()
+            and catalogue.get(value) is not None
+        ):
+            return models.Field.validate(self, value, model_instance)
+        return super().validate(value, model_instance)
+
+    def formfield(self, **kwargs):
+        # Choices from the catalogue cache rather than a query per render.
+        return super().formfield(**{"form_class": LicenseChoiceField, **kwargs})
+
+
+class LicensesField(InstalledFieldsMixin, models.ManyToManyField):
+    """A many-to-many field to the License model, for multi-licensed content.
+
+    Adds ``get_<field>_display()``, rendering "available under A or B" with
+    ``licensing/licenses_snippet.html``. Each call reads ``<field>.all()``, so
+    over a list of objects prefetch the licenses first: ``prefetch_related()``
+    with :meth:`prefetch` (or ``LicensedQuerySet.with_licenses()``) loads every
+    object's licenses in one query. As with ``LicenseField``, a license still
+    offered by some object cannot be deleted.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs["to"] = "licensing.License"
+        kwargs.setdefault("verbose_name", _("licenses"))
+        kwargs.setdefault(
+            "help_text", _("The licenses under which this content is available")
+        )
+        super().__init__(*args, **kwargs)
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        through = self.remote_field.through
+        if not isinstance(through, str) and through._meta.auto_created:
+            # Like LicenseField: a license in use cannot be deleted out from
+            # under the content (the generated through model would cascade).
+            through._meta.get_field("license").remote_field.on_delete = models.PROTECT
+        method_name = f"get_{self.name}_display"
+        if method_name not in cls.__dict__:
+            setattr(cls, method_name, partialmethod(attribution_snippet, field=self))
+
+    @property
+    def display_source(self):
+        return self.name
+
+    def prefetch(self, fields=("name", "slug", "canonical_url")):
+        """A ``Prefetch`` of this field loading only the license ``fields``
+        attribution needs, name-ordered, rather than every column and the
+        full legal text."""
+        License = apps.get_model("licensing", "License")
+        return models.Prefetch(
+            self.name, queryset=License.objects.only("pk", *fields).order_by("name")
+        )
+
+    def attribution_queryset(self, queryset):
+        """``queryset`` loading what this field's attribution reads, in bulk."""
+        return queryset.prefetch_related(self.prefetch())
@@ -0,0 +1,135 @@
+"""
+Form fields for choosing a license.
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .cache import catalogue
+
+
+class LicenseChoiceIterator(ModelChoiceIterator):
+    """Choices from :meth:`LicenseChoiceField.offered_licenses`."""
+
+    @cached_property
+    def licenses(self):
+        # Shared by __len__() and __iter__(), which list() calls back to back.
+        return list(self.field.offered_licenses())
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.licenses:
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.licenses) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.licenses)
+
+    def choice(self, obj):
+        # Catalogue entries are not model instances, so prepare_value() would
+        # hand them back unchanged; the pk is the value either way.
+        return (
+            ModelChoiceIteratorValue(obj.pk, obj),
+            self.field.label_from_instance(obj),
+        )
+
+
+class LicenseChoiceField(forms.ModelChoiceField):
+    """A ``ModelChoiceField`` for licenses that renders from the catalogue cache.
+
+    The default form field of :class:`~licensing.fields.LicenseField`. While the
+    queryset is unfiltered (no ``limit_choices_to``, no custom filtering),
+    choices and validation come from :data:`licensing.cache.catalogue`, so
+    rendering and cleaning the field run no queries once the cache is warm.
+    A filtered queryset falls back to querying, without the ``text`` column.
+
+    With ``active_only`` (the default) deprecated licenses are not offered and
+    are rejected — except the license a bound form was initialised with, so
+    editing content under a since-deprecated license keeps working.
+    """
+
+    iterator = LicenseChoiceIterator
+    default_error_messages = {
+        "deprecated": _(
+            "%(license)s is deprecated. Choose one of the recommended licenses."
+        ),
+    }
+
+    def __init__(self, queryset, *, active_only=True, **kwargs):
+        self.active_only = active_only
+        self.current_pk = None
+        super().__init__(queryset, **kwargs)
+
+    @property
+    def cacheable(self):
+        """Whether the catalogue cache can stand in for the queryset."""
+        pk = self.queryset.model._meta.pk
+        return (
+            self.to_field_name in (None, "pk", pk.name)
+            and not self.queryset.query.has_filters()
+        )
+
+    def get_bound_field(self, form, field_name):
+        # Fields are copied per form instance, so remembering the initial value
+        # here is safe; it is what lets an edit keep a deprecated license.
+        initial = form.get_initial_for_field(self, field_name)
+        self.current_pk = getattr(initial, "pk", initial)
+        return super().get_bound_field(form, field_name)
+
+    def offered_licenses(self):
+        """The licenses to render as options, active ones plus the current one."""
+        if self.cacheable:
+            return [
+                entry
+                for entry in catalogue.entries()
+                if not self.active_only
+                or entry.is_active
+                or str(entry.pk) == str(self.current_pk)
+            ]
+        queryset = self.queryset.defer(
+            "text", "description", "text_html", "description_html", "text_signature"
+        )
+        if self.active_only:
+            queryset = queryset.filter(Q(is_active=True) | Q(pk=self.current_pk))
+        return queryset
+
+    def to_python(self, value):
+        if not self.cacheable or value in self.empty_values:
+            return super().to_python(value)
+        self.validate_no_null_characters(value)
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            license_obj = catalogue.license(
+                self.queryset.model._meta.pk.to_python(value)
+            )
+        except ValidationError:
+            license_obj = None
+        if license_obj is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return license_obj
+
+    def validate(self, value):
+        super().validate(value)
+        if (
+            self.active_only
+            and value is not None
+            and not value.is_active
+            and str(value.pk) != str(self.current_pk)
+        ):
+            raise ValidationError(
+                self.error_messages["deprecated"],
+                code="deprecated",
+                params={"license": value},
+            )
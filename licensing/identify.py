@@ -0,0 +1,223 @@
+"""
+Identifying a pasted license text against the catalogue.
+
+Texts are normalized (lower case, words only) and cut into overlapping
+five-word shingles. A one-permutation MinHash reduces each shingle set to a
+fixed :data:`NUM_BINS`-value signature whose agreement with another signature
+estimates the Jaccard similarity of the two texts, whatever their wording drift
+or whitespace. Signatures of catalogue texts are stored on the license
+(``License.text_signature``, regenerated when the text changes); an in-memory
+LSH index over them, rebuilt when the catalogue version changes, narrows a
+lookup down to a few candidates.
+"""
+
+import hashlib
+import logging
+import re
+import struct
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .cache import CatalogueEntry, VersionedCache, catalogue
+
+logger = logging.getLogger(__name__)
+
+NUM_BINS = 128
+#: LSH banding: texts sharing all rows of any one band become candidates.
+#: 32 bands of 4 rows catch pairs from a similarity of about 0.4.
+BANDS = 32
+ROWS = NUM_BINS // BANDS
+SHINGLE_SIZE = 5
+#: The value of a bin no shingle fell into.
+EMPTY = 0xFFFFFFFF
+_SIGNATURE = struct.Struct(f"<{NUM_BINS}I")
+_WORD = re.compile(r"[^\W_]+")
+
+
+class MinHash:
+    """One-permutation MinHash signatures of texts, and their comparison."""
+
+    def normalize(self, text):
+        """The words of ``text``, lower-cased, without punctuation or spacing."""
+        return _WORD.findall(text.lower())
+
+    def shingles(self, words):
+        """The set of overlapping :data:`SHINGLE_SIZE`-word runs of ``words``."""
+        if len(words) <= SHINGLE_SIZE:
+            return {" ".join(words)} if words else set()
+        return {
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+
+    def signature(self, text):
+        """The MinHash signature of ``text``, packed as ``bytes``.
+
+        One hash per shingle: its low bits pick a bin and each bin keeps the
+        smallest of the remaining bits, so a 40 KB text costs a few milliseconds.
+        """
+        bins = [EMPTY] * NUM_BINS
+        for shingle in self.shingles(self.normalize(text)):
+            value = int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            index, value = value % NUM_BINS, (value >> 7) % EMPTY
+            if value < bins[index]:
+                bins[index] = value
+        return _SIGNATURE.pack(*bins)
+
+    @staticmethod
+    def unpack(data):
+        """The bins of a packed signature, as a tuple of ints."""
+        return _SIGNATURE.unpack(bytes(data))
+
+    @staticmethod
+    def similarity(a, b):
+        """Estimated Jaccard similarity of two unpacked signatures, 0 to 1."""
+        matched = compared = 0
+        for x, y in zip(a, b, strict=True):
+            if x == EMPTY and y == EMPTY:
+                continue
+            compared += 1
+            matched += x == y
+        return matched / compared if compared else 0.0
+
+
+minhash = MinHash()
+
+
+class LicenseIndex:
+    """An LSH index over signatures, keyed by license pk.
+
+    Built whole from ``(pk, signature)`` pairs: the identifier builds a new one
+    when the catalogue version changes rather than editing this one.
+    """
+
+    def __init__(self, signatures=()):
+        self._signatures = {}
+        self._buckets = defaultdict(set)
+        for pk, data in signatures:
+            values = minhash.unpack(data)
+            self._signatures[pk] = values
+            for key in self._bands(values):
+                self._buckets[key].add(pk)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(values):
+        for band in range(BANDS):
+            rows = values[band * ROWS : (band + 1) * ROWS]
+            # Bands no shingle reached would pair up every short text.
+            if any(row != EMPTY for row in rows):
+                yield band, rows
+
+    def query(self, data, min_similarity=0.5, exclude=()):
+        """``(pk, similarity)`` pairs for the indexed signatures like ``data``,
+        most similar first."""
+        values = minhash.unpack(data)
+        candidates = set()
+        for key in self._bands(values):
+            candidates |= self._buckets.get(key, set())
+        scored = (
+            (pk, minhash.similarity(values, self._signatures[pk]))
+            for pk in candidates
+            if pk not in exclude
+        )
+        return sorted(
+            ((pk, score) for pk, score in scored if score >= min_similarity),
+            key=lambda match: -match[1],
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    """A catalogue license and how similar its text is to the one looked up."""
+
+    license: CatalogueEntry
+    similarity: float
+
+
+class LicenseIdentifier:
+    """Looks texts up in an index of the catalogue's stored signatures.
+
+    The index is rebuilt from ``License.text_signature`` (one query, and no
+    hashing) the first time it is used after the catalogue version changes.
+    """
+
+    def __init__(self):
+        self._index = VersionedCache(self._build_index)
+
+    @staticmethod
+    def _build_index():
+        from .models import License
+
+        queryset = License.objects.db_manager(hints={"primary": True})
+        return LicenseIndex(
+            queryset.exclude(text_signature=b"").values_list("pk", "text_signature")
+        )
+
+    def index(self):
+        return self._index.get()
+
+    def identify(self, text, limit=5, min_similarity=0.5):
+        """The licenses whose text best matches ``text``, as :class:`Match`\\ es."""
+        matches = []
+        for pk, score in self.index().query(minhash.signature(text), min_similarity):
+            entry = catalogue.get(pk)
+            if entry is not None:
+                matches.append(Match(entry, score))
+        return matches[:limit]
+
+    def near_duplicates(self, licenses, min_similarity=None):
+        """``(license, Match)`` pairs for each of ``licenses`` whose text is
+        close to another catalogue license's.
+
+        ``min_similarity`` defaults to ``LICENSING_DUPLICATE_SIMILARITY`` (0.97):
+        the Creative Commons 4.0 variants are up to 0.95 alike.
+        """
+        if min_similarity is None:
+            min_similarity = getattr(settings, "LICENSING_DUPLICATE_SIMILARITY", 0.97)
+        index = self.index()
+        pairs = []
+        for license_obj in licenses:
+            data = license_obj.text_signature or minhash.signature(
+                license_obj.text or ""
+            )
+            for pk, score in index.query(
+                data, min_similarity, exclude={license_obj.pk}
+            ):
+                entry = catalogue.get(pk)
+                if entry is not None:
+                    pairs.append((license_obj, Match(entry, score)))
+        return pairs
+
+    def flag_near_duplicates(self, licenses):
+        """Log a warning for each near-duplicate among ``licenses``; called when
+        licenses are imported. Returns the pairs, each pair of licenses once."""
+        pairs, seen = [], set()
+        for license_obj, match in self.near_duplicates(licenses):
+            pair = frozenset((license_obj.pk, match.license.pk))
+            if pair not in seen:
+                seen.add(pair)
+                pairs.append((license_obj, match))
+        for license_obj, match in pairs:
+            logger.warning(
+                "License %r is a near-duplicate of %r (similarity %.2f).",
+                license_obj.slug,
+                match.license.slug,
+                match.similarity,
+            )
+        return pairs
+
+
+identifier = LicenseIdentifier()
+
+
+def identify(text, limit=5, min_similarity=0.5):
+    """The catalogue licenses most similar to ``text``; see :class:`LicenseIdentifier`."""
+    return identifier.identify(text, limit, min_similarity)
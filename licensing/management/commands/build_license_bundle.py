@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from licensing.bundle import (
+    BUNDLED_CATALOGUE,
+    BUNDLED_FIXTURE,
+    LicenseBundle,
+    read_fixture,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a memory-mapped license bundle from a JSON fixture. Defaults to "
+        "rebuilding the bundled Creative Commons catalogue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fixture",
+            default=str(BUNDLED_FIXTURE),
+            help="JSON fixture to read, optionally gzipped (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--output",
+            default=str(BUNDLED_CATALOGUE),
+            help="Bundle file to write (default: %(default)s).",
+        )
+
+    def handle(self, *args, fixture, output, **options):
+        records = read_fixture(fixture)
+        with open(output, "wb") as fp:
+            LicenseBundle.write(records, fp)
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(records)} license(s) to {output}.")
+        )
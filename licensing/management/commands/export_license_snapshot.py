@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from licensing.cache import catalogue
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the license catalogue to a JSON snapshot file that database-free "
+        "nodes can serve through the LICENSING_SNAPSHOT setting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the snapshot file to write.")
+        parser.add_argument(
+            "--with-text",
+            action="store_true",
+            help="Include each license's description and full text.",
+        )
+
+    def handle(self, *args, output, with_text=False, **options):
+        # Written beside the target and renamed over it, so a node loading the
+        # snapshot never reads a half-written file.
+        directory = os.path.dirname(os.path.abspath(output))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            os.chmod(tmp, 0o644)
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                count = catalogue.dump_snapshot(fp, include_text=with_text)
+            os.replace(tmp, output)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} license(s) to {output}."))
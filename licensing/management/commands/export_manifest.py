@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from licensing.manifest import FORMATS, AttributionManifest
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a manifest of every licensed object (title, URL, creators, "
+        "license) as gzipped CSV or JSON lines, streamed row by row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help='File to write, or "-" for stdout.')
+        parser.add_argument(
+            "--format", dest="output_format", choices=FORMATS, default="csv"
+        )
+        parser.add_argument(
+            "--no-gzip",
+            action="store_false",
+            dest="compress",
+            help="Write uncompressed output.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database at a time (default: 2000).",
+        )
+
+    def handle(self, *args, output, output_format, compress, chunk_size, **options):
+        chunks = AttributionManifest(
+            output_format=output_format, compress=compress, chunk_size=chunk_size
+        ).stream()
+        if output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+        with open(output, "wb") as fp:
+            fp.writelines(chunks)
+        self.stderr.write(self.style.SUCCESS(f"Wrote manifest to {output}."))
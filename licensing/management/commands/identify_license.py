@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from licensing.identify import identifier
+from licensing.models import License
+
+
+class Command(BaseCommand):
+    help = (
+        "Identify a license text against the catalogue, printing the closest "
+        "licenses with their similarity, or list near-duplicate licenses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="File holding the text ('-' for stdin).",
+        )
+        parser.add_argument("--limit", type=int, default=5)
+        parser.add_argument("--min-similarity", type=float, default=0.5)
+        parser.add_argument(
+            "--duplicates",
+            action="store_true",
+            help="Instead, list catalogue licenses that are near-duplicates of each other.",
+        )
+
+    def handle(self, *args, path, limit, min_similarity, duplicates, **options):
+        if duplicates:
+            licenses = License.objects.only("pk", "slug", "text_signature")
+            pairs = identifier.near_duplicates(licenses)
+            for license_obj, match in pairs:
+                if license_obj.slug < match.license.slug:
+                    self.stdout.write(
+                        f"{license_obj.slug}\t{match.license.slug}\t{match.similarity:.2f}"
+                    )
+            return
+        try:
+            if path == "-":
+                text = sys.stdin.read()
+            else:
+                with open(path, encoding="utf-8") as fp:
+                    text = fp.read()
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}") from e
+        matches = identifier.identify(text, limit, min_similarity)
+        if not matches:
+            raise CommandError("No license in the catalogue matches this text.")
+        for match in matches:
+            self.stdout.write(
+                f"{match.license.slug}\t{match.similarity:.2f}\t{match.license.name}"
+            )
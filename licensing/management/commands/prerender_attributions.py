@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from licensing.fields import LicenseField, LicensesField
+from licensing.prerender import FORMATS, AttributionPrerenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the attribution of every licensed object to sharded files, in a "
+        "process pool. Re-running resumes after the last completed shard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directory to write shards into.")
+        parser.add_argument(
+            "--model",
+            action="append",
+            dest="models",
+            metavar="APP_LABEL.MODEL",
+            help="Only render this model's license fields (repeatable).",
+        )
+        parser.add_argument(
+            "--format", dest="output_format", choices=FORMATS, default="jsonl"
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Worker processes (default: CPU count; 0 renders in-process).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows per database fetch and per shard (default: 2000).",
+        )
+
+    def handle(
+        self, *args, output_dir, models, output_format, processes, chunk_size, **options
+    ):
+        fields = [*LicenseField.installed(), *LicensesField.installed()]
+        if models:
+            try:
+                selected = {apps.get_model(label) for label in models}
+            except (LookupError, ValueError) as e:
+                raise CommandError(e) from e
+            fields = [field for field in fields if field.model in selected]
+        prerenderer = AttributionPrerenderer(
+            output_dir,
+            output_format=output_format,
+            processes=processes,
+            chunk_size=chunk_size,
+            progress=self.report_progress,
+        )
+        for label, count in prerenderer.run(fields).items():
+            self.stdout.write(self.style.SUCCESS(f"{label}: rendered {count} row(s)."))
+
+    def report_progress(self, label, done, total, elapsed):
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(f"{label}: {done}/{total} ({rate:.0f} rows/s)")
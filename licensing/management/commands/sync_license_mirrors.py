@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from licensing.cache import catalogue
+from licensing.fields import LicenseField
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy license attributes into the mirror columns of every LicenseField "
+        "declared with mirror=..., updating only rows whose copy is stale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--license",
+            action="append",
+            dest="slugs",
+            metavar="SLUG",
+            help="Only propagate this license (repeatable). Default: all of them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Rows per UPDATE (default: 10000).",
+        )
+
+    def handle(self, *args, slugs=None, batch_size=10000, **options):
+        if slugs:
+            licenses = [catalogue.get_by_slug(slug) for slug in slugs]
+            missing = [
+                slug
+                for slug, entry in zip(slugs, licenses, strict=True)
+                if entry is None
+            ]
+            if missing:
+                raise CommandError(f"Unknown license slug(s): {', '.join(missing)}")
+        else:
+            licenses = catalogue.entries()
+        count = LicenseField.propagate(licenses, batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Updated {count} row(s)."))
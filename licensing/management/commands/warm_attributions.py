@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from licensing.warmup import AttributionWarmer
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render cached attribution snippets for the most requested objects "
+        "(LICENSING_WARMUP_TARGETS, or each licensed model's newest rows)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Threads (default: 4)."
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=30.0,
+            help="Stop after this many seconds (default: 30).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Objects to warm per licensed model (default: 1000).",
+        )
+        parser.add_argument(
+            "--language",
+            action="append",
+            dest="languages",
+            help="Language to render in (repeatable; default: LANGUAGE_CODE).",
+        )
+
+    def handle(self, *args, workers, time_budget, limit, languages, **options):
+        report = AttributionWarmer(
+            workers=workers, time_budget=time_budget, limit=limit, languages=languages
+        ).run()
+        self.stdout.write(
+            f"Rendered {report.rendered} snippet(s) in {report.elapsed:.2f}s "
+            f"({report.throughput:.0f}/s)."
+        )
+        if report.timed_out:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Time budget reached; {report.remaining} snippet(s) left cold."
+                )
+            )
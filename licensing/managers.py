@@ -0,0 +1,117 @@
+"""
+QuerySet methods for models that carry one or more ``LicenseField``.
+"""
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+from .cache import catalogue
+from .fields import LicenseField, LicensesField
+from .utils import InvalidLicenseFieldError, LicenseFieldNotFoundError
+
+
+class LicensedQuerySet(models.QuerySet):
+    """License-aware lookups for any model with ``LicenseField``\\ s.
+
+    Use it as the model's manager (``objects = LicensedQuerySet.as_manager()``)
+    or mix it into an existing QuerySet class. Every method takes optional
+    license field names and defaults to all of the model's license fields.
+
+    Filtering resolves licenses through :data:`licensing.cache.catalogue`, so
+    the filters compare the indexed foreign key column and never join
+    ``licensing_license``.
+    """
+
+    #: The License columns attribution renders, loaded by :meth:`with_license`.
+    attribution_fields = ("name", "slug", "canonical_url")
+
+    def _license_fields(self, field_names, field_class=LicenseField):
+        """The model's ``field_class`` fields named in ``field_names``, or all
+        of them if none are named.
+
+        Raises ``LicenseFieldNotFoundError`` if the model has none: a lookup
+        over no fields would otherwise match every row.
+        """
+        if not field_names:
+            fields = [
+                field
+                for field in self.model._meta.get_fields()
+                if isinstance(field, field_class)
+            ]
+            if not fields:
+                raise LicenseFieldNotFoundError(
+                    self.model.__name__, field_class.__name__
+                )
+            return fields
+        fields = []
+        for name in field_names:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise LicenseFieldNotFoundError(self.model.__name__, name) from None
+            if not isinstance(field, field_class):
+                raise InvalidLicenseFieldError(name, f"not a {field_class.__name__}")
+            fields.append(field)
+        return fields
+
+    def with_license(self, *field_names):
+        """Join the licenses, loading only the columns attribution needs.
+
+        ``select_related`` alone would pull every ``License`` column, including
+        the full legal ``text``, for every row.
+        """
+        License = apps.get_model("licensing", "License")
+        fields = self._license_fields(field_names)
+        keep = {License._meta.pk.attname, *self.attribution_fields}
+        deferred = [
+            f"{field.name}__{column.attname}"
+            for field in fields
+            for column in License._meta.concrete_fields
+            if column.attname not in keep
+        ]
+        return self.select_related(*(field.name for field in fields)).defer(*deferred)
+
+    def with_licenses(self, *field_names):
+        """Prefetch the licenses of ``LicensesField``\\ s (all of them by
+        default), loading only the columns attribution needs.
+
+        One query per field for the whole list, however many objects and
+        licenses there are.
+        """
+        fields = self._license_fields(field_names, LicensesField)
+        return self.prefetch_related(
+            *(field.prefetch(self.attribution_fields) for field in fields)
+        )
+
+    def under_active_licenses(self, *field_names):
+        """Rows whose license fields all point at active licenses.
+
+        Compares against the catalogue's cached ids — whichever of the active or
+        deprecated sets is smaller — instead of joining to ``is_active``. Rows
+        with no license are excluded.
+        """
+        fields = self._license_fields(field_names)
+        entries = catalogue.entries()
+        deprecated = [entry.pk for entry in entries if not entry.is_active]
+        active = [entry.pk for entry in entries if entry.is_active]
+        qs = self
+        for field in fields:
+            if len(active) <= len(deprecated):
+                qs = qs.filter(**{f"{field.attname}__in": active})
+            else:
+                qs = qs.filter(**{f"{field.attname}__isnull": False})
+                if deprecated:
+                    qs = qs.exclude(**{f"{field.attname}__in": deprecated})
+        return qs
+
+    def by_license_slug(self, slug, *field_names):
+        """Rows where any of the license fields points at the license ``slug``."""
+        fields = self._license_fields(field_names)
+        entry = catalogue.get_by_slug(slug)
+        if entry is None:
+            return self.none()
+        condition = models.Q()
+        for field in fields:
+            condition |= models.Q(**{field.attname: entry.pk})
+        return self.filter(condition)
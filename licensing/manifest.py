@@ -0,0 +1,113 @@
+"""
+A streaming manifest of every licensed object, as CSV or JSON lines.
+
+Rows are produced from ``.iterator()`` over each licensed model and resolve
+licenses through the catalogue cache, and the output is encoded (and
+optionally gzip-compressed) as it is produced, so memory use does not grow with
+the number of rows.
+"""
+
+import csv
+import json
+import zlib
+
+from .attribution import resolver
+from .fields import LicenseField, LicensesField
+
+COLUMNS = (
+    "model",
+    "pk",
+    "field",
+    "title",
+    "url",
+    "creators",
+    "creators_url",
+    "license",
+    "license_url",
+)
+FORMATS = ("csv", "jsonl")
+
+
+class _Line:
+    """A file-like that hands back what ``csv.writer`` writes to it."""
+
+    def write(self, value):
+        return value
+
+
+class AttributionManifest:
+    """A manifest of the objects of the license ``fields`` (default: every
+    installed ``LicenseField`` and ``LicensesField``), one row per object,
+    field and license. An object without a license still gets a row.
+
+    ``output_format`` is ``csv`` or ``jsonl``; ``chunk_size`` rows are fetched
+    from the database at a time.
+    """
+
+    def __init__(
+        self, fields=None, output_format="csv", compress=True, chunk_size=2000
+    ):
+        if output_format not in FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(FORMATS)}")
+        self.fields = fields
+        self.output_format = output_format
+        self.compress = compress
+        self.chunk_size = chunk_size
+
+    def rows(self):
+        """One dict per licensed object, license field and license, keyed by
+        :data:`COLUMNS`."""
+        fields = self.fields
+        if fields is None:
+            fields = [*LicenseField.installed(), *LicensesField.installed()]
+        for field in fields:
+            yield from self.rows_for(field)
+
+    def rows_for(self, field):
+        queryset = resolver.with_creators(field.model._default_manager.order_by("pk"))
+        if field.many_to_many:
+            queryset = field.attribution_queryset(queryset)
+        label = field.model._meta.label_lower
+        objects = queryset.iterator(chunk_size=self.chunk_size)
+        for attribution in resolver.resolve(objects, field.name):
+            for license_obj in attribution.licenses or (None,):
+                yield {
+                    "model": label,
+                    "pk": attribution.object.pk,
+                    "field": field.name,
+                    "title": attribution.title,
+                    "url": attribution.url,
+                    "creators": attribution.creators,
+                    "creators_url": attribution.creators_url,
+                    "license": license_obj.name if license_obj else None,
+                    "license_url": license_obj.canonical_url if license_obj else None,
+                }
+
+    def encode(self, rows):
+        """Encode ``rows`` as UTF-8 ``bytes`` chunks, one per row plus any header."""
+        if self.output_format == "csv":
+            writer = csv.writer(_Line())
+            yield writer.writerow(COLUMNS).encode("utf-8")
+            for row in rows:
+                yield writer.writerow([row[column] for column in COLUMNS]).encode(
+                    "utf-8"
+                )
+        else:
+            for row in rows:
+                yield (json.dumps(row) + "\n").encode("utf-8")
+
+    @staticmethod
+    def gzip(chunks, level=6):
+        """Gzip-compress an iterable of ``bytes`` on the fly."""
+        # wbits=31 writes the gzip container rather than a bare zlib stream.
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def stream(self):
+        """The whole manifest as a lazy iterable of ``bytes``."""
+        chunks = self.encode(self.rows())
+        return self.gzip(chunks) if self.compress else chunks
@@ -0,0 +1,101 @@
+"""
+``Link: <url>; rel="license"`` response headers for licensed objects.
+
+The object a response is about is ``request.licensed_object`` if the view set
+it, otherwise the ``object`` in a ``TemplateResponse``'s context (what
+``DetailView`` provides). Its licenses are looked up in the catalogue cache by
+the foreign key value already on the row, so the header costs no queries.
+"""
+
+from functools import cache, lru_cache, wraps
+
+from django.utils.encoding import iri_to_uri
+
+from .cache import catalogue
+from .fields import LicenseField
+
+
+class LicenseLinkMiddleware:
+    """Add ``Link: rel="license"`` headers to responses about a licensed object.
+
+    Subclass it to change how the object is found (:meth:`licensed_object`) or
+    which links it gets (:meth:`license_links`).
+    """
+
+    #: How many seconds the catalogue version this process last read is
+    #: trusted for, sparing each response a ``LICENSING_CACHE`` round trip. A
+    #: license edited in another process may keep its old link this long.
+    catalogue_max_age = 1.0
+
+    def __init__(self, get_response=None):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    def process_response(self, request, response):
+        """Add the licenses of the object ``response`` is about; returns
+        ``response``."""
+        return self.add_license_link(response, self.licensed_object(request, response))
+
+    @staticmethod
+    def licensed_object(request, response):
+        """The object ``response`` describes, or ``None``."""
+        obj = getattr(request, "licensed_object", None)
+        if obj is None:
+            context = getattr(response, "context_data", None)
+            if context:
+                obj = context.get("object")
+        return obj if hasattr(obj, "_meta") else None
+
+    @staticmethod
+    @cache
+    def license_attnames(model):
+        """The columns holding ``model``'s license keys."""
+        return tuple(
+            field.attname
+            for field in model._meta.concrete_fields
+            if isinstance(field, LicenseField)
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def link(entry):
+        """The ``Link`` header value for a catalogue entry."""
+        # Keyed by the whole catalogue entry, so an edited URL is a new key.
+        return f'<{iri_to_uri(entry.canonical_url)}>; rel="license"'
+
+    def license_links(self, obj):
+        """``Link`` header values for each license on ``obj``."""
+        links = []
+        for attname in self.license_attnames(type(obj)):
+            # Read from __dict__: a deferred column would otherwise be fetched.
+            pk = obj.__dict__.get(attname)
+            if pk is None:
+                continue
+            entry = catalogue.get(pk, max_age=self.catalogue_max_age)
+            if entry is not None and entry.canonical_url:
+                links.append(self.link(entry))
+        return links
+
+    def add_license_link(self, response, obj):
+        """Add ``obj``'s licenses to ``response``'s ``Link`` header; returns
+        ``response``."""
+        links = self.license_links(obj) if obj is not None else ()
+        if links:
+            existing = response.headers.get("Link")
+            response.headers["Link"] = ", ".join(
+                [existing, *links] if existing else links
+            )
+        return response
+
+
+def license_link(view):
+    """View decorator: :class:`LicenseLinkMiddleware` for a single view."""
+    middleware = LicenseLinkMiddleware()
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return middleware.process_response(request, view(request, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+def check_existing_rows(apps, schema_editor):
+    """Refuse to add the constraint over rows that already break it.
+
+    Without this the AddConstraint below fails with a bare IntegrityError (or, on
+    SQLite, a failed table rebuild) that names no license. Listing the offending
+    slugs lets the operator deprecate or reactivate them properly first.
+    """
+    License = apps.get_model("licensing", "License")
+    db_alias = schema_editor.connection.alias
+    inconsistent = License.objects.using(db_alias).filter(
+        models.Q(is_active=True, deprecated_date__isnull=False)
+        | models.Q(is_active=False, deprecated_date__isnull=True)
+    )
+    slugs = list(inconsistent.values_list("slug", flat=True)[:20])
+    if slugs:
+        raise RuntimeError(
+            "Cannot add licensing_license_deprecation_consistent: these licenses "
+            "are deprecated without a deprecated date, or active with one: "
+            + ", ".join(slugs)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0002_alter_license_options_remove_license_url_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_existing_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='license',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('deprecated_date__isnull', True), ('is_active', True)), models.Q(('deprecated_date__isnull', False), ('is_active', False)), _connector='OR'), name='licensing_license_deprecation_consistent', violation_error_message='Deprecated licenses must have a deprecated date, and active licenses must not.'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:07
+
+from django.db import DatabaseError, migrations, models
+
+TRIGRAM_INDEXES = {
+    "name": "licensing_license_name_trgm_idx",
+    "slug": "licensing_license_slug_trgm_idx",
+}
+
+
+def install_trigram(apps, schema_editor):
+    """Trigram indexes serving autocomplete's ``icontains``/``istartswith`` on
+    PostgreSQL, which compiles them to ``UPPER(col::text) LIKE UPPER(...)``.
+
+    A b-tree cannot serve a substring match, and other backends have no index
+    that can, so they scan. If ``pg_trgm`` cannot be created (the migrating
+    role may lack the privilege) the migration fails, and is not recorded:
+    have a superuser create the extension and run ``migrate`` again.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    try:
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as error:
+        raise DatabaseError(
+            "Could not create the pg_trgm extension that license autocomplete's "
+            "indexes need. Run CREATE EXTENSION pg_trgm as a superuser, then "
+            "migrate again."
+        ) from error
+    table = connection.ops.quote_name("licensing_license")
+    for column, name in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {connection.ops.quote_name(name)} ON {table} "
+            f"USING gin ((UPPER({connection.ops.quote_name(column)}::text)) gin_trgm_ops)"
+        )
+
+
+def uninstall_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES.values():
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {schema_editor.connection.ops.quote_name(name)}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0003_license_deprecation_consistent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['-is_active', 'name'], name='licensing_active_name_idx'),
+        ),
+        migrations.RunPython(install_trigram, uninstall_trigram),
+    ]
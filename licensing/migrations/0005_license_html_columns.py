@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:45
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+
+def render_existing_rows(apps, schema_editor):
+    """Fill the new columns for licenses that already exist.
+
+    Historical models have neither License.refresh_derived() nor the
+    queryset's bulk paths, so the rendering License.derive() does with
+    licensing.utils.license_html is repeated here.
+    """
+    License = apps.get_model("licensing", "License")
+    db_alias = schema_editor.connection.alias
+    licenses = list(License.objects.using(db_alias).only("pk", "description", "text"))
+    for license_obj in licenses:
+        license_obj.description_html = linebreaks(license_obj.description or "", autoescape=True)
+        license_obj.text_html = linebreaks(license_obj.text or "", autoescape=True)
+    License.objects.using(db_alias).bulk_update(
+        licenses, ["description_html", "text_html"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0004_license_autocomplete_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='description_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='description (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='license',
+            name='text_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='text (HTML)'),
+        ),
+        migrations.RunPython(render_existing_rows, migrations.RunPython.noop),
+    ]
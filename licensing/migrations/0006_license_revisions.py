@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:49
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_current_texts(apps, schema_editor):
+    """Start every existing license's history with its current text.
+
+    The snapshot encoding (DeltaCodec.compress() and digest()) is repeated
+    here, so later changes to that module cannot change what this migration
+    writes.
+    """
+    License = apps.get_model("licensing", "License")
+    LicenseRevision = apps.get_model("licensing", "LicenseRevision")
+    db_alias = schema_editor.connection.alias
+    LicenseRevision.objects.using(db_alias).bulk_create(
+        [
+            LicenseRevision(
+                license_id=pk,
+                number=1,
+                is_snapshot=True,
+                data=zlib.compress((text or "").encode("utf-8"), 9),
+                digest=hashlib.blake2b(
+                    (text or "").encode("utf-8"), digest_size=16
+                ).hexdigest(),
+            )
+            for pk, text in License.objects.using(db_alias).values_list("pk", "text").iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0005_license_html_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenseRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='number')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='is snapshot')),
+                ('data', models.BinaryField(verbose_name='data')),
+                ('digest', models.CharField(max_length=32, verbose_name='digest')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('license', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='licensing.license', verbose_name='license')),
+            ],
+            options={
+                'verbose_name': 'license revision',
+                'verbose_name_plural': 'license revisions',
+                'ordering': ['license_id', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('license', 'number'), name='licensing_revision_unique_number')],
+            },
+        ),
+        migrations.RunPython(record_current_texts, migrations.RunPython.noop),
+    ]
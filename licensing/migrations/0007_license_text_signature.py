@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:54
+
+import hashlib
+import re
+import struct
+
+from django.db import migrations, models
+
+# The signature scheme as of this migration (licensing.identify.MinHash.signature()),
+# repeated so later changes to that module cannot change what it writes.
+NUM_BINS = 128
+SHINGLE_SIZE = 5
+EMPTY = 0xFFFFFFFF
+WORD = re.compile(r"[^\W_]+")
+
+
+def signature(text):
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {
+            " ".join(words[i : i + SHINGLE_SIZE])
+            for i in range(len(words) - SHINGLE_SIZE + 1)
+        }
+    bins = [EMPTY] * NUM_BINS
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        index, value = value % NUM_BINS, (value >> 7) % EMPTY
+        if value < bins[index]:
+            bins[index] = value
+    return struct.pack(f"<{NUM_BINS}I", *bins)
+
+
+def sign_existing_texts(apps, schema_editor):
+    License = apps.get_model("licensing", "License")
+    db_alias = schema_editor.connection.alias
+    licenses = list(License.objects.using(db_alias).only("pk", "text"))
+    for license_obj in licenses:
+        license_obj.text_signature = signature(license_obj.text or "")
+    License.objects.using(db_alias).bulk_update(licenses, ["text_signature"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0006_license_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='text_signature',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='text signature'),
+        ),
+        migrations.RunPython(sign_existing_texts, migrations.RunPython.noop),
+    ]
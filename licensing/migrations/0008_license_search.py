@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:00
+
+from django.db import DatabaseError, migrations
+
+# The index and table as of this migration (licensing.search), repeated so
+# later changes to that module cannot change what it creates.
+INDEX_NAME = "licensing_license_search_idx"
+SEARCH_CONFIG = "english"
+TABLE = "licensing_license"
+FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, description, text, "
+    "content={table}, content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS {insert} AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, name, description, text) "
+    "VALUES (new.id, new.name, new.description, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS {delete} AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, name, description, text) "
+    "VALUES ('delete', old.id, old.name, old.description, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS {update} AFTER UPDATE OF name, description, text "
+    "ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, name, description, text) "
+    "VALUES ('delete', old.id, old.name, old.description, old.text); "
+    "INSERT INTO {fts}(rowid, name, description, text) "
+    "VALUES (new.id, new.name, new.description, new.text); END",
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+)
+
+
+def gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    vector = (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("text", weight="C", config=SEARCH_CONFIG)
+    )
+    return GinIndex(vector, name=INDEX_NAME)
+
+
+def fts_names(connection):
+    quote = connection.ops.quote_name
+    return {
+        "table": quote(TABLE),
+        "fts": quote(f"{TABLE}_fts"),
+        "insert": quote(f"{TABLE}_fts_insert"),
+        "delete": quote(f"{TABLE}_fts_delete"),
+        "update": quote(f"{TABLE}_fts_update"),
+    }
+
+
+def install(apps, schema_editor):
+    """A GIN index on PostgreSQL, an FTS5 table and triggers on SQLite; nothing
+    elsewhere. Not model state: the index and table exist on some backends only.
+    SQLite built without FTS5 gets nothing, and search falls back to icontains."""
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("licensing", "License"), gin_index())
+    elif connection.vendor == "sqlite":
+        names = fts_names(connection)
+        try:
+            with connection.cursor() as cursor:
+                for statement in FTS_STATEMENTS:
+                    cursor.execute(statement.format(**names))
+        except DatabaseError:
+            pass
+
+
+def uninstall(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("licensing", "License"), gin_index())
+    elif connection.vendor == "sqlite":
+        names = fts_names(connection)
+        for name in ("insert", "delete", "update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {names[name]}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {names['fts']}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0007_license_text_signature'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0008_license_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LicenseCompatibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatible_targets', to='licensing.license', verbose_name='source')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatible_sources', to='licensing.license', verbose_name='target')),
+            ],
+            options={
+                'verbose_name': 'license compatibility',
+                'verbose_name_plural': 'license compatibilities',
+                'constraints': [models.UniqueConstraint(fields=('source', 'target'), name='licensing_compatibility_unique_pair'), models.CheckConstraint(condition=models.Q(('source', models.F('target')), _negated=True), name='licensing_compatibility_distinct')],
+            },
+        ),
+    ]
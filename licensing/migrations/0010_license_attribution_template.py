@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licensing', '0009_license_compatibility'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='attribution_template',
+            field=models.TextField(blank=True, default='', help_text="A Django template for this license's attribution, used instead of licensing/snippet.html. It receives object, license and default (the standard attribution).", verbose_name='attribution template'),
+        ),
+    ]
@@ -1,8 +1,250 @@
+import functools
+import logging
+import operator
+from collections import defaultdict
+from contextlib import nullcontext
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Coalesce
+from django.template import TemplateSyntaxError
+from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+from . import search
+from .attribution import templates
+from .cache import catalogue
+from .delta import codec
+from .fields import LicenseField
+from .identify import identifier, minhash
+from .utils import license_html
+
+logger = logging.getLogger(__name__)
+
+
+class LicenseQuerySet(models.QuerySet):
+    """Catalogue-wide operations that run as single statements.
+
+    The lifecycle methods rely on the ``licensing_license_deprecation_consistent``
+    check constraint rather than per-row ``clean()``, so they stay one ``UPDATE``
+    however many licenses are selected. Bulk writes that send no per-row signals
+    (``update()``, and so ``bulk_update()``; ``bulk_create()``) invalidate the
+    catalogue cache themselves, keep the columns derived from ``text`` and
+    ``description`` in step, and record text revisions.
+    """
+
+    def update(self, **kwargs):
+        stale = False
+        for source, targets in self.model.derived_fields.items():
+            if source in kwargs and not set(targets) & set(kwargs):
+                if kwargs[source] is None or isinstance(kwargs[source], str):
+                    kwargs.update(self.model.derive(source, kwargs[source]))
+                else:
+                    # An expression: its value is only known once written.
+                    stale = True
+        reworded = "text" in kwargs
+        pks = list(self.values_list("pk", flat=True)) if stale or reworded else None
+        rows = super().update(**kwargs)
+        if stale:
+            self.model.objects.filter(pk__in=pks).refresh_derived()
+        if reworded:
+            if isinstance(kwargs["text"], str):
+                licenses = [self.model(pk=pk, text=kwargs["text"]) for pk in pks]
+            else:
+                licenses = (
+                    self.model.objects.using(self.db).filter(pk__in=pks).only("text")
+                )
+            LicenseRevision.objects.using(self.db).record(licenses)
+        catalogue.invalidate(self.db)
+        return rows
+
+    update.alters_data = True  # type: ignore[attr-defined]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.refresh_derived()
+        objs = super().bulk_create(objs, *args, **kwargs)
+        LicenseRevision.objects.using(self.db).record(objs)
+        catalogue.invalidate(self.db)
+        identifier.flag_near_duplicates(objs)
+        return objs
+
+    bulk_create.alters_data = True  # type: ignore[attr-defined]
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        sources = [field for field in self.model.derived_fields if field in fields]
+        if sources:
+            for obj in objs:
+                obj.refresh_derived(sources)
+            targets = [
+                t for source in sources for t in self.model.derived_fields[source]
+            ]
+            fields = [*fields, *(target for target in targets if target not in fields)]
+        # Each batch goes through update(), which records the text revisions.
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    bulk_update.alters_data = True  # type: ignore[attr-defined]
+
+    def refresh_derived(self, batch_size=500):
+        """Regenerate the columns derived from these licenses' prose.
+
+        For rows written behind the ORM's back. Returns the number of licenses
+        updated.
+        """
+        derived_fields = self.model.derived_fields
+        licenses = list(self.only("pk", *derived_fields))
+        for license_obj in licenses:
+            license_obj.refresh_derived()
+        targets = [target for targets in derived_fields.values() for target in targets]
+        return self.model.objects.bulk_update(licenses, targets, batch_size=batch_size)
+
+    refresh_derived.alters_data = True  # type: ignore[attr-defined]
+
+    def deprecate(self, date=None):
+        """Deprecate the active licenses in this queryset in one ``UPDATE``.
+
+        Licenses that are already deprecated keep their original date.
+
+        Args:
+            date: The deprecation date to record. Defaults to today.
+
+        Returns:
+            int: The number of licenses deprecated.
+        """
+        return self.filter(is_active=True).update(
+            is_active=False,
+            deprecated_date=date or timezone.localdate(),
+            updated_at=timezone.now(),
+        )
+
+    def reactivate(self):
+        """Reactivate the deprecated licenses in this queryset in one ``UPDATE``.
+
+        Returns:
+            int: The number of licenses reactivated.
+        """
+        return self.filter(is_active=False).update(
+            is_active=True, deprecated_date=None, updated_at=timezone.now()
+        )
+
+    def autocomplete(self, term=""):
+        """Licenses matching ``term`` by name or slug, best candidates first.
+
+        Matches are case-insensitive substrings of ``name`` or ``slug``. Active
+        licenses rank above deprecated ones, then prefix matches above other
+        substring matches, then by name — the order the ``(-is_active, name)``
+        index serves when there is no term. The match itself uses the trigram
+        indexes of migration ``0004`` on PostgreSQL and scans elsewhere.
+        """
+        qs = self
+        term = term.strip()
+        if term:
+            qs = qs.filter(
+                models.Q(name__icontains=term) | models.Q(slug__icontains=term)
+            ).annotate(
+                prefix_match=models.Case(
+                    models.When(
+                        models.Q(name__istartswith=term)
+                        | models.Q(slug__istartswith=term),
+                        then=models.Value(True),
+                    ),
+                    default=models.Value(False),
+                )
+            )
+            return qs.order_by("-is_active", "-prefix_match", "name")
+        return qs.order_by("-is_active", "name")
+
+    def search(self, terms):
+        """Licenses whose name, description or text contain every word of
+        ``terms``, annotated with ``search_rank`` and best matches first.
+
+        Served by a full-text index on PostgreSQL and SQLite; see
+        :mod:`licensing.search`.
+        """
+        connection = connections[self.db]
+        if not search.WORD.search(terms):
+            return self.annotate(search_rank=models.Value(0.0))
+
+        if connection.vendor == "postgresql":
+            from django.contrib.postgres.search import SearchQuery, SearchRank
+
+            vector = search.index.vector()
+            query = SearchQuery(
+                terms, config=search.SEARCH_CONFIG, search_type="websearch"
+            )
+            # alias(), not annotate(): the index serves the match, and the
+            # vector of every row is not worth sending back.
+            queryset = self.alias(search_document=vector).filter(search_document=query)
+            rank = SearchRank(vector, query)
+        elif search.index.has_fts(connection.alias):
+            names = search.index.fts_names(connection)
+            pk = connection.ops.quote_name(self.model._meta.pk.column)
+            weights = ", ".join(map(str, search.FTS_WEIGHTS))
+            # Joined to the FTS table, so one MATCH both finds and ranks the
+            # rows; bm25() is lower for better matches. The ORM has no join to
+            # a table without a model, hence extra(): the SQL is quoted
+            # identifiers and constants, and the terms are a parameter.
+            queryset = self.extra(  # noqa: S610
+                select={"search_rank": f"-bm25({names['fts']}, {weights})"},
+                tables=[f"{self.model._meta.db_table}_fts"],
+                where=[
+                    f"{names['fts']}.rowid = {names['table']}.{pk}",
+                    f"{names['fts']} MATCH %s",
+                ],
+                params=[search.index.fts_query(terms)],
+            )
+            return queryset.order_by("-search_rank", "name")
+        else:
+            words = search.WORD.findall(terms)
+            queryset = self
+            for word in words:
+                queryset = queryset.filter(
+                    models.Q(name__icontains=word)
+                    | models.Q(description__icontains=word)
+                    | models.Q(text__icontains=word)
+                )
+            in_name = models.Q()
+            for word in words:
+                in_name &= models.Q(name__icontains=word)
+            rank = models.Case(
+                models.When(in_name, then=models.Value(1.0)),
+                default=models.Value(0.0),
+                output_field=models.FloatField(),
+            )
+        return queryset.annotate(search_rank=rank).order_by("-search_rank", "name")
+
+    def with_usage(self):
+        """Annotate ``usage_count``: how many licensed objects use each license.
+
+        Every installed ``LicenseField`` contributes one correlated subquery, so
+        the count is resolved in the same query as the licenses themselves.
+        Calling it on an already annotated queryset is a no-op.
+        """
+        if "usage_count" in self.query.annotations:
+            return self
+        counts = [
+            Coalesce(
+                models.Subquery(
+                    field.model._base_manager.filter(
+                        **{field.name: models.OuterRef("pk")}
+                    )
+                    .order_by()
+                    .values(field.name)
+                    .annotate(count=models.Count("pk"))
+                    .values("count")
+                ),
+                0,
+            )
+            for field in LicenseField.installed()
+        ]
+        if not counts:
+            return self.annotate(usage_count=models.Value(0))
+        return self.annotate(usage_count=functools.reduce(operator.add, counts))
+
 
 class License(models.Model):
     name = models.CharField(
@@ -25,6 +267,27 @@ class License(models.Model):
 
     text = models.TextField(_("text"), help_text=_("The full text of the license"))
 
+    description_html = models.TextField(
+        _("description (HTML)"), blank=True, default="", editable=False
+    )
+    text_html = models.TextField(
+        _("text (HTML)"), blank=True, default="", editable=False
+    )
+    text_signature = models.BinaryField(
+        _("text signature"), blank=True, default=b"", editable=False
+    )
+
+    attribution_template = models.TextField(
+        _("attribution template"),
+        blank=True,
+        default="",
+        help_text=_(
+            "A Django template for this license's attribution, used instead of "
+            "licensing/snippet.html. It receives object, license and default "
+            "(the standard attribution)."
+        ),
+    )
+
     is_active = models.BooleanField(
         _("is active"),
         default=True,
@@ -43,6 +306,18 @@ class License(models.Model):
 
     slug = models.SlugField(_("slug"), max_length=255, unique=True, blank=True)
 
+    objects = LicenseQuerySet.as_manager()
+
+    #: Slugs ``licensing.urls`` mounts its own views at, beside ``<slug>/``.
+    reserved_slugs = frozenset({"autocomplete", "manifest"})
+    #: Prose fields and the columns holding them pre-rendered as HTML.
+    html_fields = {"description": "description_html", "text": "text_html"}
+    #: Prose fields and every column derived from them.
+    derived_fields = {
+        "description": ("description_html",),
+        "text": ("text_html", "text_signature"),
+    }
+
     class Meta:
         verbose_name = _("license")
         verbose_name_plural = _("licenses")
@@ -50,6 +325,25 @@ class License(models.Model):
         indexes = [
             models.Index(fields=["is_active"]),
             models.Index(fields=["slug"]),
+            # Autocomplete's ranking order: active licenses first, then by name.
+            models.Index(
+                fields=["-is_active", "name"], name="licensing_active_name_idx"
+            ),
+        ]
+        constraints = [
+            # Mirrors clean(): bulk paths (QuerySet.update(), bulk_update(),
+            # importers) skip per-row validation, so the database holds the line.
+            models.CheckConstraint(
+                condition=(
+                    models.Q(is_active=True, deprecated_date__isnull=True)
+                    | models.Q(is_active=False, deprecated_date__isnull=False)
+                ),
+                name="licensing_license_deprecation_consistent",
+                violation_error_message=_(
+                    "Deprecated licenses must have a deprecated date, and active "
+                    "licenses must not."
+                ),
+            ),
         ]
 
     def __str__(self):
@@ -105,6 +399,17 @@ class License(models.Model):
                 }
             )
 
+        if self.slug in self.reserved_slugs:
+            raise ValidationError(
+                {"slug": _("This slug is reserved for the license pages' own URLs.")}
+            )
+
+        if self.attribution_template:
+            try:
+                templates.compile(self.attribution_template)
+            except TemplateSyntaxError as e:
+                raise ValidationError({"attribution_template": str(e)}) from e
+
     @classmethod
     def get_recommended_licenses(cls):
         """Get currently recommended licenses"""
@@ -127,6 +432,7 @@ class License(models.Model):
                 queryset = queryset.exclude(pk=self.pk)
 
             existing_slugs = set(queryset.values_list("slug", flat=True))
+            existing_slugs |= self.reserved_slugs
 
             while slug in existing_slugs:
                 slug = f"{base_slug}-{counter}"
@@ -134,4 +440,262 @@ class License(models.Model):
 
             self.slug = slug
 
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            self.refresh_derived([f for f in self.derived_fields if f not in deferred])
+        else:
+            sources = [f for f in self.derived_fields if f in update_fields]
+            self.refresh_derived(sources)
+            kwargs["update_fields"] = {
+                *update_fields,
+                *(
+                    target
+                    for source in sources
+                    for target in self.derived_fields[source]
+                ),
+            }
+
         super().save(*args, **kwargs)
+
+    def text_at(self, when):
+        """The text this license had at the datetime ``when``, or ``None`` if
+        it has no revision that old."""
+        revision = (
+            self.revisions.filter(created_at__lte=when).order_by("-number").first()
+        )
+        return revision.text if revision is not None else None
+
+    @classmethod
+    def derive(cls, source, value):
+        """The derived columns' values for ``value`` of the prose field ``source``."""
+        derived = {cls.html_fields[source]: license_html(value)}
+        if source == "text":
+            derived["text_signature"] = minhash.signature(value or "")
+        return derived
+
+    def refresh_derived(self, fields=None):
+        """Regenerate the columns derived from ``description`` and ``text``.
+
+        Called by ``save()`` and the bulk write paths, so pages serve the HTML
+        columns instead of formatting the text on every view, and texts are
+        identified against stored signatures. ``fields`` limits it to some of
+        :attr:`derived_fields`.
+        """
+        for source in self.derived_fields if fields is None else fields:
+            for target, value in self.derive(source, getattr(self, source)).items():
+                setattr(self, target, value)
+
+
+class LicenseCompatibilityQuerySet(models.QuerySet):
+    """Bulk writes that send no per-row signals invalidate the catalogue
+    cache themselves, so the compatibility matrix is rebuilt."""
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        catalogue.invalidate(self.db)
+        return rows
+
+    update.alters_data = True  # type: ignore[attr-defined]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        catalogue.invalidate(self.db)
+        return objs
+
+    bulk_create.alters_data = True  # type: ignore[attr-defined]
+
+
+class LicenseCompatibility(models.Model):
+    """Material under ``source`` may be combined into a work released under
+    ``target``.
+
+    The relation is directed (CC BY material may go into a CC BY-SA work, not
+    the reverse) and implied for a license with itself, so those pairs are not
+    stored. Compatibility is transitive. Combinations are checked against
+    :mod:`licensing.compatibility`, never by querying this table.
+    """
+
+    source = models.ForeignKey(
+        License,
+        verbose_name=_("source"),
+        on_delete=models.CASCADE,
+        related_name="compatible_targets",
+    )
+    target = models.ForeignKey(
+        License,
+        verbose_name=_("target"),
+        on_delete=models.CASCADE,
+        related_name="compatible_sources",
+    )
+
+    objects = LicenseCompatibilityQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("license compatibility")
+        verbose_name_plural = _("license compatibilities")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "target"], name="licensing_compatibility_unique_pair"
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(source=models.F("target")),
+                name="licensing_compatibility_distinct",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id}"
+
+
+class LicenseRevisionQuerySet(models.QuerySet):
+    def latest_chains(self, licenses):
+        """For each of ``licenses``, its revisions since its last snapshot."""
+        snapshot = (
+            LicenseRevision.objects.filter(
+                license=models.OuterRef("license"), is_snapshot=True
+            )
+            .order_by("-number")
+            .values("number")[:1]
+        )
+        return self.filter(
+            license__in=licenses, number__gte=models.Subquery(snapshot)
+        ).order_by("license_id", "number")
+
+    def record(self, licenses):
+        """Record a revision for each of ``licenses`` whose text has changed.
+
+        A license's first revision, and every ``LICENSING_REVISION_SNAPSHOT_INTERVAL``
+        (default 10) after it, stores the whole text; the others store a delta
+        against the revision before. A chain that no longer rebuilds to its
+        digest is logged and followed by a snapshot, so the license stays
+        editable. Runs one query for the current revisions and one insert,
+        however many licenses are given, on the database the queryset writes
+        to, plus one locking the licenses' rows where the database supports
+        ``SELECT ... FOR UPDATE``: concurrent saves then number their revisions
+        one after the other rather than both taking the next number.
+        Licenses without a primary key are skipped. Returns the new revisions.
+        """
+        licenses = {
+            license_obj.pk: license_obj for license_obj in licenses if license_obj.pk
+        }
+        if not licenses:
+            return []
+        # Read the current revisions where the new ones will be written.
+        using = self._db or router.db_for_write(LicenseRevision)
+        queryset = self.using(using)
+        lock = connections[using].features.has_select_for_update
+        with transaction.atomic(using=using) if lock else nullcontext():
+            if lock:
+                locked = License.objects.using(using).select_for_update()
+                list(locked.filter(pk__in=licenses).order_by("pk").values_list("pk"))
+            return queryset.bulk_create(queryset._new_revisions(licenses))
+
+    def _new_revisions(self, licenses):
+        interval = getattr(settings, "LICENSING_REVISION_SNAPSHOT_INTERVAL", 10)
+        chains = defaultdict(list)
+        for revision in self.latest_chains(list(licenses)):
+            chains[revision.license_id].append(revision)
+        revisions = []
+        for pk, license_obj in licenses.items():
+            text = license_obj.text or ""
+            chain = chains[pk]
+            revision = LicenseRevision(
+                license_id=pk,
+                number=chain[-1].number + 1 if chain else 1,
+                digest=codec.digest(text),
+            )
+            if chain and chain[-1].digest == revision.digest:
+                continue
+            revision.data = codec.compress(text)
+            revision.is_snapshot = not chain or len(chain) >= interval
+            if not revision.is_snapshot:
+                try:
+                    previous = LicenseRevision.rebuild(chain)
+                except ValueError as e:
+                    logger.warning("%s Taking a snapshot.", e)
+                    revision.is_snapshot = True
+                else:
+                    changes = codec.diff(previous, text)
+                    # A rewrite can make the delta bigger than the text itself.
+                    if len(changes) < len(revision.data):
+                        revision.data = changes
+                    else:
+                        revision.is_snapshot = True
+            revisions.append(revision)
+        return revisions
+
+
+class LicenseRevision(models.Model):
+    """One version of a license's text, in a compact form.
+
+    Revisions are numbered per license from 1. A *snapshot* stores the text
+    compressed; the others store a compressed line delta against the previous
+    revision (:class:`~licensing.delta.DeltaCodec`). A snapshot is taken at
+    least every ``LICENSING_REVISION_SNAPSHOT_INTERVAL`` revisions, so any text
+    is rebuilt from one query and a bounded number of patches.
+    """
+
+    license = models.ForeignKey(
+        License,
+        verbose_name=_("license"),
+        on_delete=models.CASCADE,
+        related_name="revisions",
+    )
+    number = models.PositiveIntegerField(_("number"))
+    is_snapshot = models.BooleanField(_("is snapshot"), default=False)
+    data = models.BinaryField(_("data"))
+    digest = models.CharField(_("digest"), max_length=32)
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    objects = LicenseRevisionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("license revision")
+        verbose_name_plural = _("license revisions")
+        ordering = ["license_id", "number"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["license", "number"], name="licensing_revision_unique_number"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.license_id} r{self.number}"
+
+    @staticmethod
+    def rebuild(chain):
+        """The text of the last revision of ``chain``: a snapshot followed by
+        the consecutive deltas after it."""
+        text = codec.decompress(chain[0].data)
+        for revision in chain[1:]:
+            text = codec.patch(text, revision.data)
+        if codec.digest(text) != chain[-1].digest:
+            raise ValueError(
+                f"License revision {chain[-1]} did not rebuild to its text."
+            )
+        return text
+
+    def chain(self):
+        """This revision and those back to its nearest snapshot, in one query."""
+        if self.is_snapshot:
+            return [self]
+        snapshot = (
+            LicenseRevision.objects.filter(
+                license=self.license_id, number__lte=self.number, is_snapshot=True
+            )
+            .order_by("-number")
+            .values("number")[:1]
+        )
+        return list(
+            LicenseRevision.objects.filter(
+                license=self.license_id,
+                number__lte=self.number,
+                number__gte=models.Subquery(snapshot),
+            ).order_by("number")
+        )
+
+    @functools.cached_property
+    def text(self):
+        """The license text as of this revision."""
+        return self.rebuild(self.chain())
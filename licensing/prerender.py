@@ -0,0 +1,190 @@
+"""
+Rendering every licensed object's attribution to static files, in parallel.
+
+:class:`AttributionPrerenderer` walks a licensed model's primary keys in order,
+splits them into fixed-size chunks, and hands each chunk's pk range to a process
+pool, whose workers write one shard file per chunk. A per-field ``progress.json`` records the highest pk
+below which every shard is on disk, so an interrupted run resumes from there.
+"""
+
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connections
+from django.utils.html import format_html
+
+from .attribution import renderer
+from .fields import LicenseField, LicensesField
+
+FORMATS = ("jsonl", "html")
+
+
+def _init_worker():
+    # Under the "spawn" start method workers begin without Django set up.
+    import django
+
+    django.setup()
+
+
+def _render_chunk(model_label, field_name, first, last, path, output_format):
+    """Render the objects with pks from ``first`` to ``last`` to the shard
+    ``path``; returns the row count.
+
+    Runs in a worker process, so it takes plain values rather than model
+    objects. The shard is written beside its final name and renamed into place,
+    so a shard on disk is always complete.
+    """
+    model = apps.get_model(model_label)
+    field = model._meta.get_field(field_name)
+    queryset = field.attribution_queryset(
+        model._default_manager.filter(pk__gte=first, pk__lte=last).order_by("pk")
+    )
+    tmp = f"{path}.tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as fp:
+        for instance in queryset:
+            html = renderer.render(instance, field)
+            if output_format == "jsonl":
+                line = json.dumps(
+                    {"model": model_label, "pk": instance.pk, "html": html}
+                )
+            else:
+                line = format_html('<div data-pk="{}">{}</div>', instance.pk, html)
+            fp.write(line + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+class AttributionPrerenderer:
+    """Pre-render attribution snippets for every row of the licensed models.
+
+    Output goes to ``<output_dir>/<app_label>.<model>.<field>/``: shards named
+    ``<first pk>-<last pk>.<format>`` (``jsonl`` lines of ``{"model", "pk",
+    "html"}``, or ``html`` fragments wrapped in ``<div data-pk>``) and a
+    ``progress.json`` watermark. Primary keys must be integers.
+    ``processes=0`` renders in this process. ``progress`` is called with
+    ``(label, done, total, elapsed)`` after every shard.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        output_format="jsonl",
+        processes=None,
+        chunk_size=2000,
+        progress=None,
+    ):
+        if output_format not in FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(FORMATS)}")
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format
+        self.processes = os.cpu_count() if processes is None else processes
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda label, done, total, elapsed: None)
+
+    def run(self, fields=None):
+        """Render ``fields`` (default: every installed ``LicenseField`` and
+        ``LicensesField``).
+
+        Returns ``{label: rows rendered}``.
+        """
+        if fields is None:
+            fields = [*LicenseField.installed(), *LicensesField.installed()]
+        plans = [(field, self.plan(field)) for field in fields]
+        if not self.processes:
+            return {
+                self.label(field): self.render_field(field, chunks, None)
+                for field, chunks in plans
+            }
+        # The pool forks its workers when it is first given work, and they must
+        # not inherit open connections: nothing from here on queries in this
+        # process.
+        connections.close_all()
+        with ProcessPoolExecutor(self.processes, initializer=_init_worker) as pool:
+            return {
+                self.label(field): self.render_field(field, chunks, pool)
+                for field, chunks in plans
+            }
+
+    @staticmethod
+    def label(field):
+        return f"{field.model._meta.label_lower}.{field.name}"
+
+    def plan(self, field):
+        """The chunks of ``field``'s model still to render, as ``(first pk,
+        last pk, rows)``, from one pass over its primary keys.
+
+        Only a chunk of pks is held at a time, so planning a large table costs
+        a few bytes per chunk.
+        """
+        directory = self.output_dir / self.label(field)
+        directory.mkdir(parents=True, exist_ok=True)
+        watermark = self.resume(directory)
+        pks = field.model._default_manager.order_by("pk").values_list("pk", flat=True)
+        if watermark is not None:
+            pks = pks.filter(pk__gt=watermark)
+        iterator = pks.iterator(chunk_size=self.chunk_size)
+        chunks = iter(lambda: list(itertools.islice(iterator, self.chunk_size)), [])
+        return [(chunk[0], chunk[-1], len(chunk)) for chunk in chunks]
+
+    def render_field(self, field, chunks, pool):
+        directory = self.output_dir / self.label(field)
+        total = sum(rows for _, _, rows in chunks)
+        done = 0
+        start = time.monotonic()
+        # Bounded and first-in, first-out: the watermark only moves past a chunk
+        # once every chunk before it is written, and only a few chunks are ever
+        # in flight.
+        pending = deque()
+        for chunk in [*chunks, None]:
+            if chunk is not None:
+                first, last, _ = chunk
+                path = directory / f"{first}-{last}.{self.output_format}"
+                args = (
+                    field.model._meta.label_lower,
+                    field.name,
+                    first,
+                    last,
+                    path,
+                    self.output_format,
+                )
+                if pool is None:
+                    pending.append((last, _render_chunk(*args)))
+                else:
+                    pending.append((last, pool.submit(_render_chunk, *args)))
+            while pending and (
+                chunk is None or len(pending) > 2 * max(self.processes, 1)
+            ):
+                last_pk, result = pending.popleft()
+                done += result if pool is None else result.result()
+                self.save_watermark(directory, last_pk)
+                self.progress(self.label(field), done, total, time.monotonic() - start)
+        return done
+
+    def resume(self, directory):
+        """The pk to resume after (``None`` to start over), discarding any
+        shards beyond it."""
+        try:
+            watermark = json.loads((directory / "progress.json").read_text())[
+                "watermark"
+            ]
+        except FileNotFoundError:
+            watermark = None
+        for shard in directory.glob(f"*.{self.output_format}*"):
+            first = int(shard.name.split("-", 1)[0])
+            if watermark is None or first > watermark:
+                shard.unlink()
+        return watermark
+
+    @staticmethod
+    def save_watermark(directory, pk):
+        tmp = directory / "progress.json.tmp"
+        tmp.write_text(json.dumps({"watermark": pk}))
+        os.replace(tmp, directory / "progress.json")
@@ -0,0 +1,65 @@
+"""
+An optional database router for sending license reads to a replica.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Set once the current request (or, outside requests, the current context) has
+# written to a licensing table; reset by licensing.signals on request_started.
+_pinned = ContextVar("licensing_pinned_to_primary", default=False)
+
+
+def unpin():
+    """Let licensing reads in this context go back to the replica."""
+    _pinned.set(False)
+
+
+class LicenseReplicaRouter:
+    """Route reads of the ``licensing`` models to a replica, writes to the primary.
+
+    Enable it with::
+
+        DATABASE_ROUTERS = ["licensing.routers.LicenseReplicaRouter"]
+        LICENSING_REPLICA_DATABASE = "replica"
+        LICENSING_PRIMARY_DATABASE = "default"  # the default
+
+    Once a request writes to a licensing model, its later licensing reads go to
+    the primary too, so an editor sees their own change before the replica
+    catches up. Querysets may pass the ``primary=True`` hint
+    (``db_manager(hints={"primary": True})``) for reads that must not lag.
+    Models of other apps are left to the next router.
+    """
+
+    app_label = "licensing"
+
+    @property
+    def primary(self):
+        return getattr(settings, "LICENSING_PRIMARY_DATABASE", DEFAULT_DB_ALIAS)
+
+    @property
+    def replica(self):
+        return getattr(settings, "LICENSING_REPLICA_DATABASE", None)
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label or not self.replica:
+            return None
+        if _pinned.get() or hints.get("primary"):
+            return self.primary
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label or not self.replica:
+            return None
+        _pinned.set(True)
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A license read from the replica is the primary's row; content on the
+        # primary may point at it.
+        databases = {self.primary, self.replica}
+        if self.replica and {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
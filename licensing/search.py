@@ -0,0 +1,141 @@
+"""
+Full-text search over license names, descriptions and texts.
+
+Each database searches with what it has:
+
+* PostgreSQL matches a weighted ``SearchVector`` (name above description above
+  text) against a ``websearch`` query, served by a GIN index on the same
+  expression;
+* SQLite matches an FTS5 table, ``<license table>_fts``, that triggers keep in
+  step with the license table however rows are written (``save()``, the bulk
+  paths, raw SQL);
+* other databases, and SQLite builds without FTS5, fall back to ``icontains``
+  on every word.
+
+Migration ``0008`` creates the index or the table; :data:`index` describes
+them to ``LicenseQuerySet.search()``, which annotates results with
+``search_rank``, higher for better matches.
+"""
+
+import re
+
+from django.apps import apps
+from django.db import DatabaseError, connections
+
+#: The text search configuration of the PostgreSQL index and queries.
+SEARCH_CONFIG = "english"
+INDEX_NAME = "licensing_license_search_idx"
+#: FTS5 column weights for bm25(), in the order name, description, text.
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+WORD = re.compile(r"\w+")
+
+_FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, description, text, "
+    "content={table}, content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS {insert} AFTER INSERT ON {table} BEGIN "
+    "INSERT INTO {fts}(rowid, name, description, text) "
+    "VALUES (new.id, new.name, new.description, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS {delete} AFTER DELETE ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, name, description, text) "
+    "VALUES ('delete', old.id, old.name, old.description, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS {update} AFTER UPDATE OF name, description, text "
+    "ON {table} BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, name, description, text) "
+    "VALUES ('delete', old.id, old.name, old.description, old.text); "
+    "INSERT INTO {fts}(rowid, name, description, text) "
+    "VALUES (new.id, new.name, new.description, new.text); END",
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+)
+
+
+class FullTextIndex:
+    """The full-text index over ``License``, on whichever database has one."""
+
+    def __init__(self):
+        # Whether each database alias has the FTS5 table.
+        self._has_fts = {}
+
+    @property
+    def model(self):
+        return apps.get_model("licensing", "License")
+
+    @staticmethod
+    def vector():
+        """The weighted vector the PostgreSQL index is built on and queries match."""
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("text", weight="C", config=SEARCH_CONFIG)
+        )
+
+    @staticmethod
+    def fts_query(terms):
+        """``terms`` as an FTS5 query matching every word, or ``""`` if it has none.
+
+        Each word is quoted, so user input cannot use the query syntax.
+        """
+        return " ".join(f'"{word}"' for word in WORD.findall(terms))
+
+    def fts_names(self, connection):
+        """The quoted names of the license table, its FTS5 table and triggers."""
+        table = self.model._meta.db_table
+        quote = connection.ops.quote_name
+        return {
+            "table": quote(table),
+            "fts": quote(f"{table}_fts"),
+            "insert": quote(f"{table}_fts_insert"),
+            "delete": quote(f"{table}_fts_delete"),
+            "update": quote(f"{table}_fts_update"),
+        }
+
+    def has_fts(self, alias):
+        """Whether the database ``alias`` has the FTS5 table."""
+        if alias not in self._has_fts:
+            connection = connections[alias]
+            table = f"{self.model._meta.db_table}_fts"
+            self._has_fts[alias] = (
+                connection.vendor == "sqlite"
+                and table in connection.introspection.table_names()
+            )
+        return self._has_fts[alias]
+
+    def install_fts(self, connection):
+        """Create the SQLite FTS5 table and its triggers, where missing, and fill
+        the table. Returns whether FTS5 is available."""
+        names = self.fts_names(connection)
+        try:
+            with connection.cursor() as cursor:
+                for statement in _FTS_STATEMENTS:
+                    cursor.execute(statement.format(**names))
+        except DatabaseError:
+            # Built without FTS5: search() falls back to icontains.
+            return False
+        finally:
+            self._has_fts.pop(connection.alias, None)
+        return True
+
+    def repair_fts(self, connection):
+        """Recreate missing triggers on an existing FTS5 table, and refill it.
+
+        SQLite drops a table's triggers when a migration rebuilds the table.
+        Returns whether anything was repaired.
+        """
+        self._has_fts.pop(connection.alias, None)
+        if connection.vendor != "sqlite" or not self.has_fts(connection.alias):
+            return False
+        table = self.model._meta.db_table
+        expected = {f"{table}_fts_insert", f"{table}_fts_delete", f"{table}_fts_update"}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [table],
+            )
+            if expected <= {row[0] for row in cursor.fetchall()}:
+                return False
+        return self.install_fts(connection)
+
+
+index = FullTextIndex()
@@ -0,0 +1,160 @@
+"""
+Signal receivers that keep the catalogue cache (and with it the compatibility
+matrix), the derived columns of licenses loaded from fixtures, the text
+revision history, and the mirror columns of licensed models, in step with
+``License`` rows; that flag near-duplicate licenses loaded from fixtures; that
+repair the SQLite search triggers after migrations; that optionally re-warm
+cached attributions after a change; and that reset replica routing
+(:mod:`licensing.routers`) per request.
+"""
+
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.core.signals import request_started, setting_changed
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from . import background, search
+from .cache import catalogue
+from .fields import MIRRORABLE, LicenseField
+from .identify import identifier
+from .models import License, LicenseCompatibility, LicenseRevision
+from .routers import unpin
+
+
+@receiver(
+    post_save, sender=License, dispatch_uid="licensing_invalidate_catalogue_on_save"
+)
+@receiver(
+    post_delete, sender=License, dispatch_uid="licensing_invalidate_catalogue_on_delete"
+)
+@receiver(
+    post_save,
+    sender=LicenseCompatibility,
+    dispatch_uid="licensing_invalidate_catalogue_on_compatibility_save",
+)
+@receiver(
+    post_delete,
+    sender=LicenseCompatibility,
+    dispatch_uid="licensing_invalidate_catalogue_on_compatibility_delete",
+)
+def invalidate_catalogue(sender, using=None, **kwargs):
+    catalogue.invalidate(using)
+
+
+@receiver(pre_save, sender=License, dispatch_uid="licensing_derive_on_load")
+def derive_loaded_columns(sender, instance, raw=False, **kwargs):
+    # Fixtures are saved raw, bypassing License.save(), which derives the rest.
+    if raw:
+        instance.refresh_derived()
+
+
+class FlagLoaded:
+    """The on-commit job flagging the licenses one transaction loaded."""
+
+    def __init__(self):
+        self.licenses = []
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        identifier.flag_near_duplicates(self.licenses)
+
+
+#: Per thread, the latest :class:`FlagLoaded` queued.
+_loaded = threading.local()
+
+
+@receiver(post_save, sender=License, dispatch_uid="licensing_flag_near_duplicates")
+def flag_near_duplicates(sender, instance, using=None, raw=False, **kwargs):
+    # Fixtures are how catalogues are imported. loaddata saves a fixture's
+    # licenses in one transaction: flag them together once it commits, so the
+    # index is rebuilt once rather than after every row.
+    if not raw:
+        return
+    flag = getattr(_loaded, "flag", None)
+    queued = transaction.get_connection(using).run_on_commit
+    if flag is None or flag.done or not any(entry[1] is flag for entry in queued):
+        # The last one ran, or was rolled back with its transaction.
+        flag = _loaded.flag = FlagLoaded()
+        flag.licenses.append(instance)
+        transaction.on_commit(flag, using=using)
+    else:
+        flag.licenses.append(instance)
+
+
+@receiver(post_save, sender=License, dispatch_uid="licensing_record_revision")
+def record_revision(sender, instance, using, update_fields=None, **kwargs):
+    # Fixtures (raw saves) are recorded too: they are how catalogues are imported.
+    if update_fields is not None and "text" not in update_fields:
+        return
+    if "text" in instance.get_deferred_fields():
+        return
+    LicenseRevision.objects.using(using).record([instance])
+
+
+@receiver(post_migrate, dispatch_uid="licensing_repair_search")
+def repair_search(sender, app_config, using, **kwargs):
+    # A migration that rebuilds the license table on SQLite drops its triggers.
+    if app_config.label == "licensing":
+        search.index.repair_fts(connections[using])
+
+
+@receiver(setting_changed, dispatch_uid="licensing_reset_catalogue_cache")
+def reset_catalogue_cache(sender, setting, **kwargs):
+    if setting in ("LICENSING_CACHE", "CACHES"):
+        catalogue.reset_cache()
+
+
+def propagate_license(pk):
+    """Propagate license ``pk``, as it is now, to every mirror column in
+    batches; the background job a license save queues."""
+    entry = catalogue.get(pk)
+    if entry is not None:
+        batch_size = getattr(settings, "LICENSING_MIRROR_BATCH_SIZE", 10000)
+        LicenseField.propagate([entry], batch_size=batch_size)
+
+
+@receiver(post_save, sender=License, dispatch_uid="licensing_propagate_mirrors")
+def propagate_mirrors(sender, instance, created, update_fields=None, **kwargs):
+    # A new license has no rows pointing at it yet.
+    if created or kwargs.get("raw"):
+        return
+    if not getattr(settings, "LICENSING_PROPAGATE_MIRRORS", True):
+        return
+    if update_fields is not None and not set(update_fields) & set(MIRRORABLE):
+        return
+    # Off the request: a license can be on millions of rows.
+    transaction.on_commit(
+        partial(
+            background.submit, ("mirrors", instance.pk), propagate_license, instance.pk
+        )
+    )
+
+
+def warm():
+    """Re-warm cached attributions; the background job a license write queues."""
+    from .warmup import AttributionWarmer
+
+    return AttributionWarmer().run()
+
+
+@receiver(post_save, sender=License, dispatch_uid="licensing_warm_attributions")
+@receiver(
+    post_delete, sender=License, dispatch_uid="licensing_warm_attributions_on_delete"
+)
+def warm_attributions(sender, **kwargs):
+    if not getattr(settings, "LICENSING_WARM_ON_SAVE", False) or kwargs.get("raw"):
+        return
+    # Off the request thread, one run at a time: writes made while a run waits
+    # to start are covered by it.
+    transaction.on_commit(partial(background.submit, "warmup", warm))
+
+
+@receiver(request_started, dispatch_uid="licensing_unpin_primary")
+def unpin_primary(sender, **kwargs):
+    # Each request starts reading licenses from the replica again.
+    unpin()
@@ -0,0 +1,43 @@
+"""
+Template tags for machine-readable attribution.
+
+``{% load licensing %}`` then ``{% license_jsonld object_list "license" %}`` in
+the page head and ``{% license_rdfa object "license" %}`` beside the content.
+Both accept a single object or a list, and resolve a whole list in one pass.
+``{% license_collection object_list "license" %}`` renders one combined
+attribution block for a list.
+"""
+
+from django import template
+
+from .. import attribution
+
+register = template.Library()
+
+
+def _objects(value):
+    return [value] if hasattr(value, "_meta") else value
+
+
+@register.simple_tag(takes_context=True)
+def license_jsonld(context, objects, field_name="license"):
+    """A JSON-LD ``<script>`` describing ``objects`` and their licenses."""
+    return attribution.resolver.jsonld(
+        _objects(objects), field_name, context.get("request")
+    )
+
+
+@register.simple_tag(takes_context=True)
+def license_rdfa(context, objects, field_name="license"):
+    """RDFa attribution markup with ``rel="license"`` links for ``objects``."""
+    return attribution.resolver.rdfa(
+        _objects(objects), field_name, context.get("request")
+    )
+
+
+@register.simple_tag(takes_context=True)
+def license_collection(context, objects, field_name="license"):
+    """One attribution block for ``objects``, grouped by license and creator."""
+    return attribution.resolver.collection(
+        _objects(objects), field_name, context.get("request")
+    )
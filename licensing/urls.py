@@ -0,0 +1,16 @@
+from django.urls import path
+
+from . import views
+
+app_name = "licensing"
+
+urlpatterns = [
+    path(
+        "autocomplete/",
+        views.LicenseAutocompleteView.as_view(),
+        name="autocomplete",
+    ),
+    path("manifest/", views.LicenseManifestView.as_view(), name="manifest"),
+    path("", views.LicenseListView.as_view(), name="list"),
+    path("<slug:slug>/", views.LicenseDetailView.as_view(), name="detail"),
+]
@@ -3,8 +3,10 @@ Utility functions for django-content-license package.
 """
 
 import logging
+from functools import partial
 
 from django.template.loader import render_to_string
+from django.utils.html import linebreaks
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -84,6 +86,19 @@ def get_license_attribution(model_instance):
         return attr
 
 
+def license_html(value):
+    """
+    Render license prose (``text`` or ``description``) as HTML paragraphs.
+
+    Args:
+        value: The plain text, or None
+
+    Returns:
+        str: Escaped ``<p>``/``<br>`` HTML; empty for empty text
+    """
+    return linebreaks(value or "", autoescape=True)
+
+
 def get_license_creator(model_instance):
     """
     Get the creator of a model instance.
@@ -101,6 +116,10 @@ def html_snippet(model_instance, field_name):
     """
     Generate HTML snippet for license attribution.
 
+    Uses the license's own attribution template if it has one (compiled once
+    per catalogue version, see ``licensing.attribution.AttributionTemplates``),
+    otherwise ``licensing/snippet.html``.
+
     Args:
         model_instance: Django model instance
         field_name: Name of the license field
@@ -113,12 +132,46 @@ def html_snippet(model_instance, field_name):
         if not license_obj:
             return ""
 
+        from .attribution import templates
+
+        context = {"object": model_instance, "license": license_obj}
+        template = templates.get(license_obj.pk)
+        if template is None:
+            snippet = render_to_string("licensing/snippet.html", context)
+        else:
+            # The standard attribution, for templates that extend it; rendered
+            # only if the template uses it.
+            default = partial(render_to_string, "licensing/snippet.html", context)
+            snippet = templates.render(template, model_instance, license_obj, default)
+        return mark_safe(snippet)
+    except Exception as e:
+        logger.warning(f"Error generating license snippet: {e}")
+        return ""
+
+
+def licenses_snippet(model_instance, field_name):
+    """
+    Generate the HTML attribution for a many-to-many ``LicensesField``.
+
+    Args:
+        model_instance: Django model instance
+        field_name: Name of the licenses field
+
+    Returns:
+        str: "available under A or B" HTML, or empty string if error/no licenses
+    """
+    try:
+        licenses = list(getattr(model_instance, field_name).all())
+        if not licenses:
+            return ""
+
         snippet = render_to_string(
-            "licensing/snippet.html", {"object": model_instance, "license": license_obj}
+            "licensing/licenses_snippet.html",
+            {"object": model_instance, "licenses": licenses},
         )
         return mark_safe(snippet)
     except Exception as e:
-        logger.warning(f"Error generating license snippet: {e}")
+        logger.warning(f"Error generating licenses snippet: {e}")
         return ""
 
 
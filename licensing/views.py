@@ -0,0 +1,208 @@
+"""
+Views over the license catalogue.
+"""
+
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.http import condition
+from django.views.generic import DetailView, ListView
+
+from . import manifest
+from .cache import catalogue
+
+
+def catalogue_etag(request, *args, **kwargs):
+    """The catalogue version (and language): every license write changes it."""
+    if catalogue.from_snapshot:
+        return None
+    version = catalogue.version
+    return None if version is None else f"{version}-{get_language()}"
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    return catalogue.last_modified()
+
+
+class CatalogueConditionalMixin:
+    """Conditional GET for views rendered from the catalogue.
+
+    ``ETag`` and ``Last-Modified`` come from the catalogue version and the
+    newest ``updated_at``, both read from the cache, so a ``304 Not Modified``
+    is answered without loading the catalogue or touching the database.
+    ``?format=json`` selects the JSON rendering of the view.
+    """
+
+    @method_decorator(
+        condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)
+    )
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        patch_vary_headers(response, ["Accept-Language"])
+        return response
+
+    def wants_json(self):
+        return self.request.GET.get("format") == "json"
+
+    @staticmethod
+    def serialize_entry(entry):
+        return {
+            "id": entry.pk,
+            "name": entry.name,
+            "slug": entry.slug,
+            "canonical_url": entry.canonical_url,
+            "is_active": entry.is_active,
+            "url": reverse("licensing:detail", args=[entry.slug]),
+        }
+
+
+class LicenseListView(CatalogueConditionalMixin, ListView):
+    """The license catalogue, name-ordered and paginated (``?page=<n>``).
+
+    Served from the catalogue cache. The JSON form is::
+
+        {"results": [{"id": 1, "name": "CC BY 4.0", ...}],
+         "pagination": {"page": 1, "pages": 3, "more": true}}
+    """
+
+    template_name = "licensing/license_list.html"
+    context_object_name = "licenses"
+    paginate_by = 50
+
+    def get_queryset(self):
+        return catalogue.entries()
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.wants_json():
+            return super().render_to_response(context, **response_kwargs)
+        page = context["page_obj"]
+        return JsonResponse(
+            {
+                "results": [self.serialize_entry(entry) for entry in page],
+                "pagination": {
+                    "page": page.number,
+                    "pages": page.paginator.num_pages,
+                    "more": page.has_next(),
+                },
+            }
+        )
+
+
+class LicenseDetailView(CatalogueConditionalMixin, DetailView):
+    """One license, by slug, with its description and text as HTML.
+
+    The metadata comes from the catalogue cache and the text HTML, rendered
+    when the license was saved, is read once per catalogue version
+    (:meth:`LicenseCatalogue.rendered`), so a warm request runs no queries.
+    ``?format=json`` adds ``description_html`` and ``text_html`` to the list's
+    fields.
+    """
+
+    template_name = "licensing/license_detail.html"
+    context_object_name = "license"
+
+    def get_object(self, queryset=None):
+        entry = catalogue.get_by_slug(self.kwargs["slug"])
+        if entry is None:
+            raise Http404(_("No license found matching the query"))
+        return entry
+
+    def get_rendered(self):
+        return catalogue.rendered(self.object.pk) or dict.fromkeys(
+            ("description_html", "text_html"), ""
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            {name: mark_safe(html) for name, html in self.get_rendered().items()}
+        )
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if not self.wants_json():
+            return super().render_to_response(context, **response_kwargs)
+        return JsonResponse(
+            {**self.serialize_entry(self.object), **self.get_rendered()}
+        )
+
+
+class LicenseAutocompleteView(View):
+    """JSON search over the catalogue for license pickers.
+
+    ``GET ?term=<text>&page=<n>`` returns the select2 shape Django's admin
+    autocomplete widget also uses::
+
+        {"results": [{"id": "1", "text": "CC BY 4.0", ...}], "pagination": {"more": true}}
+
+    Results are ranked like :meth:`LicenseQuerySet.autocomplete` — active
+    licenses, then prefix matches, first — and served from the catalogue cache,
+    so a warm request runs no queries at all.
+    """
+
+    paginate_by = 20
+
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get("term", "")
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        offset = (page - 1) * self.paginate_by
+        results = self.get_results(term)[offset : offset + self.paginate_by + 1]
+        return JsonResponse(
+            {
+                "results": [
+                    self.serialize_result(obj) for obj in results[: self.paginate_by]
+                ],
+                "pagination": {"more": len(results) > self.paginate_by},
+            }
+        )
+
+    def get_results(self, term):
+        """Ranked matches for ``term``; anything sliceable of license-likes."""
+        return catalogue.autocomplete(term)
+
+    def serialize_result(self, obj):
+        return {
+            "id": str(obj.pk),
+            "text": obj.name,
+            "slug": obj.slug,
+            "is_active": obj.is_active,
+        }
+
+
+class LicenseManifestView(UserPassesTestMixin, View):
+    """A gzipped manifest of every licensed object, streamed as it is built.
+
+    ``GET ?format=csv`` (the default) or ``?format=jsonl`` downloads
+    ``licensed-objects.<format>.gz``. Staff only; override ``test_func()`` to
+    change who may export.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        output_format = request.GET.get("format", "csv")
+        if output_format not in manifest.FORMATS:
+            return HttpResponseBadRequest(_("Unknown format."))
+        response = StreamingHttpResponse(
+            manifest.AttributionManifest(output_format=output_format).stream(),
+            content_type="application/gzip",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="licensed-objects.{output_format}.gz"'
+        )
+        return response
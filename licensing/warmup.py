@@ -0,0 +1,115 @@
+"""
+Pre-rendering attribution snippets into the cache after the catalogue changes.
+
+A license edit bumps the catalogue version, which retires every cached snippet
+at once (see :mod:`licensing.attribution`). :class:`AttributionWarmer`
+re-renders the snippets visitors are most likely to ask for, so the first of
+them do not all pay the render cost together.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from .attribution import renderer
+from .fields import LicenseField, LicensesField
+
+
+@dataclass(frozen=True)
+class WarmupReport:
+    """What a warmup run got through."""
+
+    rendered: int
+    remaining: int
+    elapsed: float
+
+    @property
+    def throughput(self):
+        """Snippets rendered per second."""
+        return self.rendered / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def timed_out(self):
+        """Whether the time budget ran out before every snippet was rendered."""
+        return self.remaining > 0
+
+
+def recent_objects(limit):
+    """The default warmup targets: the newest ``limit`` rows of each licensed model.
+
+    Projects that know which objects are most requested point the
+    ``LICENSING_WARMUP_TARGETS`` setting at their own callable, which takes the
+    same ``limit`` and yields ``(instance, license_field)`` pairs, most
+    requested first.
+    """
+    for field in [*LicenseField.installed(), *LicensesField.installed()]:
+        queryset = field.attribution_queryset(
+            field.model._default_manager.order_by("-pk")
+        )
+        for instance in queryset[:limit]:
+            yield instance, field
+
+
+class AttributionWarmer:
+    """Re-render cached attribution snippets in a bounded thread pool.
+
+    Each worker takes the next target until none are left or ``time_budget``
+    seconds have passed, then closes the database connections its thread
+    opened. Snippets are rendered in every language of ``languages``
+    (``LANGUAGE_CODE`` by default).
+    """
+
+    def __init__(self, workers=4, time_budget=30.0, limit=1000, languages=None):
+        self.workers = workers
+        self.time_budget = time_budget
+        self.limit = limit
+        self.languages = languages or [settings.LANGUAGE_CODE]
+
+    def targets(self):
+        path = getattr(settings, "LICENSING_WARMUP_TARGETS", None)
+        source = import_string(path) if path else recent_objects
+        return source(self.limit)
+
+    def run(self, targets=None):
+        """Warm ``targets`` (``(instance, field)`` pairs, default :meth:`targets`)."""
+        # Evaluated here, in the calling thread, so workers only render.
+        targets = list(self.targets() if targets is None else targets)
+        jobs = itertools.product(targets, self.languages)
+        lock = threading.Lock()
+        start = time.monotonic()
+        deadline = start + self.time_budget
+
+        def work():
+            rendered = 0
+            try:
+                while time.monotonic() < deadline:
+                    with lock:
+                        job = next(jobs, None)
+                    if job is None:
+                        break
+                    (instance, field), language = job
+                    with translation.override(language):
+                        renderer.refresh(instance, field)
+                    rendered += 1
+            finally:
+                # Django opens a connection per thread; don't leak the pool's.
+                connections.close_all()
+            return rendered
+
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix="licensing-warmup"
+        ) as pool:
+            futures = [pool.submit(work) for _ in range(self.workers)]
+            rendered = sum(future.result() for future in futures)
+        return WarmupReport(
+            rendered=rendered,
+            remaining=len(targets) * len(self.languages) - rendered,
+            elapsed=time.monotonic() - start,
+        )
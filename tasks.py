@@ -135,3 +135,23 @@ def live_docs(c):
     c.run(
         "sphinx-autobuild -b html --host 0.0.0.0 --port 9000 --watch . -c . . _build/html"
     )
+
+
+@task
+def bundle(c):
+    """
+    Rebuild the memory-mapped catalogue bundle from its gzipped fixture
+    """
+    c.run("poetry run python manage.py build_license_bundle")
+
+
+@task
+def benchmark(c):
+    """
+    Benchmark bundle lookups, the Link header middleware, compatibility checks and
+    snapshot loading
+    """
+    c.run("poetry run python benchmarks/bundle_lookup.py")
+    c.run("poetry run python benchmarks/license_link.py")
+    c.run("poetry run python benchmarks/compatibility.py")
+    c.run("poetry run python benchmarks/snapshot_startup.py")
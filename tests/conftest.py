@@ -6,6 +6,8 @@ those factories so a test asks for what it needs rather than assembling it.
 
 import pytest
 
+from example.models import TestModel
+from licensing.cache import catalogue
 from tests.factories import LicenseFactory
 
 # NOTE: do not override `django_db_setup` here. pytest-django's built-in fixture
@@ -49,6 +51,22 @@ def licenses(license_obj, mit_license, gpl_license):
     return [license_obj, mit_license, gpl_license]
 
 
+@pytest.fixture
+def content(mit_license):
+    """A saved example ``TestModel`` under :func:`mit_license`."""
+    return TestModel.objects.create(content_license=mit_license)
+
+
 @pytest.fixture(autouse=True)
 def enable_db_access_for_all_tests(db):
     """Automatically enable database access for all tests."""
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalogue():
+    """Start every test from a cold catalogue cache.
+
+    Rolling back a test's transaction sends no signals, so without this the
+    cache could still hold licenses the previous test created.
+    """
+    catalogue.bump()
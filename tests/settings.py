@@ -68,7 +68,12 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
-    }
+    },
+    # A second database for the replica router tests (tests/test_routers.py).
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "replica.sqlite3"),
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS: list = []
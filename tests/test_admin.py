@@ -0,0 +1,233 @@
+"""Tests for the admin building blocks in licensing.admin."""
+
+import datetime
+
+import pytest
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from example.models import TestModel
+from licensing.admin import LicenseAdmin
+from licensing.models import License
+from tests.factories import LicenseFactory
+
+CHANGELIST_URL = reverse("admin:licensing_license_changelist")
+
+
+def post_action(client, action, licenses, confirm=False):
+    data = {"action": action, ACTION_CHECKBOX_NAME: [obj.pk for obj in licenses]}
+    if confirm:
+        data["post"] = "yes"
+    return client.post(CHANGELIST_URL, data)
+
+
+class TestLifecycleActions:
+    """The deprecate_selected / reactivate_selected admin actions."""
+
+    def test_confirmation_page_shows_impact(self, admin_client, licenses):
+        deprecated = LicenseFactory(
+            is_active=False, deprecated_date=datetime.date(2020, 1, 1)
+        )
+        TestModel.objects.create(content_license=licenses[0])
+        TestModel.objects.create(content_license=licenses[0])
+        TestModel.objects.create(content_license=deprecated)
+
+        response = post_action(
+            admin_client, "deprecate_selected", [*licenses, deprecated]
+        )
+
+        assert response.status_code == 200
+        assert (
+            response.template_name
+            == "admin/licensing/license/lifecycle_confirmation.html"
+        )
+        assert response.context_data["selected_count"] == 4
+        assert response.context_data["change_count"] == 3
+        assert response.context_data["unchanged_count"] == 1
+        # Usage of the already-deprecated license is not part of the impact.
+        assert response.context_data["affected_usage"] == 2
+        assert License.objects.filter(is_active=True).count() == 3
+
+    def test_confirm_deprecates_selected(self, admin_client, licenses):
+        response = post_action(
+            admin_client, "deprecate_selected", licenses[:2], confirm=True
+        )
+
+        assert response.status_code == 302
+        deprecated = License.objects.filter(is_active=False)
+        assert set(deprecated) == set(licenses[:2])
+        assert {obj.deprecated_date for obj in deprecated} == {timezone.localdate()}
+        assert License.objects.get(pk=licenses[2].pk).is_active
+
+    def test_deprecate_keeps_existing_date(self, admin_client):
+        original = datetime.date(2020, 1, 1)
+        license_obj = LicenseFactory(is_active=False, deprecated_date=original)
+
+        post_action(admin_client, "deprecate_selected", [license_obj], confirm=True)
+
+        license_obj.refresh_from_db()
+        assert license_obj.deprecated_date == original
+
+    def test_confirm_reactivates_selected(self, admin_client):
+        licenses = [
+            LicenseFactory(is_active=False, deprecated_date=datetime.date(2020, 1, 1))
+            for _ in range(2)
+        ]
+
+        post_action(admin_client, "reactivate_selected", licenses, confirm=True)
+
+        assert License.objects.filter(is_active=True, deprecated_date=None).count() == 2
+
+    def test_confirm_logs_each_changed_license(
+        self, admin_client, admin_user, licenses
+    ):
+        post_action(admin_client, "deprecate_selected", licenses, confirm=True)
+
+        entries = LogEntry.objects.filter(user=admin_user, action_flag=CHANGE)
+        assert {int(entry.object_id) for entry in entries} == {
+            obj.pk for obj in licenses
+        }
+
+    @pytest.mark.parametrize("confirm", [False, True])
+    def test_query_count_does_not_grow_with_selection(self, admin_client, confirm):
+        def count_queries(size):
+            selection = LicenseFactory.create_batch(size)
+            with CaptureQueriesContext(connection) as ctx:
+                post_action(
+                    admin_client, "deprecate_selected", selection, confirm=confirm
+                )
+            return len(ctx.captured_queries)
+
+        # Warm the content type cache so the first run is not penalised.
+        count_queries(1)
+
+        assert count_queries(2) == count_queries(20)
+
+
+class TestLicenseAdmin:
+    """The reusable licensing.admin.LicenseAdmin changelist."""
+
+    def test_changelist_query_count_is_fixed(
+        self, admin_client, django_assert_max_num_queries
+    ):
+        LicenseFactory.create_batch(1000)
+
+        # Session, user, paginated count, page of results.
+        with django_assert_max_num_queries(4):
+            response = admin_client.get(CHANGELIST_URL)
+
+        assert response.status_code == 200
+
+    def test_changelist_does_not_load_text(self, admin_client, licenses):
+        with CaptureQueriesContext(connection) as ctx:
+            admin_client.get(CHANGELIST_URL)
+
+        results_sql = ctx.captured_queries[-1]["sql"]
+        assert '"licensing_license"."description"' in results_sql
+        assert '"licensing_license"."text"' not in results_sql
+
+    def test_changelist_shows_usage(self, admin_client, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+        TestModel.objects.create(content_license=license_obj)
+
+        response = admin_client.get(CHANGELIST_URL)
+
+        result = response.context["cl"].result_list[0]
+        assert result.usage_count == 2
+
+    def test_changelist_orders_by_usage(self, admin_client, licenses):
+        TestModel.objects.create(content_license=licenses[1])
+        # Column 0 is the action checkbox.
+        usage_column = LicenseAdmin.list_display.index("get_usage_display") + 1
+
+        response = admin_client.get(CHANGELIST_URL, {"o": f"-{usage_column}"})
+
+        assert response.status_code == 200
+        assert response.context["cl"].result_list[0] == licenses[1]
+
+    def test_change_form_loads_text(self, admin_client, license_obj):
+        url = reverse("admin:licensing_license_change", args=[license_obj.pk])
+
+        response = admin_client.get(url)
+
+        assert license_obj.text in response.content.decode()
+
+    def test_actions_work_on_the_annotated_changelist_queryset(
+        self, admin_client, licenses
+    ):
+        response = post_action(admin_client, "deprecate_selected", licenses)
+
+        assert response.status_code == 200
+        assert response.context_data["change_count"] == 3
+
+    def test_description_is_served_from_its_html_column(self):
+        model_admin = LicenseAdmin(License, None)
+        license_obj = LicenseFactory(description="Shared\n\ndescription")
+        license_obj.description_html = "<p>Stored</p>"
+
+        assert model_admin.get_description_display(license_obj) == "<p>Stored</p>"
+
+    def test_display_methods_escape_license_data(self):
+        license_obj = LicenseFactory.build(
+            name="<b>Bold</b>", description="<script>x</script>"
+        )
+        license_obj.refresh_derived()
+        model_admin = LicenseAdmin(License, None)
+
+        assert "<b>" not in model_admin.get_name_display(license_obj)
+        assert "<script>" not in model_admin.get_description_display(license_obj)
+
+    def test_serves_autocomplete_fields_ranked(self, admin_client):
+        LicenseFactory(
+            name="CC BY 2.0", is_active=False, deprecated_date=datetime.date(2020, 1, 1)
+        )
+        LicenseFactory(name="CC BY 4.0")
+        LicenseFactory(name="Attribution via CC BY")
+
+        response = admin_client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "example",
+                "model_name": "testmodel",
+                "field_name": "content_license",
+                "term": "cc by",
+            },
+        )
+
+        names = [result["text"] for result in response.json()["results"]]
+        assert names == ["CC BY 4.0", "Attribution via CC BY", "CC BY 2.0"]
+
+    @pytest.fixture
+    def ranked(self):
+        return [
+            LicenseFactory(name="B Patent License"),
+            LicenseFactory(name="A Other", description="Mentions a patent."),
+            LicenseFactory(name="C Other", text="Patent grant."),
+        ]
+
+    def test_search_lists_best_matches_first(self, admin_client, ranked):
+        response = admin_client.get(CHANGELIST_URL, {"q": "patent"})
+
+        assert list(response.context["cl"].result_list) == ranked
+
+    def test_sorted_column_wins_over_relevance(self, admin_client, ranked):
+        name_column = LicenseAdmin.list_display.index("get_name_display") + 1
+
+        response = admin_client.get(CHANGELIST_URL, {"q": "patent", "o": name_column})
+
+        assert [obj.name for obj in response.context["cl"].result_list] == [
+            "A Other",
+            "B Patent License",
+            "C Other",
+        ]
+
+    def test_search_covers_text(self, admin_client, licenses):
+        LicenseFactory(name="Other", text="Irrevocable patent grant.")
+
+        response = admin_client.get(CHANGELIST_URL, {"q": "irrevocable"})
+
+        assert [obj.name for obj in response.context["cl"].result_list] == ["Other"]
@@ -0,0 +1,377 @@
+"""Tests for the attribution snippet renderer in licensing.attribution."""
+
+import json
+import re
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.test.signals import template_rendered
+from django.utils import translation
+
+from example.models import MultiLicensedTestModel, TestModel
+from licensing.attribution import (
+    renderer,
+    resolver,
+    templates,
+)
+from licensing.cache import catalogue
+from licensing.models import License
+
+
+@pytest.fixture
+def snippet_cache(settings):
+    settings.LICENSING_CACHE_SNIPPETS = True
+    catalogue.cache.clear()
+
+
+def display(obj):
+    # A fresh instance each time, so nothing is cached on the object itself.
+    return TestModel.objects.get(pk=obj.pk).get_content_license_display()
+
+
+class TestAttributionRenderer:
+    """get_<field>_display() through the snippet cache."""
+
+    def test_renders_without_cache_by_default(self, content, django_assert_num_queries):
+        display(content)
+
+        # The row, then the license.
+        with django_assert_num_queries(2):
+            assert "MIT License" in display(content)
+
+    def test_cached_snippet_skips_the_license(
+        self, snippet_cache, content, django_assert_num_queries
+    ):
+        html = display(content)
+
+        with django_assert_num_queries(1):
+            assert display(content) == html
+
+    def test_license_edit_retires_cached_snippets(
+        self, snippet_cache, content, mit_license
+    ):
+        display(content)
+
+        mit_license.name = "Expat License"
+        mit_license.save()
+
+        assert "Expat License" in display(content)
+
+    def test_key_follows_the_object_inputs(self, snippet_cache, content):
+        field = TestModel._meta.get_field("content_license")
+        key = renderer.cache_key(content, field)
+
+        content.get_absolute_url = lambda: "/moved/"
+
+        assert renderer.cache_key(content, field) != key
+
+    def test_key_follows_the_language(self, snippet_cache, content):
+        field = TestModel._meta.get_field("content_license")
+
+        with translation.override("en"):
+            english = renderer.cache_key(content, field)
+        with translation.override("de"):
+            german = renderer.cache_key(content, field)
+
+        assert english != german
+
+    def test_refresh_overwrites(self, snippet_cache, content):
+        field = TestModel._meta.get_field("content_license")
+        catalogue.cache.set(renderer.cache_key(content, field), "stale")
+
+        renderer.refresh(content, field)
+
+        assert "MIT License" in display(content)
+
+
+@pytest.fixture
+def dual_licensed(mit_license, gpl_license):
+    obj = MultiLicensedTestModel.objects.create()
+    obj.licenses.set([mit_license, gpl_license])
+    return obj
+
+
+def graph(html):
+    body = re.fullmatch(
+        r'<script type="application/ld\+json">(.*)</script>', html
+    ).group(1)
+    return json.loads(body)["@graph"]
+
+
+class TestMachineReadableAttribution:
+    """JSON-LD and RDFa rendered in bulk from one resolution pass."""
+
+    def test_resolve_reads_licenses_from_the_catalogue(self, content, mit_license):
+        (attribution,) = resolver.resolve(TestModel.objects.all(), "content_license")
+
+        assert attribution.object == content
+        assert attribution.license.name == "MIT License"
+        assert attribution.url == content.get_absolute_url()
+
+    def test_resolve_reads_every_license_of_a_licenses_field(
+        self, dual_licensed, mit_license, gpl_license, django_assert_num_queries
+    ):
+        catalogue.entries()
+
+        # The rows, then the licenses prefetched for all of them.
+        with django_assert_num_queries(2):
+            (attribution,) = resolver.resolve(
+                MultiLicensedTestModel.objects.all(), "licenses"
+            )
+
+        assert attribution.licenses == (
+            catalogue.get(gpl_license.pk),
+            catalogue.get(mit_license.pk),
+        )
+
+    def test_jsonld_describes_each_work(self, content, mit_license):
+        (work,) = graph(resolver.jsonld(TestModel.objects.all(), "content_license"))
+
+        assert work["@type"] == "CreativeWork"
+        assert work["license"] == mit_license.canonical_url
+        assert work["url"] == content.get_absolute_url()
+
+    def test_jsonld_urls_are_absolute_with_a_request(self, content):
+        request = RequestFactory().get("/")
+
+        (work,) = graph(
+            resolver.jsonld(TestModel.objects.all(), "content_license", request)
+        )
+
+        assert work["url"] == f"http://testserver{content.get_absolute_url()}"
+
+    def test_jsonld_cannot_close_its_script(self, license_obj):
+        license_obj.canonical_url = "https://example.com/</script><b>"
+        license_obj.save()
+        TestModel.objects.create(content_license=license_obj)
+
+        html = resolver.jsonld(TestModel.objects.all(), "content_license")
+
+        assert html.count("</script>") == 1
+        assert graph(html)[0]["license"] == license_obj.canonical_url
+
+    def test_rdfa_links_the_license(self, content, mit_license):
+        html = resolver.rdfa([content], "content_license")
+
+        assert 'rel="license"' in html
+        assert f'href="{mit_license.canonical_url}"' in html
+        assert 'typeof="CreativeWork"' in html
+
+    def test_jsonld_lists_every_license(self, dual_licensed, mit_license, gpl_license):
+        (work,) = graph(
+            resolver.jsonld(MultiLicensedTestModel.objects.all(), "licenses")
+        )
+
+        assert work["license"] == [gpl_license.canonical_url, mit_license.canonical_url]
+
+    def test_rdfa_links_every_license(self, dual_licensed, mit_license, gpl_license):
+        html = resolver.rdfa(MultiLicensedTestModel.objects.all(), "licenses")
+
+        assert html.count('rel="license"') == 2
+        assert f'href="{mit_license.canonical_url}"' in html
+        assert f'href="{gpl_license.canonical_url}"' in html
+        assert " or " in html
+
+    def test_rdfa_renders_its_template_once(self, licenses):
+        TestModel.objects.bulk_create(
+            TestModel(content_license=license_obj) for license_obj in licenses
+        )
+        rendered = []
+        template_rendered.connect(
+            lambda sender, template, **kwargs: rendered.append(template.name),
+            weak=False,
+            dispatch_uid="rdfa-test",
+        )
+        try:
+            html = resolver.rdfa(TestModel.objects.all(), "content_license")
+        finally:
+            template_rendered.disconnect(dispatch_uid="rdfa-test")
+
+        assert rendered == ["licensing/rdfa.html"]
+        assert html.count('typeof="CreativeWork"') == len(licenses)
+
+    @pytest.mark.parametrize("render", [resolver.jsonld, resolver.rdfa])
+    def test_queries_do_not_grow_with_the_list(
+        self, render, licenses, django_assert_num_queries
+    ):
+        for license_obj in licenses * 10:
+            TestModel.objects.create(content_license=license_obj)
+        render(TestModel.objects.all(), "content_license")
+
+        # The rows only: licenses come from the warm catalogue.
+        with django_assert_num_queries(1):
+            render(TestModel.objects.all(), "content_license")
+
+
+class TestCollectionAttribution:
+    """Combined attribution for a whole collection."""
+
+    @pytest.fixture
+    def works(self, licenses):
+        objects = []
+        for license_obj, creators in [
+            (licenses[0], "Alice"),
+            (licenses[0], "Bob"),
+            (licenses[0], "Alice"),
+            (licenses[1], "Alice"),
+            (licenses[1], ""),
+        ]:
+            obj = TestModel.objects.create(content_license=license_obj)
+            obj.creators = creators
+            objects.append(obj)
+        return objects
+
+    def test_groups_by_license_then_creator(self, works, licenses):
+        license_credits = resolver.collect(works, "content_license")
+
+        first, second = sorted(
+            license_credits, key=lambda credit: credit.license.pk != licenses[0].pk
+        )
+        assert [credit.license.name for credit in license_credits] == sorted(
+            license_obj.name for license_obj in licenses[:2]
+        )
+        assert len(first.works) == 3
+        assert [(c.name, len(c.works)) for c in first.creators] == [
+            ("Alice", 2),
+            ("Bob", 1),
+        ]
+        # Works without creators count, but credit nobody.
+        assert len(second.works) == 2
+        assert [c.name for c in second.creators] == ["Alice"]
+
+    def test_work_under_several_licenses_counts_under_each(
+        self, dual_licensed, mit_license, gpl_license
+    ):
+        license_credits = resolver.collect(
+            MultiLicensedTestModel.objects.all(), "licenses"
+        )
+
+        assert [
+            (credit.license.pk, len(credit.works)) for credit in license_credits
+        ] == [(gpl_license.pk, 1), (mit_license.pk, 1)]
+
+    def test_renders_one_block(self, works, licenses):
+        html = resolver.collection(works, "content_license")
+
+        assert html.count('class="license-collection"') == 1
+        assert f'href="{licenses[0].canonical_url}"' in html
+        assert re.search(r"3 works are licensed under", html)
+        assert re.search(r"Alice\s+\(2\),\s+Bob\s+\(1\)", html)
+
+    def test_large_collection_renders_in_one_pass(
+        self, licenses, django_assert_num_queries
+    ):
+        TestModel.objects.bulk_create(
+            TestModel(content_license=licenses[i % 3]) for i in range(1000)
+        )
+        rendered = []
+        template_rendered.connect(
+            lambda sender, template, **kwargs: rendered.append(template.name),
+            weak=False,
+            dispatch_uid="collection-test",
+        )
+        resolver.collection(TestModel.objects.all(), "content_license")
+        rendered.clear()
+
+        try:
+            # The rows only: licenses come from the warm catalogue.
+            with django_assert_num_queries(1):
+                html = resolver.collection(TestModel.objects.all(), "content_license")
+        finally:
+            template_rendered.disconnect(dispatch_uid="collection-test")
+
+        assert rendered == ["licensing/collection.html"]
+        assert html.count("works are licensed under") == 3
+
+
+class TestAttributionTemplates:
+    """Per-license attribution templates, compiled once per catalogue version."""
+
+    @pytest.fixture
+    def cc(self):
+        call_command("loaddata", "creativecommons", verbosity=0)
+        return {license_obj.slug: license_obj for license_obj in License.objects.all()}
+
+    def test_public_domain_skips_creators(self, cc):
+        public_domain = TestModel.objects.create(content_license=cc["cc0-10"])
+        attributed = TestModel.objects.create(content_license=cc["cc-by-40"])
+        public_domain.creators = attributed.creators = "Alice"
+
+        html = public_domain.get_content_license_display()
+
+        assert "is dedicated to the public domain under" in html
+        assert "Alice" not in html
+        assert "Alice" in attributed.get_content_license_display()
+
+    def test_share_alike_adds_a_notice(self, cc):
+        obj = TestModel.objects.create(content_license=cc["cc-by-sa-40"])
+
+        html = display(obj)
+
+        assert f'href="{obj.get_absolute_url()}"' in html
+        assert "is licensed under" in html
+        assert html.endswith("Adaptations must be shared under the same license.")
+
+    def test_others_use_the_default_snippet(self, cc):
+        obj = TestModel.objects.create(content_license=cc["cc-by-40"])
+
+        assert "is licensed under" in display(obj)
+
+    def test_compiled_once_per_version(self, cc, django_assert_num_queries):
+        obj = TestModel.objects.create(content_license=cc["cc0-10"])
+        obj = TestModel.objects.select_related("content_license").get(pk=obj.pk)
+        compiled = templates.get(cc["cc0-10"].pk)
+
+        with django_assert_num_queries(0), translation.override("de"):
+            obj.get_content_license_display()
+        assert templates.get(cc["cc0-10"].pk) is compiled
+
+        cc["cc0-10"].attribution_template = "Public domain: {{ object }}"
+        cc["cc0-10"].save()
+
+        assert display(obj) == f"Public domain: {obj}"
+
+    def test_invalid_template_fails_validation(self, license_obj):
+        license_obj.attribution_template = "{% if %}"
+
+        with pytest.raises(ValidationError) as excinfo:
+            license_obj.full_clean()
+
+        assert "attribution_template" in excinfo.value.message_dict
+
+    def test_invalid_saved_template_falls_back(self, license_obj, caplog):
+        License.objects.filter(pk=license_obj.pk).update(
+            attribution_template="{% if %}"
+        )
+        obj = TestModel.objects.create(content_license=license_obj)
+
+        assert "is licensed under" in display(obj)
+        assert "is invalid" in caplog.text
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "{% include 'licensing/snippet.html' %}",
+            "{% extends 'licensing/base.html' %}",
+            "{% debug %}",
+            "{% load static %}",
+        ],
+    )
+    def test_restricted_tags_fail_validation(self, license_obj, source):
+        license_obj.attribution_template = source
+
+        with pytest.raises(ValidationError):
+            license_obj.full_clean()
+
+    def test_template_cannot_walk_relations(self, license_obj):
+        License.objects.filter(pk=license_obj.pk).update(
+            attribution_template=(
+                "{% load i18n %}{{ object }}|{{ object.content_license.text }}"
+                "|{{ license.text }}|{{ license.name }}"
+            )
+        )
+        obj = TestModel.objects.create(content_license=license_obj)
+
+        assert display(obj) == f"{obj}|||{license_obj.name}"
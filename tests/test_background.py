@@ -0,0 +1,44 @@
+"""Tests for the background worker in licensing.background."""
+
+import threading
+
+from licensing import background
+
+
+class TestSubmit:
+    """Jobs run one at a time, and waiting jobs are not queued twice."""
+
+    def test_runs_the_job(self):
+        assert background.submit("test-run", lambda x: x * 2, 21).result(5) == 42
+
+    def test_coalesces_jobs_waiting_to_start(self):
+        started, release = threading.Event(), threading.Event()
+        runs = []
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        background.submit("test-block", block)
+        started.wait(5)
+        futures = [background.submit("test-coalesce", runs.append, n) for n in range(3)]
+        release.set()
+        futures[0].result(5)
+
+        assert futures[0] is futures[1] is futures[2]
+        assert runs == [0]
+
+    def test_queues_again_once_started(self):
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        first = background.submit("test-again", block)
+        started.wait(5)
+        second = background.submit("test-again", block)
+        release.set()
+
+        assert second is not first
+        second.result(5)
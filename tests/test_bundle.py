@@ -0,0 +1,59 @@
+"""Tests for the memory-mapped catalogue bundle in licensing.bundle."""
+
+import io
+
+import pytest
+
+from licensing.bundle import (
+    BUNDLED_CATALOGUE,
+    BUNDLED_FIXTURE,
+    LicenseBundle,
+    read_fixture,
+)
+
+
+@pytest.fixture
+def fixture_records():
+    return read_fixture(BUNDLED_FIXTURE)
+
+
+@pytest.fixture
+def bundle():
+    with LicenseBundle(BUNDLED_CATALOGUE) as bundle:
+        yield bundle
+
+
+class TestLicenseBundle:
+    """Reading licenses out of the bundled catalogue."""
+
+    def test_bundle_is_built_from_the_fixture(self, fixture_records):
+        rebuilt = io.BytesIO()
+        LicenseBundle.write(fixture_records, rebuilt)
+
+        # Run `python manage.py build_license_bundle` after editing the fixture.
+        assert rebuilt.getvalue() == BUNDLED_CATALOGUE.read_bytes()
+
+    def test_every_license_round_trips(self, bundle, fixture_records):
+        assert len(bundle) == len(fixture_records)
+        for record in fixture_records:
+            fields = dict(record["fields"])
+            assert bundle.text(fields["slug"]) == fields.pop("text")
+            assert bundle.metadata(fields["slug"]) == {"pk": record["pk"], **fields}
+
+    def test_lookup_by_pk(self, bundle, fixture_records):
+        record = fixture_records[0]
+
+        assert bundle.metadata(record["pk"])["slug"] == record["fields"]["slug"]
+        assert record["pk"] in bundle
+
+    def test_unknown_license(self, bundle):
+        assert "no-such-license" not in bundle
+        assert bundle.metadata("no-such-license") is None
+        assert bundle.text(0) is None
+
+    def test_slugs_are_sorted(self, bundle):
+        assert bundle.slugs() == sorted(bundle.slugs())
+
+    def test_rejects_other_files(self):
+        with pytest.raises(ValueError, match="not a license bundle"):
+            LicenseBundle(BUNDLED_FIXTURE)
@@ -0,0 +1,347 @@
+"""Tests for the catalogue cache in licensing.cache."""
+
+import datetime
+import json
+
+import pytest
+from django.apps import apps
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from example.models import TestModel
+from licensing.cache import (
+    SNAPSHOT_FORMAT,
+    CatalogueEntry,
+    LicenseCatalogue,
+    VersionedCache,
+    catalogue,
+)
+from licensing.models import License
+from tests.factories import LicenseFactory
+
+
+class TestLicenseCatalogue:
+    """Loading, lookup and version-based invalidation of the catalogue cache."""
+
+    def test_entries_are_name_ordered_light_columns(self, licenses):
+        entries = catalogue.entries()
+
+        assert [entry.name for entry in entries] == sorted(obj.name for obj in licenses)
+        assert isinstance(entries[0], CatalogueEntry)
+        assert not hasattr(entries[0], "text")
+
+    def test_reads_are_served_from_memory(self, licenses, django_assert_num_queries):
+        catalogue.entries()
+
+        with django_assert_num_queries(0):
+            catalogue.entries()
+            catalogue.get(licenses[0].pk)
+
+    def test_get_unknown_pk(self, licenses):
+        assert catalogue.get(0) is None
+
+    def test_save_invalidates(self, license_obj):
+        catalogue.entries()
+
+        license_obj.name = "Renamed"
+        license_obj.save()
+
+        assert catalogue.get(license_obj.pk).name == "Renamed"
+
+    def test_delete_invalidates(self, license_obj):
+        catalogue.entries()
+
+        license_obj.delete()
+
+        assert catalogue.entries() == ()
+
+    def test_queryset_update_invalidates(self, licenses):
+        catalogue.entries()
+
+        License.objects.all().deprecate(datetime.date(2026, 1, 1))
+
+        assert not any(entry.is_active for entry in catalogue.entries())
+
+    def test_bulk_create_invalidates(self, license_obj):
+        catalogue.entries()
+
+        License.objects.bulk_create([LicenseFactory.build(slug="bulk-created")])
+
+        assert len(catalogue.entries()) == 2
+
+    def test_rolled_back_writes_are_not_kept(self, license_obj):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            LicenseFactory(name="Rolled Back")
+            assert len(catalogue.entries()) == 2
+            raise RuntimeError
+
+        # A rollback bumps nothing: the rows read before it must not survive.
+        assert [entry.name for entry in catalogue.entries()] == [license_obj.name]
+
+    def test_derived_values_drop_rolled_back_writes(self, license_obj):
+        names = VersionedCache(
+            lambda: list(License.objects.values_list("name", flat=True))
+        )
+        with pytest.raises(RuntimeError), transaction.atomic():
+            LicenseFactory(name="Rolled Back")
+            assert len(names.get()) == 2
+            raise RuntimeError
+
+        assert names.get() == [license_obj.name]
+
+    def test_license_builds_an_instance_without_a_query(
+        self, license_obj, django_assert_num_queries
+    ):
+        catalogue.entries()
+
+        with django_assert_num_queries(0):
+            built = catalogue.license(license_obj.pk)
+
+        assert built == license_obj
+        for field in ["name", "slug", "canonical_url", "is_active"]:
+            assert getattr(built, field) == getattr(license_obj, field)
+        assert not built._state.adding
+        assert built.get_deferred_fields() >= {"text", "description"}
+
+    def test_license_unknown_pk(self, licenses):
+        assert catalogue.license(0) is None
+
+    def test_autocomplete_matches_the_queryset_ranking(self):
+        LicenseFactory(name="CC BY 4.0")
+        LicenseFactory(
+            name="CC BY 2.0", is_active=False, deprecated_date=datetime.date(2020, 1, 1)
+        )
+        LicenseFactory(name="Attribution, CC BY style")
+
+        for term in ["", "cc", "by", "cc-by"]:
+            expected = [obj.pk for obj in License.objects.autocomplete(term)]
+            assert [entry.pk for entry in catalogue.autocomplete(term)] == expected
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """A path for a snapshot file; the catalogue goes back to the database after."""
+    yield tmp_path / "catalogue.json"
+    catalogue.unload_snapshot()
+
+
+def write_snapshot(path, include_text=False):
+    with open(path, "w", encoding="utf-8") as fp:
+        return catalogue.dump_snapshot(fp, include_text=include_text)
+
+
+class TestLicenseCatalogueSnapshot:
+    """Exporting the catalogue and serving it from a snapshot file."""
+
+    def test_snapshot_omits_text_by_default(self, snapshot_path, licenses):
+        assert write_snapshot(snapshot_path) == 3
+
+        data = json.loads(snapshot_path.read_text())
+        assert data["format"] == SNAPSHOT_FORMAT
+        assert data["fields"] == list(catalogue.fields)
+        assert licenses[0].text not in snapshot_path.read_text()
+
+    def test_loaded_snapshot_is_served_without_queries(
+        self, snapshot_path, licenses, django_assert_num_queries
+    ):
+        write_snapshot(snapshot_path)
+
+        with django_assert_num_queries(0):
+            catalogue.load_snapshot(snapshot_path)
+            assert len(catalogue.entries()) == 3
+            assert catalogue.get_by_slug(licenses[0].slug).name == licenses[0].name
+            assert catalogue.autocomplete(licenses[1].name[:3])
+
+    def test_snapshot_ignores_database_changes(self, snapshot_path, license_obj):
+        write_snapshot(snapshot_path)
+        catalogue.load_snapshot(snapshot_path)
+
+        LicenseFactory()
+
+        assert [entry.pk for entry in catalogue.entries()] == [license_obj.pk]
+
+    def test_license_includes_text_from_snapshot(
+        self, snapshot_path, license_obj, django_assert_num_queries
+    ):
+        write_snapshot(snapshot_path, include_text=True)
+        catalogue.load_snapshot(snapshot_path)
+
+        with django_assert_num_queries(0):
+            obj = catalogue.license(license_obj.pk)
+            assert obj.text == license_obj.text
+            assert obj.description == license_obj.description
+
+    def test_license_field_resolves_from_snapshot(
+        self, snapshot_path, license_obj, django_assert_num_queries
+    ):
+        content = TestModel.objects.create(content_license=license_obj)
+        content = TestModel.objects.get(pk=content.pk)
+        write_snapshot(snapshot_path)
+        catalogue.load_snapshot(snapshot_path)
+
+        with django_assert_num_queries(0):
+            assert content.content_license.name == license_obj.name
+
+    def test_unload_goes_back_to_the_database(self, snapshot_path, license_obj):
+        write_snapshot(snapshot_path)
+        catalogue.load_snapshot(snapshot_path)
+        new = LicenseFactory()
+
+        catalogue.unload_snapshot()
+
+        assert catalogue.get(new.pk) is not None
+
+    def test_setting_loads_snapshot_at_startup(
+        self, snapshot_path, license_obj, settings
+    ):
+        write_snapshot(snapshot_path)
+        settings.LICENSING_SNAPSHOT = str(snapshot_path)
+
+        apps.get_app_config("licensing").ready()
+
+        assert catalogue.from_snapshot
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"format": SNAPSHOT_FORMAT},
+            {"format": SNAPSHOT_FORMAT, "fields": list(LicenseCatalogue.fields)},
+            {"format": SNAPSHOT_FORMAT, "fields": 3, "licenses": []},
+            {
+                "format": SNAPSHOT_FORMAT,
+                "fields": [*LicenseCatalogue.fields, "text"],
+                "licenses": [[1, "A", "a", "https://example.com", True, "t", "extra"]],
+            },
+            [],
+        ],
+    )
+    def test_rejects_malformed_files(self, snapshot_path, data):
+        snapshot_path.write_text(json.dumps(data))
+
+        with pytest.raises(ImproperlyConfigured):
+            catalogue.load_snapshot(snapshot_path)
+
+    def test_reports_load_time(self, snapshot_path, licenses, caplog):
+        write_snapshot(snapshot_path)
+
+        with caplog.at_level("INFO", logger="licensing.cache"):
+            assert catalogue.load_snapshot(snapshot_path) == 3
+
+        assert " ms." in caplog.text
+
+    def test_rejects_other_formats(self, snapshot_path):
+        snapshot_path.write_text(json.dumps({"format": SNAPSHOT_FORMAT + 1}))
+
+        with pytest.raises(ImproperlyConfigured, match="format"):
+            catalogue.load_snapshot(snapshot_path)
+
+    def test_rejects_unreadable_file(self, snapshot_path):
+        with pytest.raises(ImproperlyConfigured, match="Cannot read"):
+            catalogue.load_snapshot(snapshot_path)
+
+
+@pytest.fixture(params=["locmem", "filebased"])
+def licensing_cache(request, settings, tmp_path):
+    """Point LICENSING_CACHE at a fresh cache of each backend under test."""
+    backends = {
+        "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "filebased": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        },
+    }
+    settings.CACHES = {
+        "default": backends["locmem"],
+        "licensing": {**backends[request.param], "KEY_PREFIX": tmp_path.name},
+    }
+    settings.LICENSING_CACHE = "licensing"
+    return caches["licensing"]
+
+
+class TestCatalogueVersion:
+    """The catalogue version shared through Django's cache."""
+
+    def test_bump_increments_the_shared_counter(self, licensing_cache):
+        version = catalogue.version
+
+        catalogue.bump()
+
+        assert licensing_cache.get(catalogue.version_key) == version + 1
+
+    def test_other_processes_see_a_bump(self, licensing_cache, license_obj):
+        # Each LicenseCatalogue has its own in-memory state, like a process.
+        other = LicenseCatalogue()
+        assert other.get(license_obj.pk).name == license_obj.name
+
+        License.objects.filter(pk=license_obj.pk).update(name="Renamed")
+
+        assert other.get(license_obj.pk).name == "Renamed"
+
+    def test_lost_counter_restarts_above_the_old_one(self, licensing_cache):
+        version = catalogue.version
+
+        licensing_cache.delete(catalogue.version_key)
+
+        assert catalogue.version > version
+
+    def test_bump_after_a_lost_counter(self, licensing_cache):
+        licensing_cache.delete(catalogue.version_key)
+
+        catalogue.bump()
+
+        assert catalogue.version is not None
+
+    def test_follows_a_changed_cache_setting(self, licensing_cache, settings):
+        assert catalogue.cache is caches["licensing"]
+
+        settings.LICENSING_CACHE = "default"
+
+        assert catalogue.cache is caches["default"]
+
+    def test_recent_version_skips_the_round_trip(self, licensing_cache):
+        # Each LicenseCatalogue has its own in-memory state, like a process.
+        other = LicenseCatalogue()
+        version = other.version
+
+        licensing_cache.incr(catalogue.version_key)
+
+        assert other.recent_version(60) == version
+        assert other.recent_version(0) == version + 1
+
+    def test_bump_forgets_the_recent_version(self, licensing_cache):
+        version = catalogue.version
+
+        catalogue.bump()
+
+        assert catalogue.recent_version(60) == version + 1
+
+    def test_keys_embed_the_version(self, licensing_cache):
+        key = catalogue.make_key("snippet", 3)
+
+        catalogue.bump()
+
+        assert key == f"licensing:{catalogue.version - 1}:snippet:3"
+        assert catalogue.make_key("snippet", 3) != key
+
+    def test_rows_read_in_a_transaction_stay_local(
+        self, licensing_cache, license_obj, django_assert_num_queries
+    ):
+        catalogue.entries()
+
+        with django_assert_num_queries(1):
+            LicenseCatalogue().entries()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogueSharedRows:
+    """Outside transactions, loaded rows are shared through the cache."""
+
+    def test_other_processes_reuse_loaded_rows(
+        self, licensing_cache, django_assert_num_queries
+    ):
+        LicenseFactory()
+        catalogue.entries()
+
+        with django_assert_num_queries(0):
+            assert len(LicenseCatalogue().entries()) == 1
@@ -0,0 +1,142 @@
+"""Tests for the licensing management commands."""
+
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from example.models import MirroredTestModel, TestModel
+from licensing.bundle import BUNDLED_CATALOGUE
+from licensing.models import License
+from tests.factories import LicenseFactory
+
+
+class TestSyncLicenseMirrors:
+    """The sync_license_mirrors command."""
+
+    def test_resyncs_stale_rows(self, mit_license, gpl_license):
+        MirroredTestModel.objects.create(content_license=mit_license)
+        MirroredTestModel.objects.create(content_license=gpl_license)
+        MirroredTestModel.objects.update(content_license_name="stale")
+        out = StringIO()
+
+        call_command("sync_license_mirrors", stdout=out)
+
+        assert "Updated 2 row(s)." in out.getvalue()
+        assert set(
+            MirroredTestModel.objects.values_list("content_license_name", flat=True)
+        ) == {mit_license.name, gpl_license.name}
+
+    def test_limits_to_named_licenses(self, mit_license, gpl_license):
+        MirroredTestModel.objects.create(content_license=mit_license)
+        MirroredTestModel.objects.create(content_license=gpl_license)
+        MirroredTestModel.objects.update(content_license_name="stale")
+
+        call_command(
+            "sync_license_mirrors", "--license", mit_license.slug, stdout=StringIO()
+        )
+
+        assert (
+            MirroredTestModel.objects.filter(content_license_name="stale").count() == 1
+        )
+
+    def test_rejects_unknown_slug(self):
+        with pytest.raises(CommandError, match="no-such-license"):
+            call_command("sync_license_mirrors", "--license", "no-such-license")
+
+
+class TestExportLicenseSnapshot:
+    """The export_license_snapshot command."""
+
+    def test_writes_loadable_snapshot(self, tmp_path, licenses):
+        path = tmp_path / "catalogue.json"
+        out = StringIO()
+
+        call_command("export_license_snapshot", str(path), stdout=out)
+
+        assert "Wrote 3 license(s)" in out.getvalue()
+        data = json.loads(path.read_text())
+        assert "text" not in data["fields"]
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_with_text(self, tmp_path, license_obj):
+        path = tmp_path / "catalogue.json"
+
+        call_command(
+            "export_license_snapshot", str(path), "--with-text", stdout=StringIO()
+        )
+
+        data = json.loads(path.read_text())
+        assert data["fields"][-1] == "text"
+        assert data["licenses"][0][-1] == license_obj.text
+
+
+class TestBuildLicenseBundle:
+    """The build_license_bundle command."""
+
+    def test_builds_bundle_from_fixture(self, tmp_path):
+        output = tmp_path / "catalogue.bundle"
+
+        call_command("build_license_bundle", "--output", str(output), stdout=StringIO())
+
+        assert output.read_bytes() == BUNDLED_CATALOGUE.read_bytes()
+
+
+class TestExportManifest:
+    """The export_manifest command."""
+
+    def test_writes_gzipped_manifest(self, tmp_path, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+        path = tmp_path / "manifest.jsonl.gz"
+
+        call_command(
+            "export_manifest", str(path), "--format", "jsonl", stderr=StringIO()
+        )
+
+        (line,) = gzip.decompress(path.read_bytes()).splitlines()
+        assert json.loads(line)["license"] == license_obj.name
+
+    def test_uncompressed(self, tmp_path, license_obj):
+        path = tmp_path / "manifest.csv"
+
+        call_command("export_manifest", str(path), "--no-gzip", stderr=StringIO())
+
+        assert path.read_text().startswith("model,pk,field")
+
+
+class TestIdentifyLicense:
+    """The identify_license command."""
+
+    def test_prints_matches(self, tmp_path):
+        call_command("loaddata", "creativecommons", verbosity=0)
+        path = tmp_path / "LICENSE"
+        path.write_text(License.objects.get(slug="cc-by-nc-40").text)
+        out = StringIO()
+
+        call_command("identify_license", str(path), "--limit", "2", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith("cc-by-nc-40\t1.00\t")
+
+    def test_no_match(self, tmp_path, license_obj):
+        path = tmp_path / "LICENSE"
+        path.write_text("Nothing like any license text we know of.")
+
+        with pytest.raises(CommandError, match="No license"):
+            call_command("identify_license", str(path))
+
+    def test_unreadable_file(self, tmp_path):
+        with pytest.raises(CommandError, match="Cannot read"):
+            call_command("identify_license", str(tmp_path / "missing"))
+
+    def test_duplicates(self, license_obj):
+        LicenseFactory(slug="copy", text=license_obj.text)
+        out = StringIO()
+
+        call_command("identify_license", "--duplicates", stdout=out)
+
+        first, second = sorted(["copy", license_obj.slug])
+        assert out.getvalue() == f"{first}\t{second}\t1.00\n"
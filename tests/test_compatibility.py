@@ -0,0 +1,143 @@
+"""Tests for the license compatibility matrix in licensing.compatibility."""
+
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from licensing import compatibility
+from licensing.cache import CatalogueEntry
+from licensing.compatibility import CompatibilityMatrix
+from licensing.models import License, LicenseCompatibility
+from tests.factories import LicenseFactory
+
+
+@pytest.fixture
+def cc():
+    call_command(
+        "loaddata", "creativecommons", "creativecommons_compatibility", verbosity=0
+    )
+    return {license_obj.slug: license_obj for license_obj in License.objects.all()}
+
+
+def entry(pk, name, is_active=True):
+    return CatalogueEntry(
+        pk, name, name.lower(), f"https://example.com/{pk}", is_active
+    )
+
+
+class TestCompatibilityMatrix:
+    def test_outcome_is_most_permissive_common_target(self):
+        a, b, c, d = entry(1, "A"), entry(2, "B"), entry(3, "C"), entry(4, "D")
+        matrix = CompatibilityMatrix([a, b, c, d], [(1, 2), (1, 3), (2, 3), (4, 3)])
+
+        assert matrix.outcome([1]) == a
+        assert matrix.outcome([1, 2]) == b
+        assert matrix.outcome([1, 4]) == c
+        assert matrix.outcomes([1]) == [a, b, c]
+        assert matrix.outcome([2, 4]) == c
+
+    def test_incompatible(self):
+        matrix = CompatibilityMatrix([entry(1, "A"), entry(2, "B")], [])
+
+        combination = matrix.check([1, 2])
+
+        assert not combination.compatible
+        assert combination.outcome is None
+        assert not matrix.is_compatible([1, 2])
+
+    def test_closes_transitively(self):
+        a, b, c = entry(1, "A"), entry(2, "B"), entry(3, "C")
+        matrix = CompatibilityMatrix([c, b, a], [(1, 2), (2, 3)])
+
+        assert matrix.outcomes([1]) == [a, b, c]
+
+    def test_prefers_active_licenses(self):
+        old, new = entry(1, "Old", is_active=False), entry(2, "New")
+        source = entry(3, "Source")
+        matrix = CompatibilityMatrix([old, new, source], [(3, 1), (3, 2), (1, 2)])
+
+        # Old reaches more licenses than New, but is deprecated.
+        assert matrix.outcomes([3]) == [source, new, old]
+
+    def test_scales_past_a_machine_word(self):
+        entries = [entry(pk, f"L{pk:03}") for pk in range(200)]
+        # A chain: each license's material may go into every later one.
+        matrix = CompatibilityMatrix(entries, [(pk, pk + 1) for pk in range(199)])
+
+        assert matrix.outcome(range(0, 150, 7)) == entries[147]
+        assert matrix.outcome([199]) == entries[199]
+
+    def test_unknown_license(self):
+        with pytest.raises(LookupError, match="99"):
+            CompatibilityMatrix([entry(1, "A")], []).outcome([99])
+
+
+class TestCreativeCommons:
+    def test_share_alike_and_non_commercial_do_not_mix(self, cc):
+        assert not compatibility.checker.check(
+            [cc["cc-by-sa-40"], cc["cc-by-nc-40"]]
+        ).compatible
+
+    @pytest.mark.parametrize(
+        "slugs, outcome",
+        [
+            (["cc0-10"], "cc0-10"),
+            (["cc0-10", "cc-by-40"], "cc-by-40"),
+            (["cc-by-40", "cc-by-sa-40"], "cc-by-sa-40"),
+            (["cc-by-40", "cc-by-nc-40"], "cc-by-nc-40"),
+            (["cc-by-sa-40", "cc-by-nc-sa-40"], None),
+            (["cc-by-nc-40", "cc-by-nc-sa-40", "cc0-10"], "cc-by-nc-sa-40"),
+            (["cc-by-nd-40", "cc-by-40"], None),
+            (["cc-by-nd-40"], "cc-by-nd-40"),
+        ],
+    )
+    def test_outcomes(self, cc, slugs, outcome):
+        combination = compatibility.checker.check(cc[slug] for slug in slugs)
+
+        assert getattr(combination.outcome, "slug", None) == outcome
+        assert [entry.slug for entry in combination.licenses] == slugs
+
+
+class TestMatrixCache:
+    def test_warm_check_runs_no_queries(self, cc, django_assert_num_queries):
+        compatibility.checker.check([cc["cc-by-40"]])
+
+        with django_assert_num_queries(0):
+            compatibility.checker.check([cc["cc-by-40"], cc["cc0-10"]])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_rebuilt_on_compatibility_changes(self, cc):
+        by_sa, by_nc = cc["cc-by-sa-40"], cc["cc-by-nc-40"]
+        assert not compatibility.checker.check([by_sa, by_nc]).compatible
+
+        LicenseCompatibility.objects.bulk_create(
+            [LicenseCompatibility(source=by_sa, target=by_nc)]
+        )
+        assert compatibility.checker.check([by_sa, by_nc]).outcome.slug == "cc-by-nc-40"
+
+        LicenseCompatibility.objects.filter(source=by_sa).delete()
+        assert not compatibility.checker.check([by_sa, by_nc]).compatible
+
+    def test_rebuilt_on_catalogue_changes(self, cc):
+        compatibility.checker.check([cc["cc-by-40"]])
+        cc["cc-by-40"].is_active = False
+        cc["cc-by-40"].deprecated_date = datetime.date(2024, 1, 1)
+        cc["cc-by-40"].save()
+        newcomer = LicenseFactory()
+
+        # Deprecated, CC BY is no longer the outcome of combining it with CC0:
+        # the most permissive active license it may go into is.
+        assert compatibility.checker.check([cc["cc0-10"]]).outcome.slug == "cc0-10"
+        assert (
+            compatibility.checker.check([cc["cc0-10"], cc["cc-by-40"]]).outcome.slug
+            == "cc-by-nc-40"
+        )
+        assert compatibility.checker.check([newcomer]).outcome.pk == newcomer.pk
+
+
+class TestLicenseCompatibility:
+    def test_rejects_self_pairs(self, license_obj):
+        with pytest.raises(IntegrityError):
+            LicenseCompatibility.objects.create(source=license_obj, target=license_obj)
@@ -0,0 +1,35 @@
+"""Tests for the line delta codec, licensing.delta.DeltaCodec."""
+
+import pytest
+
+from licensing.delta import codec
+
+TEXT = "".join(f"Clause {n}: the licensee shall do thing {n}.\n" for n in range(400))
+
+
+class TestDeltaCodec:
+    @pytest.mark.parametrize(
+        "new",
+        [
+            TEXT.replace("thing 7.", "thing seven."),
+            "Preamble.\n" + TEXT,
+            TEXT[: len(TEXT) // 2],
+            TEXT + "No trailing newline",
+            "",
+        ],
+        ids=["reworded", "prepended", "truncated", "appended", "emptied"],
+    )
+    def test_round_trip(self, new):
+        assert codec.patch(TEXT, codec.diff(TEXT, new)) == new
+
+    def test_small_edit_is_much_smaller_than_the_text(self):
+        changes = codec.diff(TEXT, TEXT.replace("thing 7.", "thing seven."))
+
+        assert len(changes) * 10 < len(codec.compress(TEXT))
+
+    def test_compress_round_trip(self):
+        assert codec.decompress(memoryview(codec.compress(TEXT))) == TEXT
+
+    def test_digest_tells_texts_apart(self):
+        assert codec.digest(TEXT) == codec.digest(TEXT)
+        assert codec.digest(TEXT) != codec.digest(TEXT + " ")
@@ -2,8 +2,11 @@
 
 import pytest
 from django.db import models
+from django.db.models import ProtectedError
 from django.template import Context, Template
 
+from licensing import background
+from licensing.attribution import templates
 from licensing.fields import LicenseField
 from licensing.models import License
 from tests.factories import LicenseFactory
@@ -187,7 +190,9 @@ class TestLicenseFieldContributeToClass:
             license = LicenseField()
 
             class Meta:
-                app_label = "licensing"
+                # Not "licensing": a throwaway model in an installed app joins
+                # License's reverse relations and breaks later usage queries.
+                app_label = "test"
 
         assert hasattr(TestModel, "get_license_display")
         assert callable(TestModel.get_license_display)
@@ -216,6 +221,214 @@ class TestLicenseFieldContributeToClass:
         assert callable(ContentLicensedModel.get_content_license_display)
 
 
+class TestLicenseFieldInstalled:
+    """LicenseField.installed() lists the license fields of installed models."""
+
+    def test_lists_installed_fields(self):
+        from example.models import MirroredTestModel, TestModel
+
+        assert set(LicenseField.installed()) == {
+            MirroredTestModel._meta.get_field("content_license"),
+            TestModel._meta.get_field("content_license"),
+        }
+
+    def test_ignores_models_outside_installed_apps(self):
+        class UninstalledLicensedModel(models.Model):
+            license = LicenseField()
+
+            class Meta:
+                app_label = "test"
+
+        assert UninstalledLicensedModel._meta.get_field("license") not in (
+            LicenseField.installed()
+        )
+
+
+class TestLicenseFieldValidate:
+    """LicenseField.validate() checks the referenced license via the catalogue."""
+
+    def test_known_license_validates_without_a_query(
+        self, license_obj, django_assert_num_queries
+    ):
+        from example.models import TestModel
+
+        field = TestModel._meta.get_field("content_license")
+        field.formfield().clean(license_obj.pk)  # warm the catalogue cache
+
+        with django_assert_num_queries(0):
+            field.validate(license_obj.pk, TestModel())
+
+    def test_unknown_license_is_rejected(self, license_obj):
+        from django.core.exceptions import ValidationError
+
+        from example.models import TestModel
+
+        field = TestModel._meta.get_field("content_license")
+
+        with pytest.raises(ValidationError):
+            field.validate(0, TestModel())
+
+
+class TestLicenseFieldMirror:
+    """LicenseField(mirror=...) copies license attributes into shadow columns."""
+
+    def test_adds_shadow_columns(self):
+        from example.models import MirroredTestModel
+
+        field = MirroredTestModel._meta.get_field("content_license_canonical_url")
+
+        assert isinstance(field, models.URLField)
+        assert field.null and not field.editable
+
+    def test_abstract_models_leave_columns_to_children(self):
+        class AbstractMirrored(models.Model):
+            license = LicenseField(mirror=("name",))
+
+            class Meta:
+                abstract = True
+                app_label = "test"
+
+        class ConcreteMirrored(AbstractMirrored):
+            class Meta:
+                app_label = "test"
+
+        names = [field.name for field in ConcreteMirrored._meta.fields]
+        assert names.count("license_name") == 1
+
+    def test_deconstructs_mirror(self):
+        from example.models import MirroredTestModel
+
+        _, _, _, kwargs = MirroredTestModel._meta.get_field(
+            "content_license"
+        ).deconstruct()
+
+        assert kwargs["mirror"] == ("name", "slug", "canonical_url")
+
+    def test_rejects_unknown_attributes(self):
+        class BadMirrorModel(models.Model):
+            license = LicenseField(mirror=("text",))
+
+            class Meta:
+                app_label = "test"
+
+        errors = BadMirrorModel._meta.get_field("license").check()
+
+        assert [error.id for error in errors] == ["licensing.E001"]
+        assert not hasattr(BadMirrorModel, "license_text")
+
+    def test_save_fills_columns(self, mit_license):
+        from example.models import MirroredTestModel
+
+        obj = MirroredTestModel.objects.create(content_license=mit_license)
+        obj.refresh_from_db()
+
+        assert obj.content_license_name == "MIT License"
+        assert obj.content_license_slug == mit_license.slug
+        assert obj.content_license_canonical_url == mit_license.canonical_url
+
+    def test_save_by_id_fills_columns_from_catalogue(self, mit_license):
+        from example.models import MirroredTestModel
+
+        obj = MirroredTestModel(content_license_id=mit_license.pk)
+        obj.save()
+
+        assert obj.content_license_name == "MIT License"
+
+    def test_display_renders_without_loading_the_license(
+        self, mit_license, django_assert_num_queries
+    ):
+        from example.models import MirroredTestModel
+
+        MirroredTestModel.objects.create(content_license=mit_license)
+        obj = MirroredTestModel.objects.get()
+        # Read once per catalogue version, not per render.
+        templates.compiled()
+
+        with django_assert_num_queries(0):
+            html = obj.get_content_license_display()
+
+        assert "MIT License" in html
+        assert mit_license.canonical_url in html
+
+    def test_license_change_is_propagated(
+        self, mit_license, gpl_license, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        from example.models import MirroredTestModel
+
+        obj = MirroredTestModel.objects.create(content_license=mit_license)
+        other = MirroredTestModel.objects.create(content_license=gpl_license)
+        jobs = []
+        monkeypatch.setattr(background, "submit", lambda key, *job: jobs.append(job))
+
+        mit_license.name = "Expat License"
+        with django_capture_on_commit_callbacks(execute=True):
+            mit_license.save()
+        # The background worker's connection cannot see this test's rows.
+        for fn, *args in jobs:
+            fn(*args)
+
+        obj.refresh_from_db()
+        other.refresh_from_db()
+        assert obj.content_license_name == "Expat License"
+        assert other.content_license_name == gpl_license.name
+
+    def test_unrelated_update_fields_are_not_propagated(
+        self, mit_license, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks() as callbacks:
+            mit_license.save(update_fields=["description"])
+
+        assert all("propagate" not in repr(callback) for callback in callbacks)
+
+    def test_propagation_can_be_left_to_the_command(
+        self, mit_license, settings, django_capture_on_commit_callbacks
+    ):
+        settings.LICENSING_PROPAGATE_MIRRORS = False
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            mit_license.save()
+
+        assert all("propagate" not in repr(callback) for callback in callbacks)
+
+    def test_propagation_in_batches(self, mit_license, django_assert_num_queries):
+        from example.models import MirroredTestModel
+
+        MirroredTestModel.objects.bulk_create(
+            MirroredTestModel(content_license=mit_license) for _ in range(5)
+        )
+        MirroredTestModel.objects.update(content_license_name=None)
+        field = MirroredTestModel._meta.get_field("content_license")
+
+        # Three batches of pks and their updates, then an empty batch.
+        with django_assert_num_queries(7):
+            assert field.propagate_mirror(mit_license, batch_size=2) == 5
+
+    def test_unfilled_columns_fall_back_to_the_catalogue(self, mit_license):
+        from example.models import MirroredTestModel
+
+        MirroredTestModel.objects.create(content_license=mit_license)
+        # As for rows that predate the columns.
+        MirroredTestModel.objects.update(
+            content_license_name=None, content_license_canonical_url=None
+        )
+        obj = MirroredTestModel.objects.get()
+
+        assert obj.content_license_mirror.name == "MIT License"
+        assert (
+            f'href="{mit_license.canonical_url}"' in obj.get_content_license_display()
+        )
+
+    def test_propagation_skips_rows_already_in_sync(self, mit_license):
+        from example.models import MirroredTestModel
+
+        MirroredTestModel.objects.create(content_license=mit_license)
+        field = MirroredTestModel._meta.get_field("content_license")
+
+        assert field.propagate_mirror(mit_license) == 0
+        MirroredTestModel.objects.update(content_license_name=None)
+        assert field.propagate_mirror(mit_license) == 1
+
+
 @pytest.fixture
 def cc_by_license():
     """The Creative Commons BY 4.0 licence shared by the attribution template tests."""
@@ -421,6 +634,123 @@ class TestLicenseFieldInRealModel:
         assert related_objects.count() == 2
 
 
+class TestLicensesField:
+    """example.models.MultiLicensedTestModel, a many-to-many LicensesField user."""
+
+    @pytest.fixture
+    def dual_licensed(self, mit_license, gpl_license):
+        from example.models import MultiLicensedTestModel
+
+        def create():
+            obj = MultiLicensedTestModel.objects.create()
+            obj.licenses.set([mit_license, gpl_license])
+            return obj
+
+        return create
+
+    def test_display_names_every_license(self, dual_licensed):
+        from example.models import MultiLicensedTestModel
+
+        obj = MultiLicensedTestModel.objects.with_licenses().get(pk=dual_licensed().pk)
+
+        html = obj.get_licenses_display()
+        assert "is available under" in html
+        assert "GNU General Public License v3.0</a> or <a" in html
+        assert html.index("GNU General") < html.index("MIT License")
+        assert 'href="https://opensource.org/licenses/MIT"' in html
+
+    def test_display_separates_three_licenses(self, licenses):
+        from example.models import MultiLicensedTestModel
+
+        obj = MultiLicensedTestModel.objects.create()
+        obj.licenses.set(licenses)
+
+        html = (
+            MultiLicensedTestModel.objects.with_licenses().get().get_licenses_display()
+        )
+        assert html.count("</a>, <a") == 1
+        assert html.count("</a> or <a") == 1
+
+    def test_license_in_use_is_protected(self, dual_licensed, mit_license):
+        obj = dual_licensed()
+
+        with pytest.raises(ProtectedError):
+            mit_license.delete()
+
+        obj.delete()
+        mit_license.delete()
+
+    def test_display_without_licenses(self):
+        from example.models import MultiLicensedTestModel
+
+        assert MultiLicensedTestModel.objects.create().get_licenses_display() == ""
+
+    def test_render_all_is_two_queries(self, dual_licensed, django_assert_num_queries):
+        from example.models import MultiLicensedTestModel
+        from licensing.attribution import render_all
+
+        for _ in range(5):
+            dual_licensed()
+
+        # Rows, then one prefetch of every row's licenses.
+        with django_assert_num_queries(2):
+            rendered = render_all(MultiLicensedTestModel.objects.all(), "licenses")
+
+        assert len(rendered) == 5
+        assert all("MIT License" in html for html in rendered)
+
+    def test_with_licenses_skips_text(self, dual_licensed):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from example.models import MultiLicensedTestModel
+
+        dual_licensed()
+        with CaptureQueriesContext(connection) as ctx:
+            list(MultiLicensedTestModel.objects.with_licenses())
+
+        sql = ctx.captured_queries[1]["sql"]
+        assert '"licensing_license"."canonical_url"' in sql
+        assert '"licensing_license"."text"' not in sql
+
+    def test_with_licenses_rejects_other_fields(self):
+        from example.models import MultiLicensedTestModel
+        from licensing.utils import InvalidLicenseFieldError, LicenseFieldNotFoundError
+
+        with pytest.raises(InvalidLicenseFieldError):
+            MultiLicensedTestModel.objects.with_licenses("id")
+        with pytest.raises(LicenseFieldNotFoundError):
+            MultiLicensedTestModel.objects.with_licenses("missing")
+
+    def test_with_licenses_rejects_model_without_licenses_field(self):
+        from example.models import TestModel
+        from licensing.utils import LicenseFieldNotFoundError
+
+        with pytest.raises(LicenseFieldNotFoundError):
+            TestModel.objects.with_licenses()
+
+    def test_cached_snippet_follows_the_licenses(self, dual_licensed, license_obj):
+        from example.models import MultiLicensedTestModel
+
+        obj = dual_licensed()
+        assert license_obj.name not in obj.get_licenses_display()
+
+        obj.licenses.add(license_obj)
+        obj = MultiLicensedTestModel.objects.get(pk=obj.pk)
+
+        assert license_obj.name in obj.get_licenses_display()
+
+    def test_installed(self):
+        from example.models import MultiLicensedTestModel
+        from licensing.fields import LicensesField
+
+        assert (
+            MultiLicensedTestModel._meta.get_field("licenses")
+            in LicensesField.installed()
+        )
+        assert not any(isinstance(f, LicensesField) for f in LicenseField.installed())
+
+
 class TestLicenseAdmin:
     """License admin display methods."""
 
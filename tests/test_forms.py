@@ -0,0 +1,116 @@
+"""Tests for the license form fields in licensing.forms."""
+
+import datetime
+
+import pytest
+from django import forms
+
+from example.models import TestModel
+from licensing.forms import LicenseChoiceField
+from tests.factories import LicenseFactory
+
+
+class TestModelForm(forms.ModelForm):
+    class Meta:
+        model = TestModel
+        fields = ["content_license"]
+
+
+@pytest.fixture
+def deprecated_license():
+    """A saved, deprecated licence."""
+    return LicenseFactory(
+        name="Old License", is_active=False, deprecated_date=datetime.date(2020, 1, 1)
+    )
+
+
+def option_values(form):
+    # Through the bound field, as rendering does, so the form's initial is known.
+    return [str(widget.data["value"]) for widget in form["content_license"].subwidgets]
+
+
+class TestLicenseChoiceField:
+    """LicenseChoiceField: cached choices, active-only defaults, and validation."""
+
+    def test_is_the_license_field_default(self):
+        assert isinstance(TestModelForm().fields["content_license"], LicenseChoiceField)
+
+    def test_renders_many_forms_without_queries(
+        self, licenses, django_assert_num_queries
+    ):
+        TestModelForm().as_p()  # warm the catalogue cache
+
+        with django_assert_num_queries(0):
+            for _ in range(10):
+                TestModelForm().as_p()
+
+    def test_offers_only_active_licenses(self, licenses, deprecated_license):
+        values = option_values(TestModelForm())
+
+        assert str(deprecated_license.pk) not in values
+        assert values[1:] == [str(obj.pk) for obj in sorted(licenses, key=str)]
+
+    def test_edit_keeps_current_deprecated_license(self, licenses, deprecated_license):
+        content = TestModel.objects.create(content_license=deprecated_license)
+
+        form = TestModelForm(instance=content)
+
+        assert str(deprecated_license.pk) in option_values(form)
+        assert f'value="{deprecated_license.pk}" selected' in form.as_p()
+
+    def test_edit_can_resubmit_current_deprecated_license(self, deprecated_license):
+        content = TestModel.objects.create(content_license=deprecated_license)
+
+        form = TestModelForm(
+            {"content_license": deprecated_license.pk}, instance=content
+        )
+
+        assert form.is_valid(), form.errors
+
+    def test_rejects_newly_chosen_deprecated_license(self, deprecated_license):
+        form = TestModelForm({"content_license": deprecated_license.pk})
+
+        assert not form.is_valid()
+        assert form.errors["content_license"][0].startswith("Old License is deprecated")
+
+    def test_validates_and_saves_from_the_cache(
+        self, license_obj, django_assert_num_queries
+    ):
+        TestModelForm().as_p()  # warm the catalogue cache
+        form = TestModelForm({"content_license": license_obj.pk})
+
+        with django_assert_num_queries(0):
+            assert form.is_valid(), form.errors
+        content = form.save()
+
+        content.refresh_from_db()
+        assert content.content_license == license_obj
+
+    @pytest.mark.parametrize("value", ["0", "not-a-pk"])
+    def test_rejects_unknown_values(self, licenses, value):
+        form = TestModelForm({"content_license": value})
+
+        assert not form.is_valid()
+        assert form.errors["content_license"][0].startswith("Select a valid choice")
+
+    def test_allows_deprecated_when_not_active_only(self, deprecated_license):
+        from licensing.models import License
+
+        field = LicenseChoiceField(License.objects.all(), active_only=False)
+
+        assert str(deprecated_license.pk) in [str(value) for value, _ in field.choices]
+        assert field.clean(deprecated_license.pk) == deprecated_license
+
+    def test_filtered_queryset_falls_back_to_querying(
+        self, licenses, django_assert_num_queries
+    ):
+        from licensing.models import License
+
+        field = LicenseChoiceField(License.objects.filter(name__startswith="MIT"))
+
+        assert not field.cacheable
+        with django_assert_num_queries(1):
+            choices = list(field.choices)
+        assert [label for _value, label in choices] == ["---------", "MIT License"]
+        with pytest.raises(forms.ValidationError):
+            field.clean(licenses[2].pk)  # GPL: outside the filtered queryset
@@ -0,0 +1,160 @@
+"""Tests for license text identification in licensing.identify."""
+
+import json
+import logging
+
+import pytest
+from django.core.management import call_command
+
+from licensing.identify import identifier, identify, minhash
+from licensing.models import License
+from tests.factories import LicenseFactory
+
+
+@pytest.fixture
+def creative_commons(django_capture_on_commit_callbacks):
+    # As if committed, so the fixture's own near-duplicate check has run.
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("loaddata", "creativecommons", verbosity=0)
+    return {license_obj.slug: license_obj for license_obj in License.objects.all()}
+
+
+def drift(text):
+    """The same text as a user might paste it: re-wrapped, re-cased, re-punctuated."""
+    return " ".join(text.upper().replace(".", " .").replace(",", "").split())
+
+
+class TestMinHash:
+    def test_ignores_whitespace_case_and_punctuation(self):
+        text = "You may copy, and redistribute the material.\n\nIn any medium."
+
+        assert minhash.signature(text) == minhash.signature(drift(text))
+
+    def test_estimates_shared_shingles(self, creative_commons):
+        text = creative_commons["cc-by-40"].text
+        edited = text.replace("Licensor", "Grantor", 3)
+
+        a, b = (minhash.unpack(minhash.signature(t)) for t in (text, edited))
+
+        assert minhash.similarity(a, b) > 0.9
+
+    def test_stored_on_save(self, license_obj):
+        license_obj.text = "Brand new wording of the license."
+        license_obj.save()
+
+        license_obj.refresh_from_db()
+        assert bytes(license_obj.text_signature) == minhash.signature(license_obj.text)
+
+
+class TestIdentify:
+    def test_best_match_first(self, creative_commons):
+        matches = identify(drift(creative_commons["cc-by-sa-40"].text))
+
+        assert matches[0].license.slug == "cc-by-sa-40"
+        assert matches[0].similarity > 0.99
+        assert all(match.similarity < 0.99 for match in matches[1:])
+
+    def test_unrelated_text_matches_nothing(self, creative_commons):
+        assert (
+            identify("Lorem ipsum dolor sit amet, consectetur adipiscing elit.") == []
+        )
+
+    def test_warm_lookup_runs_no_queries(
+        self, creative_commons, django_assert_num_queries
+    ):
+        identify(creative_commons["cc-by-40"].text)
+
+        with django_assert_num_queries(0):
+            identify(creative_commons["cc0-10"].text)
+
+    def test_follows_license_edits(self, creative_commons):
+        cc0 = creative_commons["cc0-10"]
+        identify(cc0.text)
+
+        cc0.text = creative_commons["cc-by-40"].text + " Extra."
+        cc0.save()
+
+        assert {match.license.slug for match in identify(cc0.text)[:2]} == {
+            "cc0-10",
+            "cc-by-40",
+        }
+
+
+class TestNearDuplicates:
+    def test_fixture_import_flags_duplicates(
+        self, creative_commons, tmp_path, caplog, django_capture_on_commit_callbacks
+    ):
+        fixture = tmp_path / "copy.json"
+        fields = {
+            "name": "Copy",
+            "slug": "copy",
+            "canonical_url": "https://example.com/copy",
+            "text": drift(creative_commons["cc-by-40"].text),
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+        fixture.write_text(
+            json.dumps([{"model": "licensing.license", "pk": 99, "fields": fields}])
+        )
+
+        with (
+            caplog.at_level(logging.WARNING, logger="licensing.identify"),
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            call_command("loaddata", fixture, verbosity=0)
+
+        assert "'copy' is a near-duplicate of 'cc-by-40'" in caplog.text
+
+    def test_fixture_import_flags_once_it_commits(
+        self,
+        creative_commons,
+        tmp_path,
+        caplog,
+        monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        builds = []
+        build = identifier._index.build
+        monkeypatch.setattr(
+            identifier._index, "build", lambda: builds.append(1) or build()
+        )
+        rows = [
+            {
+                "model": "licensing.license",
+                "pk": 90 + n,
+                "fields": {
+                    "name": f"Copy {n}",
+                    "slug": f"copy-{n}",
+                    "canonical_url": f"https://example.com/copy-{n}",
+                    "text": drift(creative_commons["cc0-10"].text),
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "updated_at": "2024-01-01T00:00:00Z",
+                },
+            }
+            for n in range(3)
+        ]
+        fixture = tmp_path / "copies.json"
+        fixture.write_text(json.dumps(rows))
+
+        with (
+            caplog.at_level(logging.WARNING, logger="licensing.identify"),
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            call_command("loaddata", fixture, verbosity=0)
+            # Nothing is flagged before the load commits.
+            assert builds == []
+
+        assert len(builds) == 1
+        # Each pair once: three to cc0-10, three among the copies.
+        assert caplog.text.count("is a near-duplicate of") == 6
+
+    def test_bulk_create_flags_duplicates(self, creative_commons, caplog):
+        copy = LicenseFactory.build(text=creative_commons["cc0-10"].text)
+
+        with caplog.at_level(logging.WARNING, logger="licensing.identify"):
+            License.objects.bulk_create([copy])
+
+        assert "near-duplicate of 'cc0-10'" in caplog.text
+
+    def test_creative_commons_variants_are_not_duplicates(self, creative_commons):
+        assert identifier.near_duplicates(creative_commons.values()) == []
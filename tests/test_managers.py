@@ -0,0 +1,150 @@
+"""Tests for licensing.managers.LicensedQuerySet."""
+
+import datetime
+
+import pytest
+from django.db import connection, models
+from django.test.utils import CaptureQueriesContext
+
+from example.models import TestModel
+from licensing.fields import LicenseField
+from licensing.managers import LicensedQuerySet
+from licensing.utils import InvalidLicenseFieldError, LicenseFieldNotFoundError
+from tests.factories import LicenseFactory
+
+
+class DualLicensedModel(models.Model):
+    """Two license fields; only used to inspect generated SQL, never queried."""
+
+    code_license = LicenseField(related_name="+")
+    docs_license = LicenseField(related_name="+", null=True)
+    title = models.CharField(max_length=50)
+
+    objects = LicensedQuerySet.as_manager()
+
+    class Meta:
+        app_label = "test"
+
+
+class UnlicensedModel(models.Model):
+    """No license field at all; only used to check lookups refuse it."""
+
+    title = models.CharField(max_length=50)
+
+    objects = LicensedQuerySet.as_manager()
+
+    class Meta:
+        app_label = "test"
+
+
+@pytest.fixture
+def deprecated_license():
+    return LicenseFactory(is_active=False, deprecated_date=datetime.date(2020, 1, 1))
+
+
+class TestWithLicense:
+    """with_license() joins only the attribution columns."""
+
+    def test_joins_in_the_same_query(self, django_assert_num_queries, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+
+        with django_assert_num_queries(1):
+            obj = TestModel.objects.with_license().get()
+            assert obj.content_license.name == license_obj.name
+            assert obj.content_license.canonical_url == license_obj.canonical_url
+
+    def test_skips_text_and_description(self, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+
+        with CaptureQueriesContext(connection) as ctx:
+            list(TestModel.objects.with_license())
+
+        sql = ctx.captured_queries[0]["sql"]
+        assert '"licensing_license"."name"' in sql
+        assert '"licensing_license"."text"' not in sql
+        assert '"licensing_license"."description"' not in sql
+
+    def test_joins_every_license_field(self):
+        qs = DualLicensedModel.objects.with_license()
+
+        assert qs.query.select_related == {"code_license": {}, "docs_license": {}}
+
+    def test_joins_named_fields_only(self):
+        qs = DualLicensedModel.objects.with_license("docs_license")
+
+        assert qs.query.select_related == {"docs_license": {}}
+
+    def test_rejects_unknown_field(self):
+        with pytest.raises(LicenseFieldNotFoundError):
+            TestModel.objects.with_license("missing")
+
+    def test_rejects_non_license_field(self):
+        with pytest.raises(InvalidLicenseFieldError):
+            DualLicensedModel.objects.with_license("title")
+
+
+class TestUnderActiveLicenses:
+    """under_active_licenses() filters on cached ids, without a join."""
+
+    def test_excludes_deprecated_licenses(self, license_obj, deprecated_license):
+        active = TestModel.objects.create(content_license=license_obj)
+        TestModel.objects.create(content_license=deprecated_license)
+
+        assert list(TestModel.objects.under_active_licenses()) == [active]
+
+    def test_uses_the_smaller_id_set(self, licenses, deprecated_license):
+        qs = TestModel.objects.under_active_licenses()
+
+        sql = str(qs.query)
+        assert "licensing_license" not in sql
+        assert f"IN ({deprecated_license.pk})" in sql
+
+    def test_all_deprecated(self, deprecated_license):
+        TestModel.objects.create(content_license=deprecated_license)
+
+        assert not TestModel.objects.under_active_licenses().exists()
+
+    def test_requires_every_license_field_active(self, licenses, deprecated_license):
+        # docs_license is nullable; a missing license does not count as active.
+        sql = str(DualLicensedModel.objects.under_active_licenses().query)
+
+        assert '"code_license_id"' in sql
+        assert '"docs_license_id" IS NOT NULL' in sql
+
+    def test_rejects_model_without_license_field(self):
+        with pytest.raises(LicenseFieldNotFoundError):
+            UnlicensedModel.objects.under_active_licenses()
+
+    def test_catalogue_is_loaded_once(self, django_assert_num_queries, licenses):
+        # The catalogue, then the filtered rows; afterwards just the rows.
+        with django_assert_num_queries(2):
+            list(TestModel.objects.under_active_licenses())
+        with django_assert_num_queries(1):
+            list(TestModel.objects.under_active_licenses())
+
+
+class TestByLicenseSlug:
+    """by_license_slug() resolves the slug from the catalogue."""
+
+    def test_filters_by_slug(self, mit_license, gpl_license):
+        mit = TestModel.objects.create(content_license=mit_license)
+        TestModel.objects.create(content_license=gpl_license)
+
+        assert list(TestModel.objects.by_license_slug(mit_license.slug)) == [mit]
+
+    def test_unknown_slug_matches_nothing(self, django_assert_num_queries, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+        qs = TestModel.objects.by_license_slug("no-such-license")
+
+        with django_assert_num_queries(0):
+            assert list(qs) == []
+
+    def test_matches_any_license_field(self, license_obj):
+        sql = str(DualLicensedModel.objects.by_license_slug(license_obj.slug).query)
+
+        assert "licensing_license" not in sql
+        assert f'"code_license_id" = {license_obj.pk} OR' in sql
+
+    def test_rejects_model_without_license_field(self, license_obj):
+        with pytest.raises(LicenseFieldNotFoundError):
+            UnlicensedModel.objects.by_license_slug(license_obj.slug)
@@ -0,0 +1,97 @@
+"""Tests for the Link: rel="license" headers in licensing.middleware."""
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.views.generic import DetailView
+
+from example.models import TestModel
+from licensing.cache import catalogue
+from licensing.middleware import LicenseLinkMiddleware, license_link
+
+detail_view = DetailView.as_view(model=TestModel, template_name="empty.html")
+
+
+def get_detail(obj):
+    middleware = LicenseLinkMiddleware(lambda request: detail_view(request, pk=obj.pk))
+    return middleware(RequestFactory().get("/"))
+
+
+class TestLicenseLinkMiddleware:
+    def test_detail_view_gets_the_header(self, content, mit_license):
+        response = get_detail(content)
+
+        assert response["Link"] == f'<{mit_license.canonical_url}>; rel="license"'
+
+    def test_adds_no_queries(self, content, mit_license, django_assert_num_queries):
+        catalogue.get(mit_license.pk)
+
+        # The object itself, as without the middleware.
+        with django_assert_num_queries(1):
+            response = get_detail(content)
+
+        assert "Link" in response
+
+    def test_warm_response_makes_no_cache_call(self, content, monkeypatch):
+        request = RequestFactory().get("/")
+        request.licensed_object = content
+        middleware = LicenseLinkMiddleware(lambda request: HttpResponse())
+        middleware(request)
+        calls = []
+        get = catalogue.cache.get
+        monkeypatch.setattr(
+            catalogue.cache, "get", lambda *args: calls.append(args) or get(*args)
+        )
+
+        response = middleware(request)
+
+        assert "Link" in response
+        assert calls == []
+
+    def test_object_set_on_the_request(self, content, mit_license):
+        request = RequestFactory().get("/")
+        request.licensed_object = content
+
+        response = LicenseLinkMiddleware(lambda request: HttpResponse())(request)
+
+        assert mit_license.canonical_url in response["Link"]
+
+    def test_keeps_existing_links(self, content):
+        request = RequestFactory().get("/")
+        request.licensed_object = content
+
+        def view(request):
+            response = HttpResponse()
+            response["Link"] = '</style.css>; rel="preload"'
+            return response
+
+        response = LicenseLinkMiddleware(view)(request)
+
+        assert response["Link"].startswith('</style.css>; rel="preload", <')
+
+    def test_no_object_no_header(self):
+        middleware = LicenseLinkMiddleware(lambda request: HttpResponse())
+
+        response = middleware(RequestFactory().get("/"))
+
+        assert "Link" not in response
+
+    def test_deferred_license_is_not_fetched(self, content, django_assert_num_queries):
+        request = RequestFactory().get("/")
+        request.licensed_object = TestModel.objects.defer("content_license").get()
+
+        with django_assert_num_queries(0):
+            response = LicenseLinkMiddleware(lambda request: HttpResponse())(request)
+
+        assert "Link" not in response
+
+
+class TestLicenseLinkDecorator:
+    def test_decorated_view(self, content, mit_license):
+        @license_link
+        def view(request):
+            request.licensed_object = content
+            return HttpResponse()
+
+        response = view(RequestFactory().get("/"))
+
+        assert response["Link"] == f'<{mit_license.canonical_url}>; rel="license"'
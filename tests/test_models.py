@@ -5,6 +5,10 @@ import time
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.utils import timezone
 
 from licensing.models import License
@@ -92,14 +96,15 @@ class TestLicense:
         assert license_obj.short_description == expected
 
     @pytest.mark.parametrize(
-        "is_active, expected",
+        "overrides, expected",
         [
-            (True, "Active"),
-            (False, "Deprecated"),
+            ({"is_active": True}, "Active"),
+            # The deprecation check constraint requires the date on saved rows.
+            ({"is_active": False, "deprecated_date": DEPRECATION_DATE}, "Deprecated"),
         ],
     )
-    def test_status_display_property(self, is_active, expected):
-        license_obj = LicenseFactory(is_active=is_active)
+    def test_status_display_property(self, overrides, expected):
+        license_obj = LicenseFactory(**overrides)
         assert license_obj.status_display == expected
 
     def test_deprecated_date_field(self):
@@ -144,6 +149,18 @@ class TestLicenseSlug:
         # Slug should be regenerated.
         assert license_obj.slug == "bsd-license"
 
+    @pytest.mark.parametrize("name", ["Autocomplete", "Manifest"])
+    def test_generated_slug_skips_reserved(self, name):
+        assert LicenseFactory(name=name).slug == f"{name.lower()}-1"
+
+    def test_reserved_slug_fails_validation(self):
+        license_obj = LicenseFactory.build(slug="manifest")
+
+        with pytest.raises(ValidationError) as excinfo:
+            license_obj.clean()
+
+        assert "slug" in excinfo.value.message_dict
+
     def test_slug_generation_with_empty_name_fallback(self):
         license_obj = LicenseFactory(name="!!!")  # Doesn't generate a valid slug
         assert license_obj.slug == "license"
@@ -231,6 +248,75 @@ class TestLicenseQuerySet:
         deprecated_licenses = License.objects.filter(is_active=False)
         assert deprecated_licenses.count() == 1
 
+    def test_deprecate(self, three_licenses):
+        active, deprecated, cc = three_licenses
+
+        count = License.objects.all().deprecate(DEPRECATION_DATE)
+
+        assert count == 2
+        active.refresh_from_db()
+        deprecated.refresh_from_db()
+        assert not active.is_active
+        assert active.deprecated_date == DEPRECATION_DATE
+        # An already-deprecated license keeps its original date.
+        assert deprecated.deprecated_date == datetime.date(2020, 1, 1)
+
+    def test_deprecate_defaults_to_today(self, license_obj):
+        License.objects.filter(pk=license_obj.pk).deprecate()
+
+        license_obj.refresh_from_db()
+        assert license_obj.deprecated_date == timezone.localdate()
+
+    def test_reactivate(self, three_licenses):
+        active, deprecated, cc = three_licenses
+
+        count = License.objects.all().reactivate()
+
+        assert count == 1
+        deprecated.refresh_from_db()
+        assert deprecated.is_active
+        assert deprecated.deprecated_date is None
+
+    def test_lifecycle_changes_are_single_updates(
+        self, three_licenses, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            License.objects.all().deprecate()
+        with django_assert_num_queries(1):
+            License.objects.all().reactivate()
+
+    def test_lifecycle_changes_touch_updated_at(self, license_obj):
+        original = license_obj.updated_at
+
+        License.objects.filter(pk=license_obj.pk).deprecate()
+
+        license_obj.refresh_from_db()
+        assert license_obj.updated_at > original
+
+    def test_with_usage(self, three_licenses, django_assert_num_queries):
+        from example.models import TestModel
+
+        active, deprecated, cc = three_licenses
+        TestModel.objects.create(content_license=active)
+        TestModel.objects.create(content_license=active)
+        TestModel.objects.create(content_license=deprecated)
+
+        with django_assert_num_queries(1):
+            usage = {obj.name: obj.usage_count for obj in License.objects.with_usage()}
+
+        assert usage == {active.name: 2, deprecated.name: 1, cc.name: 0}
+
+    def test_autocomplete_without_term_ranks_active_first(self, three_licenses):
+        active, deprecated, cc = three_licenses
+
+        assert list(License.objects.autocomplete()) == [cc, active, deprecated]
+
+    def test_autocomplete_filters_by_name_or_slug(self, three_licenses):
+        active, deprecated, cc = three_licenses
+
+        assert list(License.objects.autocomplete("MIT")) == [active]
+        assert list(License.objects.autocomplete("creative-comm")) == [cc]
+
     def test_declared_indexes(self):
         """The fields the lookup paths rely on are actually indexed.
 
@@ -243,6 +329,7 @@ class TestLicenseQuerySet:
 
         assert ("is_active",) in indexed
         assert ("slug",) in indexed
+        assert ("-is_active", "name") in indexed
 
 
 class TestLicenseValidation:
@@ -325,6 +412,54 @@ class TestLicenseValidation:
         license_obj.clean()  # Should not raise
 
 
+class TestLicenseDeprecationConstraint:
+    """The database enforces the is_active / deprecated_date invariant."""
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"is_active": False},
+            {"is_active": True, "deprecated_date": DEPRECATION_DATE},
+        ],
+    )
+    def test_save_rejects_inconsistent_state(self, overrides):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            LicenseFactory(**overrides)
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"is_active": False},
+            {"deprecated_date": DEPRECATION_DATE},
+        ],
+    )
+    def test_queryset_update_rejects_inconsistent_state(self, licenses, changes):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            License.objects.all().update(**changes)
+
+    def test_bulk_update_rejects_inconsistent_state(self, licenses):
+        for license_obj in licenses:
+            license_obj.is_active = False
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            License.objects.bulk_update(licenses, ["is_active"])
+
+    def test_consistent_bulk_update_is_accepted(self, licenses):
+        License.objects.all().update(is_active=False, deprecated_date=DEPRECATION_DATE)
+
+        assert not License.objects.filter(is_active=True).exists()
+
+    def test_full_clean_reports_clean_error_once(self):
+        license_obj = LicenseFactory.build(is_active=False)
+
+        with pytest.raises(ValidationError) as excinfo:
+            license_obj.full_clean()
+
+        # clean() owns the message; the constraint check must not repeat it.
+        assert list(excinfo.value.error_dict) == ["deprecated_date"]
+        assert len(excinfo.value.error_dict["deprecated_date"]) == 1
+
+
 class TestLicenseTimestamps:
     """created_at / updated_at auto-population."""
 
@@ -357,3 +492,217 @@ class TestLicenseTimestamps:
         license_obj.save()
 
         assert license_obj.created_at == original_created_at
+
+
+class TestLicenseHtml:
+    """The pre-rendered description_html and text_html columns."""
+
+    def test_rendered_on_save(self):
+        license_obj = LicenseFactory(text="One <b>.\n\nTwo.", description="Short.")
+
+        license_obj.refresh_from_db()
+        assert license_obj.text_html == "<p>One &lt;b&gt;.</p>\n\n<p>Two.</p>"
+        assert license_obj.description_html == "<p>Short.</p>"
+
+    def test_update_fields_include_the_html(self, license_obj):
+        license_obj.text = "Revised."
+        license_obj.save(update_fields=["text"])
+
+        license_obj.refresh_from_db()
+        assert license_obj.text_html == "<p>Revised.</p>"
+
+    def test_saving_with_deferred_text_does_not_fetch_it(
+        self, license_obj, django_assert_num_queries
+    ):
+        license_obj = License.objects.defer("text").get(pk=license_obj.pk)
+        license_obj.name = "Renamed"
+
+        # The slug check is skipped (slug is set), leaving the UPDATE alone.
+        with django_assert_num_queries(1):
+            license_obj.save()
+
+    def test_update_renders_once_for_every_row(self, licenses):
+        License.objects.update(text="Same\ntext")
+
+        assert set(License.objects.values_list("text_html", flat=True)) == {
+            "<p>Same<br>text</p>"
+        }
+
+    def test_update_with_an_expression(self, license_obj):
+        License.objects.filter(pk=license_obj.pk).update(
+            description=Concat(Value("<i>"), "name", output_field=models.TextField())
+        )
+
+        license_obj.refresh_from_db()
+        assert license_obj.description_html == f"<p>&lt;i&gt;{license_obj.name}</p>"
+
+    def test_bulk_create(self):
+        (license_obj,) = License.objects.bulk_create(
+            [LicenseFactory.build(text="Bulk.")]
+        )
+
+        assert License.objects.get(slug=license_obj.slug).text_html == "<p>Bulk.</p>"
+
+    def test_bulk_update(self, licenses):
+        for license_obj in licenses:
+            license_obj.description = f"About {license_obj.pk}."
+
+        License.objects.bulk_update(licenses, ["description"])
+
+        for license_obj in License.objects.all():
+            assert license_obj.description_html == f"<p>About {license_obj.pk}.</p>"
+
+    def test_rendered_for_fixtures(self, tmp_path):
+        fixture = tmp_path / "licenses.json"
+        fixture.write_text(
+            '[{"model": "licensing.license", "pk": 90, "fields": {"name": "Loaded",'
+            ' "slug": "loaded", "canonical_url": "https://example.com/loaded",'
+            ' "text": "From a fixture.", "is_active": true,'
+            ' "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}}]'
+        )
+
+        call_command("loaddata", fixture, verbosity=0)
+
+        assert License.objects.get(pk=90).text_html == "<p>From a fixture.</p>"
+
+    def test_refresh_derived_repairs_rows(self, license_obj):
+        License.objects.filter(pk=license_obj.pk).update(text_html="")
+        assert License.objects.get(pk=license_obj.pk).text_html == ""
+
+        assert License.objects.refresh_derived() == 1
+
+        assert License.objects.get(pk=license_obj.pk).text_html.startswith("<p>")
+
+
+@pytest.fixture
+def long_license():
+    """A license with a text long enough for deltas to beat snapshots."""
+    return LicenseFactory(
+        text="".join(f"Clause {n}: the licensee shall.\n" for n in range(200))
+    )
+
+
+class TestLicenseRevision:
+    """Text history stored as snapshots and deltas."""
+
+    def reword(self, license_obj, n):
+        license_obj.text = f"{license_obj.text}\nAmendment {n}."
+        license_obj.save()
+
+    def test_created_license_has_a_snapshot(self, license_obj):
+        (revision,) = license_obj.revisions.all()
+
+        assert revision.number == 1
+        assert revision.is_snapshot
+        assert revision.text == license_obj.text
+
+    def test_rewording_records_a_delta(self, long_license):
+        original = long_license.text
+        self.reword(long_license, 1)
+
+        first, second = long_license.revisions.all()
+
+        assert not second.is_snapshot
+        assert first.text == original
+        assert second.text == long_license.text
+
+    def test_unchanged_text_records_nothing(self, license_obj):
+        license_obj.name = "Renamed"
+        license_obj.save()
+        license_obj.save(update_fields=["text"])
+
+        assert license_obj.revisions.count() == 1
+
+    def test_snapshot_interval_bounds_the_chain(
+        self, long_license, settings, django_assert_num_queries
+    ):
+        settings.LICENSING_REVISION_SNAPSHOT_INTERVAL = 3
+        for n in range(7):
+            self.reword(long_license, n)
+
+        revisions = list(long_license.revisions.all())
+
+        assert [revision.is_snapshot for revision in revisions] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+            False,
+        ]
+        last = License.objects.get(pk=long_license.pk).revisions.last()
+        assert len(last.chain()) == 2
+        with django_assert_num_queries(1):
+            assert last.text == long_license.text
+
+    def test_every_revision_rebuilds(self, long_license):
+        texts = [long_license.text]
+        for n in range(12):
+            self.reword(long_license, n)
+            texts.append(long_license.text)
+
+        assert [revision.text for revision in long_license.revisions.all()] == texts
+
+    def test_corrupt_chain_is_followed_by_a_snapshot(self, long_license, caplog):
+        self.reword(long_license, 1)
+        long_license.revisions.filter(number=2).update(digest="0" * 32)
+
+        self.reword(long_license, 2)
+
+        latest = long_license.revisions.last()
+        assert latest.number == 3
+        assert latest.is_snapshot
+        assert latest.text == long_license.text
+        assert "did not rebuild" in caplog.text
+
+    def test_delta_is_smaller_than_the_text(self, license_obj):
+        license_obj.text = "".join(f"Clause {n}.\n" for n in range(2000))
+        license_obj.save()
+        license_obj.text = license_obj.text.replace("Clause 5.", "Clause five.")
+        license_obj.save()
+
+        snapshot, reworded = list(license_obj.revisions.all())[-2:]
+
+        assert len(bytes(reworded.data)) * 10 < len(bytes(snapshot.data))
+
+    def test_bulk_paths_record_revisions(self, licenses):
+        License.objects.update(text="Same text")
+        for license_obj in licenses:
+            license_obj.text = f"Own text {license_obj.pk}"
+        License.objects.bulk_update(licenses, ["text"])
+        (created,) = License.objects.bulk_create([LicenseFactory.build(text="Bulk")])
+
+        for license_obj in licenses:
+            texts = [revision.text for revision in license_obj.revisions.all()]
+            assert texts[-2:] == ["Same text", f"Own text {license_obj.pk}"]
+        assert [revision.text for revision in created.revisions.all()] == ["Bulk"]
+
+    def test_update_records_in_two_more_queries(
+        self, licenses, django_assert_num_queries
+    ):
+        # The pks and the UPDATE, then the current revisions and the insert.
+        with django_assert_num_queries(4):
+            License.objects.update(text="Same text")
+
+    def test_bulk_update_records_once(self, licenses, django_assert_num_queries):
+        for license_obj in licenses:
+            license_obj.text = f"Own text {license_obj.pk}"
+
+        # The pks, the UPDATE and the new texts, then the current revisions
+        # and the insert: the revisions are looked up once.
+        with django_assert_num_queries(5):
+            License.objects.bulk_update(licenses, ["text"])
+
+        for license_obj in licenses:
+            assert license_obj.revisions.count() == 2
+
+    def test_text_at(self, long_license):
+        original = long_license.text
+        before_edit = timezone.now()
+        self.reword(long_license, 1)
+
+        assert long_license.text_at(before_edit) == original
+        assert long_license.text_at(timezone.now()) == long_license.text
+        assert long_license.text_at(before_edit - datetime.timedelta(days=1)) is None
@@ -0,0 +1,177 @@
+"""Tests for the parallel attribution pre-renderer in licensing.prerender."""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from example.models import MirroredTestModel, MultiLicensedTestModel, TestModel
+from licensing import prerender
+from licensing.attribution import templates
+from licensing.prerender import AttributionPrerenderer
+
+FIELD = TestModel._meta.get_field("content_license")
+LABEL = "example.testmodel.content_license"
+
+
+@pytest.fixture
+def contents(license_obj):
+    return [TestModel.objects.create(content_license=license_obj) for _ in range(5)]
+
+
+def read_jsonl(directory):
+    return [
+        json.loads(line)
+        for shard in sorted(
+            directory.glob("*.jsonl"), key=lambda p: int(p.name.split("-")[0])
+        )
+        for line in shard.read_text().splitlines()
+    ]
+
+
+class TestAttributionPrerenderer:
+    """Sharded, resumable pre-rendering."""
+
+    def test_writes_one_shard_per_chunk(self, tmp_path, contents, license_obj):
+        counts = AttributionPrerenderer(tmp_path, processes=0, chunk_size=2).run(
+            [FIELD]
+        )
+
+        directory = tmp_path / LABEL
+        assert counts == {LABEL: 5}
+        assert len(list(directory.glob("*.jsonl"))) == 3
+        rows = read_jsonl(directory)
+        assert [row["pk"] for row in rows] == [obj.pk for obj in contents]
+        assert license_obj.name in rows[0]["html"]
+
+    def test_html_fragments(self, tmp_path, contents):
+        AttributionPrerenderer(tmp_path, output_format="html", processes=0).run([FIELD])
+
+        (shard,) = (tmp_path / LABEL).glob("*.html")
+        assert shard.read_text().startswith(f'<div data-pk="{contents[0].pk}">')
+
+    def test_resumes_after_the_watermark(self, tmp_path, contents):
+        AttributionPrerenderer(tmp_path, processes=0, chunk_size=2).run([FIELD])
+        directory = tmp_path / LABEL
+        # Simulate a crash after the first shard: later shards are partial work.
+        (directory / "progress.json").write_text(
+            json.dumps({"watermark": contents[1].pk})
+        )
+
+        counts = AttributionPrerenderer(tmp_path, processes=0, chunk_size=2).run(
+            [FIELD]
+        )
+
+        assert counts == {LABEL: 3}
+        assert [row["pk"] for row in read_jsonl(directory)] == [
+            obj.pk for obj in contents
+        ]
+
+    def test_reports_progress(self, tmp_path, contents):
+        calls = []
+
+        AttributionPrerenderer(
+            tmp_path,
+            processes=0,
+            chunk_size=2,
+            progress=lambda label, done, total, elapsed: calls.append((done, total)),
+        ).run([FIELD])
+
+        assert calls == [(2, 5), (4, 5), (5, 5)]
+
+    def test_renders_mirrored_fields_without_the_license(
+        self, tmp_path, mit_license, django_assert_num_queries
+    ):
+        MirroredTestModel.objects.create(content_license=mit_license)
+        field = MirroredTestModel._meta.get_field("content_license")
+        # Read once per catalogue version, not per render.
+        templates.compiled()
+
+        # Pks, rows; no license query.
+        with django_assert_num_queries(2):
+            AttributionPrerenderer(tmp_path, processes=0).run([field])
+
+    def test_renders_multi_licensed_fields_with_one_prefetch(
+        self, tmp_path, licenses, django_assert_num_queries
+    ):
+        for _ in range(3):
+            MultiLicensedTestModel.objects.create().licenses.set(licenses)
+        field = MultiLicensedTestModel._meta.get_field("licenses")
+        label = "example.multilicensedtestmodel.licenses"
+
+        # Pks, rows, licenses.
+        with django_assert_num_queries(3):
+            counts = AttributionPrerenderer(tmp_path, processes=0).run([field])
+
+        assert counts == {label: 3}
+        assert all(
+            licenses[1].name in row["html"] for row in read_jsonl(tmp_path / label)
+        )
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            AttributionPrerenderer(tmp_path, output_format="xml")
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAttributionPrerendererPool:
+    """Rendering in worker processes."""
+
+    def test_process_pool(self, tmp_path, contents):
+        counts = AttributionPrerenderer(tmp_path, processes=2, chunk_size=2).run(
+            [FIELD]
+        )
+
+        assert counts == {LABEL: 5}
+        assert len(read_jsonl(tmp_path / LABEL)) == 5
+
+    def test_no_queries_once_the_pool_exists(self, tmp_path, contents, monkeypatch):
+        # Workers fork on the first submit: the connections this process holds
+        # then are the ones closed just before the pool was created.
+        queries_at = []
+
+        class RecordingPool(ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                queries_at.append(len(ctx))
+                super().__init__(*args, **kwargs)
+
+            def __exit__(self, *exc_info):
+                queries_at.append(len(ctx))
+                return super().__exit__(*exc_info)
+
+        monkeypatch.setattr(prerender, "ProcessPoolExecutor", RecordingPool)
+        with CaptureQueriesContext(connection) as ctx:
+            AttributionPrerenderer(tmp_path, processes=2, chunk_size=2).run([FIELD])
+
+        assert queries_at[0] == queries_at[1] > 0
+
+
+class TestPrerenderAttributionsCommand:
+    """The prerender_attributions management command."""
+
+    def test_renders_selected_models(self, tmp_path, contents):
+        out = StringIO()
+
+        call_command(
+            "prerender_attributions",
+            str(tmp_path),
+            "--model",
+            "example.TestModel",
+            "--processes",
+            "0",
+            stdout=out,
+        )
+
+        assert f"{LABEL}: 5/5" in out.getvalue()
+        assert f"{LABEL}: rendered 5 row(s)." in out.getvalue()
+        assert not (tmp_path / "example.mirroredtestmodel.content_license").exists()
+
+    def test_unknown_model(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command(
+                "prerender_attributions", str(tmp_path), "--model", "example.Nope"
+            )
@@ -0,0 +1,91 @@
+"""Tests for licensing.routers.LicenseReplicaRouter, over two SQLite databases."""
+
+import pytest
+from django.core.signals import request_started
+
+from example.models import TestModel
+from licensing.cache import catalogue
+from licensing.models import License
+from licensing.routers import LicenseReplicaRouter, unpin
+from tests.factories import LicenseFactory
+
+pytestmark = pytest.mark.django_db(databases=["default", "replica"])
+
+
+@pytest.fixture
+def replica_router(settings):
+    settings.DATABASE_ROUTERS = ["licensing.routers.LicenseReplicaRouter"]
+    settings.LICENSING_REPLICA_DATABASE = "replica"
+    unpin()
+    yield
+    unpin()
+
+
+def replica_license(**kwargs):
+    """A license that exists only on the replica, written without pinning."""
+    return License.objects.using("replica").create(
+        name="Replica License", canonical_url="https://example.com/replica", **kwargs
+    )
+
+
+class TestLicenseReplicaRouter:
+    """Reads go to the replica until the context writes."""
+
+    def test_reads_go_to_the_replica(self, replica_router):
+        replica_license()
+
+        assert License.objects.get().name == "Replica License"
+        assert not License.objects.using("default").exists()
+
+    def test_writes_go_to_the_primary(self, replica_router):
+        LicenseFactory()
+
+        assert License.objects.using("default").count() == 1
+        assert not License.objects.using("replica").exists()
+
+    def test_reads_stick_to_the_primary_after_a_write(self, replica_router):
+        replica_license()
+        written = LicenseFactory()
+
+        assert list(License.objects.all()) == [written]
+
+    def test_request_started_unpins(self, replica_router):
+        replica_license()
+        LicenseFactory()
+
+        request_started.send(sender=None)
+
+        assert License.objects.get().name == "Replica License"
+
+    def test_primary_hint(self, replica_router):
+        replica_license()
+
+        assert not License.objects.db_manager(hints={"primary": True}).exists()
+
+    def test_catalogue_loads_from_the_primary(self, replica_router):
+        replica_license()
+
+        assert catalogue.entries() == ()
+
+    def test_content_may_point_at_a_replica_license(self, replica_router):
+        # Same pk on both databases, as replication would give.
+        License.objects.using("default").create(
+            name="Replica License", canonical_url="https://example.com/replica"
+        )
+        unpin()
+        license_obj = replica_license()
+
+        content = TestModel(content_license=license_obj)
+
+        assert content.content_license_id == license_obj.pk
+
+    def test_other_apps_are_not_routed(self, replica_router):
+        router = LicenseReplicaRouter()
+
+        assert router.db_for_read(TestModel) is None
+        assert router.db_for_write(TestModel) is None
+
+    def test_inactive_without_a_replica(self, settings):
+        settings.LICENSING_REPLICA_DATABASE = None
+
+        assert LicenseReplicaRouter().db_for_read(License) is None
@@ -0,0 +1,125 @@
+"""Tests for full-text license search: licensing.search and LicenseQuerySet.search()."""
+
+import pytest
+from django.db import connection
+
+from licensing import search
+from licensing.models import License
+from tests.factories import LicenseFactory
+
+
+@pytest.fixture
+def catalogue_texts():
+    return [
+        LicenseFactory(
+            name="Warranty License",
+            description="Plain terms.",
+            text="Nothing else.",
+        ),
+        LicenseFactory(
+            name="Patent License",
+            description="Covers a warranty disclaimer.",
+            text="Grants patent rights.",
+        ),
+        LicenseFactory(
+            name="Plain License",
+            description="Short.",
+            text="Provided without warranty of any kind, and with patent grants.",
+        ),
+    ]
+
+
+def names(queryset):
+    return [license_obj.name for license_obj in queryset]
+
+
+class TestSearch:
+    def test_matches_name_description_and_text(self, catalogue_texts):
+        # Weighted: a name match ranks above a description match above a text match.
+        assert names(License.objects.search("warranty")) == [
+            "Warranty License",
+            "Patent License",
+            "Plain License",
+        ]
+
+    def test_matches_every_word(self, catalogue_texts):
+        assert names(License.objects.search("patent warranty")) == [
+            "Patent License",
+            "Plain License",
+        ]
+
+    def test_stems_words(self, catalogue_texts):
+        assert names(License.objects.search("granting")) == [
+            "Patent License",
+            "Plain License",
+        ]
+
+    def test_ignores_query_syntax(self, catalogue_texts):
+        assert names(License.objects.search('"patent" (warranty*')) == [
+            "Patent License",
+            "Plain License",
+        ]
+
+    def test_blank_terms_match_everything(self, catalogue_texts):
+        assert License.objects.search(" ?! ").count() == 3
+
+    def test_runs_one_query(self, catalogue_texts, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            results = list(License.objects.search("patent"))
+
+        assert all(result.search_rank > 0 for result in results)
+
+    def test_composes_with_other_filters(self, catalogue_texts):
+        matches = License.objects.filter(name__startswith="Plain").search("warranty")
+
+        assert names(matches) == ["Plain License"]
+
+    def test_follows_bulk_writes(self, catalogue_texts):
+        License.objects.filter(name="Plain License").update(text="Rewritten.")
+        License.objects.bulk_create(
+            [LicenseFactory.build(name="New", text="Warranty here.")]
+        )
+        License.objects.filter(name="Patent License").delete()
+
+        assert names(License.objects.search("warranty")) == ["Warranty License", "New"]
+
+    def test_follows_raw_sql(self, catalogue_texts):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE licensing_license SET text = 'Indemnity.' WHERE name = 'Warranty License'"
+            )
+
+        assert names(License.objects.search("indemnity")) == ["Warranty License"]
+
+    def test_fallback_without_index(self, catalogue_texts, monkeypatch):
+        monkeypatch.setattr(search.index, "has_fts", lambda alias: False)
+
+        assert names(License.objects.search("Warranty PATENT")) == [
+            "Patent License",
+            "Plain License",
+        ]
+
+
+class TestRepair:
+    def test_restores_dropped_triggers(self, catalogue_texts):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER licensing_license_fts_update")
+        License.objects.filter(name="Plain License").update(text="Indemnity.")
+
+        assert search.index.repair_fts(connection)
+        assert names(License.objects.search("indemnity")) == ["Plain License"]
+        assert not search.index.repair_fts(connection)
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="The GIN index is PostgreSQL's."
+)
+class TestPostgresIndex:
+    def test_search_is_served_by_the_index(self, catalogue_texts):
+        with connection.cursor() as cursor:
+            # Three rows would otherwise be scanned, index or not.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plan = License.objects.search("warranty").explain()
+
+        assert search.INDEX_NAME in plan
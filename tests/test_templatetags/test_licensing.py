@@ -0,0 +1,72 @@
+"""Tests for the machine-readable attribution tags in licensing.templatetags.licensing."""
+
+from django.template import Context, Template
+from django.test import RequestFactory
+
+from example.models import TestModel
+
+
+def render(source, **context):
+    return Template("{% load licensing %}" + source).render(Context(context))
+
+
+class TestLicenseJsonldTag:
+    """{% license_jsonld %} renders one JSON-LD script for a list or an object."""
+
+    def test_renders_a_list(self, content, mit_license):
+        html = render(
+            "{% license_jsonld objects 'content_license' %}", objects=[content]
+        )
+
+        assert html.startswith('<script type="application/ld+json">')
+        assert mit_license.canonical_url in html
+
+    def test_accepts_a_single_object(self, content, mit_license):
+        html = render("{% license_jsonld object 'content_license' %}", object=content)
+
+        assert mit_license.canonical_url in html
+
+    def test_uses_the_request_for_absolute_urls(self, content):
+        html = render(
+            "{% license_jsonld object 'content_license' %}",
+            object=content,
+            request=RequestFactory().get("/"),
+        )
+
+        assert f"http://testserver{content.get_absolute_url()}" in html
+
+
+class TestLicenseRdfaTag:
+    """{% license_rdfa %} links each work to its license."""
+
+    def test_links_the_license(self, content, mit_license):
+        html = render("{% license_rdfa object 'content_license' %}", object=content)
+
+        assert (
+            f'rel="license" property="license" href="{mit_license.canonical_url}"'
+            in html
+        )
+
+    def test_renders_a_queryset(self, licenses):
+        TestModel.objects.bulk_create(
+            TestModel(content_license=license_obj) for license_obj in licenses
+        )
+
+        html = render(
+            "{% license_rdfa objects 'content_license' %}",
+            objects=TestModel.objects.all(),
+        )
+
+        assert html.count('typeof="CreativeWork"') == len(licenses)
+
+
+class TestLicenseCollectionTag:
+    """{% license_collection %} renders one combined attribution block."""
+
+    def test_renders_one_block(self, content, mit_license):
+        html = render(
+            "{% license_collection objects 'content_license' %}", objects=[content]
+        )
+
+        assert "1 work is licensed under" in html
+        assert mit_license.name in html
@@ -0,0 +1,243 @@
+"""Tests for the catalogue views in licensing.views."""
+
+import datetime
+import gzip
+import json
+
+import pytest
+from django.urls import reverse
+
+from example.models import TestModel
+from tests.factories import LicenseFactory
+
+AUTOCOMPLETE_URL = reverse("licensing:autocomplete")
+
+
+@pytest.fixture
+def cc_licenses():
+    """Active and deprecated CC licenses plus one that only mentions "by" mid-name."""
+    return {
+        "by": LicenseFactory(name="CC BY 4.0", slug="cc-by-40"),
+        "by_sa": LicenseFactory(name="CC BY-SA 4.0", slug="cc-by-sa-40"),
+        "old_by": LicenseFactory(
+            name="CC BY 2.0",
+            slug="cc-by-20",
+            is_active=False,
+            deprecated_date=datetime.date(2020, 1, 1),
+        ),
+        "mid": LicenseFactory(name="Public Domain by Dedication", slug="pd-dedication"),
+    }
+
+
+class TestLicenseAutocompleteView:
+    """The select2-shaped JSON search endpoint."""
+
+    def test_ranks_active_then_prefix_matches(self, client, cc_licenses):
+        response = client.get(AUTOCOMPLETE_URL, {"term": "cc by"})
+
+        names = [result["text"] for result in response.json()["results"]]
+        assert names == ["CC BY 4.0", "CC BY-SA 4.0", "CC BY 2.0"]
+
+    def test_substring_matches_rank_after_prefix_matches(self, client, cc_licenses):
+        response = client.get(AUTOCOMPLETE_URL, {"term": "by"})
+
+        names = [result["text"] for result in response.json()["results"]]
+        assert names[-1] == "CC BY 2.0"  # deprecated always last
+        assert names.index("Public Domain by Dedication") == 2
+
+    def test_matches_slug(self, client, cc_licenses):
+        response = client.get(AUTOCOMPLETE_URL, {"term": "pd-ded"})
+
+        assert response.json()["results"] == [
+            {
+                "id": str(cc_licenses["mid"].pk),
+                "text": "Public Domain by Dedication",
+                "slug": "pd-dedication",
+                "is_active": True,
+            }
+        ]
+
+    def test_paginates_from_the_catalogue_cache(
+        self, client, django_assert_num_queries
+    ):
+        LicenseFactory.create_batch(25)
+
+        with django_assert_num_queries(1):
+            first = client.get(AUTOCOMPLETE_URL).json()
+        with django_assert_num_queries(0):
+            second = client.get(AUTOCOMPLETE_URL, {"page": 2}).json()
+
+        assert len(first["results"]) == 20
+        assert first["pagination"] == {"more": True}
+        assert len(second["results"]) == 5
+        assert second["pagination"] == {"more": False}
+
+    def test_invalid_page_falls_back_to_first(self, client, license_obj):
+        response = client.get(AUTOCOMPLETE_URL, {"page": "nope"})
+
+        assert response.json()["results"][0]["id"] == str(license_obj.pk)
+
+
+MANIFEST_URL = reverse("licensing:manifest")
+
+
+class TestLicenseManifestView:
+    """The staff-only streaming manifest download."""
+
+    def test_streams_gzipped_csv(self, admin_client, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+
+        response = admin_client.get(MANIFEST_URL)
+
+        assert response.streaming
+        assert response["Content-Type"] == "application/gzip"
+        assert "licensed-objects.csv.gz" in response["Content-Disposition"]
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        assert license_obj.name in content
+
+    def test_jsonl(self, admin_client, license_obj):
+        TestModel.objects.create(content_license=license_obj)
+
+        response = admin_client.get(MANIFEST_URL, {"format": "jsonl"})
+
+        line = gzip.decompress(b"".join(response.streaming_content)).splitlines()[0]
+        assert json.loads(line)["license"] == license_obj.name
+
+    def test_unknown_format(self, admin_client):
+        assert admin_client.get(MANIFEST_URL, {"format": "xml"}).status_code == 400
+
+    def test_requires_staff(self, client):
+        assert client.get(MANIFEST_URL).status_code == 302
+
+
+LIST_URL = reverse("licensing:list")
+
+
+def detail_url(license_obj):
+    return reverse("licensing:detail", args=[license_obj.slug])
+
+
+class TestLicenseListView:
+    """The paginated catalogue, as HTML and JSON."""
+
+    def test_lists_licenses(self, client, cc_licenses):
+        response = client.get(LIST_URL)
+
+        assert response.status_code == 200
+        assert [entry.name for entry in response.context["licenses"]][:2] == [
+            "CC BY 2.0",
+            "CC BY 4.0",
+        ]
+        assert b'href="/licenses/cc-by-sa-40/"' in response.content
+
+    def test_json(self, client, cc_licenses):
+        data = client.get(LIST_URL, {"format": "json"}).json()
+
+        assert [result["slug"] for result in data["results"]] == [
+            "cc-by-20",
+            "cc-by-40",
+            "cc-by-sa-40",
+            "pd-dedication",
+        ]
+        assert data["results"][0]["url"] == "/licenses/cc-by-20/"
+        assert data["pagination"] == {"page": 1, "pages": 1, "more": False}
+
+    def test_paginates(self, client, cc_licenses, monkeypatch):
+        monkeypatch.setattr("licensing.views.LicenseListView.paginate_by", 3)
+
+        data = client.get(LIST_URL, {"format": "json", "page": 2}).json()
+
+        assert [result["slug"] for result in data["results"]] == ["pd-dedication"]
+        assert data["pagination"] == {"page": 2, "pages": 2, "more": False}
+
+    def test_rows_come_from_the_catalogue(
+        self, client, cc_licenses, django_assert_num_queries
+    ):
+        client.get(LIST_URL)
+
+        # Only Last-Modified, which is not cached inside the test's transaction.
+        with django_assert_num_queries(1):
+            client.get(LIST_URL)
+
+
+class TestLicenseDetailView:
+    """One license with its pre-rendered text."""
+
+    def test_renders_text_as_html(self, client, mit_license):
+        mit_license.text = "First <paragraph>.\n\nSecond."
+        mit_license.save()
+
+        response = client.get(detail_url(mit_license))
+
+        assert response.status_code == 200
+        assert "<p>First &lt;paragraph&gt;.</p>" in response.content.decode()
+        assert "<p>Second.</p>" in response.content.decode()
+
+    def test_json(self, client, mit_license):
+        data = client.get(detail_url(mit_license), {"format": "json"}).json()
+
+        assert data["name"] == "MIT License"
+        assert data["canonical_url"] == mit_license.canonical_url
+        assert data["text_html"].startswith("<p>Permission is hereby granted")
+
+    def test_unknown_slug(self, client, db):
+        assert client.get("/licenses/no-such-license/").status_code == 404
+
+    def test_license_edit_shows_up(self, client, mit_license):
+        client.get(detail_url(mit_license))
+
+        mit_license.text = "Revised."
+        mit_license.save()
+
+        assert "<p>Revised.</p>" in client.get(detail_url(mit_license)).content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogueConditionalGet:
+    """ETag and Last-Modified on the catalogue views."""
+
+    @pytest.fixture(params=["list", "detail"])
+    def url(self, request, mit_license):
+        return LIST_URL if request.param == "list" else detail_url(mit_license)
+
+    def test_sends_validators(self, client, url, mit_license):
+        response = client.get(url)
+
+        assert response["ETag"]
+        assert response["Last-Modified"]
+        assert "Accept-Language" in response["Vary"]
+
+    def test_not_modified_without_the_catalogue(
+        self, client, url, django_assert_num_queries
+    ):
+        etag = client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+
+    def test_not_modified_since(self, client, url):
+        last_modified = client.get(url)["Last-Modified"]
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 304
+
+    def test_license_edit_changes_the_etag(self, client, url, mit_license):
+        etag = client.get(url)["ETag"]
+
+        mit_license.name = "Expat License"
+        mit_license.save()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_warm_detail_runs_no_queries(
+        self, client, mit_license, django_assert_num_queries
+    ):
+        client.get(detail_url(mit_license))
+
+        with django_assert_num_queries(0):
+            response = client.get(detail_url(mit_license))
+
+        assert response.status_code == 200
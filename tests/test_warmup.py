@@ -0,0 +1,133 @@
+"""Tests for the attribution cache warmer in licensing.warmup."""
+
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from example.models import TestModel
+from licensing import background
+from licensing.attribution import renderer
+from licensing.cache import catalogue
+from licensing.warmup import AttributionWarmer, WarmupReport, recent_objects
+from tests.factories import LicenseFactory
+
+# Worker threads have their own connections, which only see committed rows.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+FIELD = TestModel._meta.get_field("content_license")
+
+
+@pytest.fixture
+def contents(settings):
+    settings.LICENSING_CACHE_SNIPPETS = True
+    catalogue.cache.clear()
+    license_obj = LicenseFactory()
+    return [TestModel.objects.create(content_license=license_obj) for _ in range(5)]
+
+
+def is_warm(obj):
+    return catalogue.cache.get(renderer.cache_key(obj, FIELD)) is not None
+
+
+def warm_targets(limit):
+    """A LICENSING_WARMUP_TARGETS callable: the two oldest rows."""
+    for obj in TestModel.objects.order_by("pk")[:2]:
+        yield obj, FIELD
+
+
+class TestAttributionWarmer:
+    """AttributionWarmer renders snippets in a thread pool, within a time budget."""
+
+    def test_warms_every_target(self, contents):
+        report = AttributionWarmer(workers=3).run()
+
+        assert report.rendered == len(contents)
+        assert not report.timed_out
+        assert all(is_warm(obj) for obj in contents)
+
+    def test_stops_at_the_time_budget(self, contents):
+        report = AttributionWarmer(time_budget=0).run()
+
+        assert report.rendered == 0
+        assert report.remaining == len(contents)
+        assert report.timed_out
+
+    def test_renders_each_language(self, contents):
+        report = AttributionWarmer(languages=["en", "de"]).run([(contents[0], FIELD)])
+
+        assert report.rendered == 2
+
+    def test_default_targets_are_newest_first(self, contents):
+        targets = list(recent_objects(limit=2))
+
+        assert targets == [(contents[4], FIELD), (contents[3], FIELD)]
+
+    def test_targets_setting(self, contents, settings):
+        settings.LICENSING_WARMUP_TARGETS = "tests.test_warmup.warm_targets"
+
+        AttributionWarmer().run()
+
+        assert [is_warm(obj) for obj in contents] == [True, True, False, False, False]
+
+    def test_throughput(self):
+        assert WarmupReport(rendered=10, remaining=0, elapsed=2.0).throughput == 5.0
+        assert WarmupReport(rendered=0, remaining=0, elapsed=0.0).throughput == 0.0
+
+
+class TestWarmOnSave:
+    """The optional post-save warmup hook."""
+
+    def test_license_save_starts_a_warmup(self, contents, settings, monkeypatch):
+        runs = []
+        monkeypatch.setattr(AttributionWarmer, "run", lambda self: runs.append(self))
+        settings.LICENSING_WARM_ON_SAVE = True
+
+        contents[0].content_license.save()
+
+        # Run on the background worker; wait for it.
+        background.submit("test-wait", lambda: None).result(5)
+        assert len(runs) == 1
+
+    def test_saves_share_a_waiting_warmup(self, contents, settings, monkeypatch):
+        runs = []
+        monkeypatch.setattr(AttributionWarmer, "run", lambda self: runs.append(self))
+        settings.LICENSING_WARM_ON_SAVE = True
+        started, release = threading.Event(), threading.Event()
+        background.submit("test-block", lambda: (started.set(), release.wait(5)))
+        started.wait(5)
+
+        for _ in range(3):
+            contents[0].content_license.save()
+        release.set()
+
+        background.submit("test-wait", lambda: None).result(5)
+        assert len(runs) == 1
+
+    def test_off_by_default(self, contents, monkeypatch):
+        runs = []
+        monkeypatch.setattr(AttributionWarmer, "run", lambda self: runs.append(self))
+
+        contents[0].content_license.save()
+
+        assert runs == []
+
+
+class TestWarmAttributionsCommand:
+    """The warm_attributions management command."""
+
+    def test_reports_throughput(self, contents):
+        out = StringIO()
+
+        call_command("warm_attributions", "--workers", "2", stdout=out)
+
+        assert "Rendered 5 snippet(s)" in out.getvalue()
+        assert all(is_warm(obj) for obj in contents)
+
+    def test_reports_the_time_budget(self, contents):
+        out = StringIO()
+
+        call_command("warm_attributions", "--time-budget", "0", stdout=out)
+
+        assert "5 snippet(s) left cold" in out.getvalue()